@@ -4,39 +4,34 @@ import neopixel
 import busio
 import analogio
 from digitalio import DigitalInOut
-import simpleio
+import digitalio
 import asyncio
 import time
-import array
-import math
 # generic display imports
 import displayio
-import terminalio
-from adafruit_display_text import label
-# hid imports
-import usb_hid
-from adafruit_hid.mouse import Mouse
-# wifi imports
-from adafruit_esp32spi import adafruit_esp32spi
-from adafruit_esp32spi import adafruit_esp32spi_wifimanager
-# nunchuk imports
-import adafruit_nunchuk
-# Pimoroni EnviroPlusWing
-from adafruit_bme280 import basic as adafruit_bme280
-from pimoroni_circuitpython_ltr559 import Pimoroni_LTR559
-from adafruit_bme280.basic import Adafruit_BME280_I2C
-from lib.pimoroni_envirowing.screen import plotter
-from lib.pimoroni_envirowing import screen, gas
 import pimoroni_physical_feather_pins
-# Propwing
-import digitalio
-from rainbowio import colorwheel
-import audioio
-import audiocore
-from audiocore import RawSample
+from pimoroni_physical_feather_pins import claims
+from lib.m4feather import discovery, loader, bootprof
+from lib.m4feather.spi_arbiter import SpiArbiter
+from lib.m4feather.i2c_meter import MeteredI2C
+from lib.m4feather.i2c_clock import I2CClock
+from lib.m4feather.presence import PresenceMonitor, Addon
+# the strip effects and the lux/mic meters they draw are shared by the Enviro+ and the Prop-Maker
+from lib.m4feather import animation
+# everything else (hid, wifi, the nunchuk, Enviro+ and Prop-Maker drivers and their helpers here in lib,
+# audio, tones, mic_level, strip) is imported by loader.load() once discovery has shown the hardware is there
+
+DISPLAY_BAUDRATE = 24000000
+
+# boot profiling, set BOOT_PROFILE_FILE to keep the table (needs a writable filesystem)
+BOOT_PROFILE = True
+BOOT_PROFILE_FILE = None
+boot = bootprof.Profiler(enabled=BOOT_PROFILE)
+loader.enabled = BOOT_PROFILE
 
 # clear anything leftover from previous runs
-displayio.release_displays()
+with boot.stage("release_displays"):
+    displayio.release_displays()
 
 # Get wifi details and more from a secrets.py file
 try:
@@ -64,6 +59,10 @@ def get_voltage(pin):
 
 
 def setup_wifi(status_light, spi):
+    global adafruit_esp32spi
+    claims.claim("airlift", board.D11, board.D12, board.D13)
+    adafruit_esp32spi = loader.load("adafruit_esp32spi.adafruit_esp32spi")
+    adafruit_esp32spi_wifimanager = loader.load("adafruit_esp32spi.adafruit_esp32spi_wifimanager")
     esp32_cs = DigitalInOut(board.D13)
     esp32_ready = DigitalInOut(board.D11)
     esp32_reset = DigitalInOut(board.D12)
@@ -73,7 +72,14 @@ def setup_wifi(status_light, spi):
     return wifi_object
 
 
-def submit_datapoint(data, feedname):
+async def submit_datapoint(data, feedname):
+    if not WIFI_PLUGGED_IN:
+        return
+    async with spi_arbiter.using("airlift"):
+        post_datapoint(data, feedname)
+
+
+def post_datapoint(data, feedname):
     try:
         # print("Posting data...", end="")
         payload = {"value": data}
@@ -98,9 +104,9 @@ def submit_datapoint(data, feedname):
 # Enviro+ functions
 
 
-def setup_bme280(i2c_bus: busio.I2C) -> Adafruit_BME280_I2C:
+def setup_bme280(i2c_bus: busio.I2C) -> "Adafruit_BME280_I2C":
 
-    bme280sensor: Adafruit_BME280_I2C = adafruit_bme280.Adafruit_BME280_I2C(i2c_bus, address=0x76)
+    bme280sensor = adafruit_bme280.Adafruit_BME280_I2C(i2c_bus, address=0x76)
     bme280sensor.sea_level_pressure = 1013.25
     return bme280sensor
 
@@ -121,14 +127,21 @@ def setup_gas_plotter(displayscreen1):
 
 vbat_voltage = analogio.AnalogIn(board.VOLTAGE_MONITOR)
 
-spibus = busio.SPI(board.SCK, board.MOSI, board.MISO)
-I2C_PLUGGED_IN = False
-try:
-    i2cbus: busio.I2C = busio.I2C(board.SCL, board.SDA)
-    I2C_PLUGGED_IN = True
-except RuntimeError:
-    print("I2C not initialized")
-    pass
+with boot.stage("spi/i2c setup"):
+    spibus = busio.SPI(board.SCK, board.MOSI, board.MISO)
+    # the AirLift and the EnviroWing screen share spibus, the arbiter keeps their sessions apart
+    spi_arbiter = SpiArbiter(spibus)
+    spi_arbiter.add_device("airlift", 8000000)
+    spi_arbiter.add_device("display", DISPLAY_BAUDRATE)
+    I2C_PLUGGED_IN = False
+    try:
+        # every driver gets the metered bus, so report_stats() can show who uses the bus time
+        i2cbus: MeteredI2C = MeteredI2C(busio.I2C(board.SCL, board.SDA),
+                                        names={entry[1]: entry[0] for entry in discovery.PROBES})
+        I2C_PLUGGED_IN = True
+    except RuntimeError:
+        print("I2C not initialized")
+        pass
 pixel: neopixel.NeoPixel = setup_neo_pixel()
 
 # figure out what's plugged in
@@ -136,78 +149,67 @@ pixel: neopixel.NeoPixel = setup_neo_pixel()
 NUNCHUK_PLUGGED_IN = False
 PIM_PLUGGED_IN = False
 PROP_PLUGGED_IN = False
+# nunchuk reports read per second
+NUNCHUK_POLL_HZ = 100
+# drive the computer's mouse pointer with the nunchuk over USB HID
+NUNCHUK_MOUSE = True
+mouse_pipeline = None
+# where the nunchuk's accelerometer ranges are kept between boots
+NVM_CALIBRATION_OFFSET = 0
+nunchuk_calibration = None
+nvm = None
+# most frames a second the Prop-Maker strip is redrawn
+STRIP_FPS = 30
+STRIP_GAMMA = 2.6
+STRIP_PIXELS = 27
+strip_renderer = None
+strip_animator = None
+# double-click C on the nunchuk to step through these
+STRIP_EFFECTS = ("nunchuk", "rainbow", "chase", "pulse", "lux meter", "mic meter")
+strip_effect = 0
+# lux that fills the whole meter
+LUX_FULL_SCALE = 1000
+lux_meter = animation.Meter(STRIP_PIXELS)
+mic_meter = animation.Meter(STRIP_PIXELS)
+mic_level = None
+# seconds between blocks of mic samples, the level is published once every pim_interval
+MIC_BLOCK_INTERVAL = 0.05
+audio_player = None
+tone_library = None
+# alerts share the speaker with the WAV through a mixer, one voice for the WAV and the rest for alerts
+AUDIO_VOICES = 3
+# kind and builder arguments, sine and square loop for their seconds, a chirp plays once
+ALERT_SOUNDS = {
+    # tones.SQUARE and tones.CHIRP, spelled out as tones is only loaded with the Prop-Maker
+    "gas": ("square", 880, 0.1, 0.5, 0.3),
+    "prox": ("chirp", 600, 1800, 0.25, 0.2),
+}
+# alert when the reducing gas reading climbs past this many volts, or something comes this close
+GAS_ALERT_VOLTS = 2.5
+PROX_ALERT = 500
+# seconds between looks for add-ons that aren't attached, a loose cable no longer needs a reboot
+HOTPLUG_INTERVAL = 10
 if I2C_PLUGGED_IN:
-    while not i2cbus.try_lock():
-        time.sleep(0)
-    try:
-        print(
-            "I2C addresses found:",
-            [hex(device_address) for device_address in i2cbus.scan()],
-        )
-        i2c_device_addresses = i2cbus.scan()
-
-        if int('0x52') in i2c_device_addresses:
-            print("Found nunchuk on scan")
-            NUNCHUK_PLUGGED_IN = True
-        else:
-            print("no nunchuk found on scan")
-        if int('0x23') in i2c_device_addresses and int('0x76') in i2c_device_addresses:
-            print("Found Enviro+")
-            PIM_PLUGGED_IN = True
-        else:
-            print("no pimoroni enviro+ found")
-        if int('0x18') in i2c_device_addresses:
-            print("Prop Maker found")
-            PROP_PLUGGED_IN = True
-        else:
-            print("No Prop Maker found")
-
-        # nunchuck doesn't show up on scans for unknown reasons, so check it by address
-        try:
-            i2cbus.writeto(int('0x52'), b"")
-            print("Found nunchuk on address write")
-            NUNCHUK_PLUGGED_IN = True
-        except OSError:
-            # some OS's dont like writing an empty bytesting...
-            # Retry by reading a byte
-            try:
-                result = bytearray(1)
-                i2cbus.readfrom_into(int('0x52'), result)
-                print("Found nunchuk on address read")
-                NUNCHUK_PLUGGED_IN = True
-            except OSError:
-                print("No nunchuck at i2c address: 0x52")
-
-    finally:  # unlock the i2c bus when ctrl-c'ing out of the loop
-        i2cbus.unlock()
+    # one scan, then the probe table checks each add-on's address or ID register
+    with boot.stage("i2c scan"):
+        inventory = discovery.discover(i2cbus)
+    print(inventory)
+    # the bus starts at 100 kHz, go faster if nothing attached needs the slow clock
+    with boot.stage("i2c clock"):
+        i2c_clock = I2CClock(i2cbus, lambda frequency: busio.I2C(board.SCL, board.SDA, frequency=frequency))
+        print("I2C clock: {} Hz".format(i2c_clock.negotiate(inventory)))
+    print("Prop Maker found" if inventory.prop_maker else "No Prop Maker found")
 
 
 # initialize global wifi object from airlift featherwing
 WIFI_PLUGGED_IN = False
-try:
-    wifi = setup_wifi(pixel, spibus)
-    if wifi.esp.status == adafruit_esp32spi.WL_IDLE_STATUS:
-        WIFI_PLUGGED_IN = True
-except TimeoutError:
-    pass
-
-print("I2C Active: " + str(I2C_PLUGGED_IN))
-print("Nunchuk Active: " + str(NUNCHUK_PLUGGED_IN))
-print("Enviro+ Active: " + str(PIM_PLUGGED_IN))
-print("Wifi Active: " + str(WIFI_PLUGGED_IN))
-
-
-# initialize global wifi objects from pimoroni enviro+ featherwing
-
-if PIM_PLUGGED_IN:
-    bme280: Adafruit_BME280_I2C = setup_bme280(i2cbus)
-    ltr559 = Pimoroni_LTR559(i2cbus)
-    gas_reading = gas.read_all()
-    mic: analogio.AnalogIn = analogio.AnalogIn(pimoroni_physical_feather_pins.pin8())
-    displayscreen = screen.Screen(spi=spibus)
-
-
-
+with boot.stage("setup_wifi"):
+    try:
+        wifi = setup_wifi(pixel, spibus)
+        if wifi.esp.status == adafruit_esp32spi.WL_IDLE_STATUS:
+            WIFI_PLUGGED_IN = True
+    except (TimeoutError, ImportError):
+        pass
 
 
 # colours for the plotter are defined as rgb values in hex, with 2 bytes for each colour
@@ -218,141 +220,257 @@ blue = 0x0000FF
 last_reading = time.monotonic()
 
 
+class Interval:
+    """Simple class to hold an interval value. Use .value to to read or write."""
 
-if 'displayscreen' in locals():
-    splash: displayio.Group = displayio.Group()
+    def __init__(self, initial_interval):
+        self.value = initial_interval
+
+
+# add-ons: attached at boot if discovery found them, or later by the presence monitor when they're plugged in.
+# Drivers are only imported once the hardware has been seen.
+
+triplet = [255, 0, 255]
+pim_interval = Interval(30)
+
+
+def attach_nunchuk(found):
+    global nunchuk, gestures, hid_mouse, NunchukReader, nunchuk_calibration
+    global usb_hid, Mouse, mouse_pipeline, nvm, NUNCHUK_PLUGGED_IN
+    nunchuk = loader.load("lib.m4feather.nunchuk")
+    NunchukReader = nunchuk.NunchukReader
+    gestures = loader.load("lib.m4feather.gestures")
+    hid_mouse = loader.load("lib.m4feather.hid_mouse")
+    if nunchuk_calibration is None:
+        nunchuk_calibration = loader.load("lib.m4feather.calibration").AccelCalibration()
+    if nvm is None:
+        nvm = loader.load("microcontroller").nvm
+        if nvm is not None and nunchuk_calibration.load(nvm, NVM_CALIBRATION_OFFSET):
+            print("Nunchuk calibration loaded")
+    if NUNCHUK_MOUSE and mouse_pipeline is None:
+        usb_hid = loader.load("usb_hid")
+        Mouse = loader.load("adafruit_hid.mouse").Mouse
+        try:
+            mouse_pipeline = hid_mouse.MousePipeline(Mouse(usb_hid.devices), center_x=120, center_y=110,
+                                                     scale_x=0.4, scale_y=0.5)
+        except (OSError, ValueError) as e:
+            # not plugged into a computer, or no mouse in boot.py's usb_hid devices; the nunchuk still drives the strip
+            print("No USB mouse:", e)
+    NUNCHUK_PLUGGED_IN = True
+
+
+def detach_nunchuk():
+    global NUNCHUK_PLUGGED_IN
+    NUNCHUK_PLUGGED_IN = False
+    if mouse_pipeline is not None:
+        # don't leave the pointer drifting or a button held down on the computer
+        mouse_pipeline.stop()
+
+
+def nunchuk_tasks():
+    if mouse_pipeline is None:
+        return (poll_nunchuk(triplet),)
+    return (poll_nunchuk(triplet), mouse_pipeline.run())
+
+
+def setup_enviro_display():
+    global displayscreen, splash, test_text_area, gas_splotter
+    with boot.stage("screen.Screen"):
+        displayscreen = screen.Screen(spi=spibus, baudrate=DISPLAY_BAUDRATE)
+        # refreshes are scheduled by refresh_display() so they never land in the middle of a wifi post
+        displayscreen.auto_refresh = False
+    splash = displayio.Group()
     displayscreen.show(splash)
     test_text = "Hello World"
     test_text_area = label.Label(
         terminalio.FONT, text=test_text, color=0xFFFFFF, x=4, y=6
     )
     splash.append(test_text_area)
-    gas_splotter = setup_gas_plotter(displayscreen)
+    with boot.stage("plotter setup"):
+        gas_splotter = setup_gas_plotter(displayscreen)
+
+
+def attach_enviro(found):
+    global terminalio, label, adafruit_bme280, Pimoroni_LTR559, plotter, screen, gas
+    global MicLevel, bme280, ltr559, gas_reading, mic, mic_level, PIM_PLUGGED_IN
+    terminalio = loader.load("terminalio")
+    label = loader.load("adafruit_display_text.label")
+    adafruit_bme280 = loader.load("adafruit_bme280.basic")
+    Pimoroni_LTR559 = loader.load("pimoroni_circuitpython_ltr559").Pimoroni_LTR559
+    plotter = loader.load("lib.pimoroni_envirowing.screen.plotter")
+    screen = loader.load("lib.pimoroni_envirowing.screen")
+    gas = loader.load("lib.pimoroni_envirowing.gas")
+    MicLevel = loader.load("lib.m4feather.mic_level").MicLevel
+    # the sensors are set up again on every attach, the pins and the screen only the first time.
+    # Pins first, so a clash with another add-on's pins shows up before anything else is set up
+    if "displayscreen" not in globals():
+        setup_enviro_display()
+    gas_reading = gas.read_all()
+    if "mic" not in globals():
+        mic = analogio.AnalogIn(pimoroni_physical_feather_pins.pin8())
+        mic_level = MicLevel(mic)
+    with boot.stage("bme280 calibration"):
+        bme280 = setup_bme280(i2cbus)
+    ltr559 = Pimoroni_LTR559(i2cbus)
+    PIM_PLUGGED_IN = True
 
-last_pim_reading = time.monotonic()
 
-# initialize global nunchuk object
+def abandon_enviro():
+    # attach failed part way, let go of the pins it claimed so the next try (or another add-on) can have them
+    if "displayscreen" not in globals():
+        claims.release("enviro+ screen")
+    if "gas" in globals():
+        gas.deinit()
 
 
-# main loop
+def detach_enviro():
+    global PIM_PLUGGED_IN
+    PIM_PLUGGED_IN = False
 
-class Interval:
-    """Simple class to hold an interval value. Use .value to to read or write."""
 
-    def __init__(self, initial_interval):
-        self.value = initial_interval
+def enviro_tasks():
+    return (poll_lux(pim_interval), poll_prox(pim_interval), poll_ox(pim_interval), poll_red(pim_interval),
+            poll_nh3(pim_interval), poll_mic(pim_interval), poll_temp(pim_interval), poll_pres(pim_interval),
+            poll_hum(pim_interval), poll_alt(pim_interval))
 
 
-async def poll_nunchuk(triplet):
-    if NUNCHUK_PLUGGED_IN:
-        nc = adafruit_nunchuk.Nunchuk(i2cbus)
-        # m = Mouse(usb_hid.devices)
+def attach_prop(found):
+    global audioio, audiocore, audiomixer, tones, AudioPlayer, StripRenderer, enable, tone_library, PROP_PLUGGED_IN
+    audioio = loader.load("audioio")
+    audiocore = loader.load("audiocore")
+    audiomixer = loader.load("audiomixer")
+    tones = loader.load("lib.m4feather.tones")
+    AudioPlayer = loader.load("lib.m4feather.audio").AudioPlayer
+    StripRenderer = loader.load("lib.m4feather.strip").StripRenderer
+    if tone_library is None:
+        # kept across replugs, the wavetables only get built once
+        tone_library = tones.ToneLibrary(audiocore)
+    if "enable" not in globals():
+        claims.claim("prop-maker enable", board.D10)
+        enable = digitalio.DigitalInOut(board.D10)
+        enable.direction = digitalio.Direction.OUTPUT
+        enable.value = True
+    PROP_PLUGGED_IN = True
+
 
-        centerX = 120
-        centerY = 110
+def detach_prop():
+    global PROP_PLUGGED_IN
+    PROP_PLUGGED_IN = False
 
-        scaleX = 0.4
-        scaleY = 0.5
 
-        cDown = False
-        zDown = False
+def prop_tasks():
+    return (update_neopixel_strip(STRIP_PIXELS, STRIP_FPS, triplet), play_sound())
 
-        # This is to allow double-checking (only on left click - and it doesn't really work)
-        CHECK_COUNT = 0
-        temp_x, temp_y, temp_z = nc.acceleration
-        maxx = temp_x + 1
-        minx = temp_x - 1
-        maxy = temp_y + 1
-        miny = temp_y - 1
-        maxz = temp_z + 1
-        minz = temp_z - 1
+
+def renegotiate_i2c_clock():
+    # a newly plugged in nunchuk needs the slow clock before its driver starts
+    i2c_clock.negotiate(discovery.discover(i2cbus))
+
+
+if I2C_PLUGGED_IN:
+    monitor = PresenceMonitor(i2cbus, interval=HOTPLUG_INTERVAL, on_change=renegotiate_i2c_clock, claims=claims)
+    monitor.add(Addon("nunchuk", (discovery.NUNCHUK,), attach_nunchuk, nunchuk_tasks, detach_nunchuk))
+    monitor.add(Addon("enviro+", (discovery.LTR559, discovery.BME280), attach_enviro, enviro_tasks, detach_enviro,
+                      abandon=abandon_enviro))
+    # the strip and speaker never touch the bus, so the LIS3DH is re-probed to notice the Prop-Maker going
+    monitor.add(Addon("prop-maker", (discovery.LIS3DH,), attach_prop, prop_tasks, detach_prop, watch=True))
+    with boot.stage("attach add-ons"):
+        monitor.begin(inventory)
+
+print("I2C Active: " + str(I2C_PLUGGED_IN))
+print("Nunchuk Active: " + str(NUNCHUK_PLUGGED_IN))
+print("Enviro+ Active: " + str(PIM_PLUGGED_IN))
+print("Prop Maker Active: " + str(PROP_PLUGGED_IN))
+print("Wifi Active: " + str(WIFI_PLUGGED_IN))
+
+last_pim_reading = time.monotonic()
+
+boot.report(BOOT_PROFILE_FILE)
+if BOOT_PROFILE:
+    loader.print_imports()
+
+
+# main loop
+
+
+async def poll_nunchuk(triplet):
+    if NUNCHUK_PLUGGED_IN:
+        # one 6-byte report per poll, decoded into joystick, acceleration and buttons together
+        nc = NunchukReader(i2cbus)
+        nc.setup()
+
+        def on_gesture(button, gesture, now):
+            # Z is the left mouse button, C the right one
+            if button == gestures.C and gesture == gestures.DOUBLE_CLICK:
+                cycle_strip_effect(now)
+            elif gesture == gestures.CHORD and audio_player is not None:
+                # C and Z together skips to the next sound
+                audio_player.next()
+            if mouse_pipeline is None or button == gestures.BOTH:
+                return
+            mouse_button = hid_mouse.LEFT_BUTTON if button == gestures.Z else hid_mouse.RIGHT_BUTTON
+            if gesture == gestures.PRESS:
+                mouse_pipeline.press(mouse_button, now)
+            elif gesture == gestures.RELEASE:
+                mouse_pipeline.release(mouse_button, now)
+
+        # debounced from the reports poll() already read, no extra bus traffic
+        buttons = gestures.GestureRecognizer(on_gesture)
+
+        period = 1 / NUNCHUK_POLL_HZ
 
     while NUNCHUK_PLUGGED_IN:
-        # x, y = nc.joystick
-        # print("joystick = {},{}".format(x, y))
-        ax, ay, az = nc.acceleration
-
-        if ax > maxx:
-            maxx = ax
-        elif ax < minx:
-            minx = ax
-        if ay > maxy:
-            maxy = ay
-        elif ay < miny:
-            miny = ay
-        if az > maxz:
-            maxz = az
-        elif az < minz:
-            minz = az
-
-        ranged_x = simpleio.map_range(ax, minx, maxx, 0, 255)
-        ranged_y = simpleio.map_range(ay, miny, maxy, 0, 255)
-        ranged_z = simpleio.map_range(az, minz, maxz, 0, 255)
-        triplet[0] = ranged_x
-        triplet[1] = ranged_y
-        triplet[2] = ranged_z
-        # print("accceleration ax={}, ay={}, az={}".format(ax, ay, az))
-        # print(nc.buttons.C)
-        # print(nc.buttons.Z)
-        accel = nc.acceleration
-        #    print(accel)
-        #    x, y = nc.joystick
-        #    print((x,y))
-        x = accel[0] / 4
-        y = accel[1] / 4
-        # print((x, y))
-        # Eliminate spurious reads
-        if x == 255 or y == 255:
-            continue
-        relX = x - centerX
-        relY = y - centerY
-
-        # m.move(int(scaleX * relX), int(scaleY * relY), 0)
-        buttons = nc.buttons
-
-        c = buttons.C
-        z = buttons.Z
-
-        if z and not zDown:
-            stillDown = True
-            for n in range(CHECK_COUNT):
-                if nc.button_Z:
-                    stillDown = False
-                    break
-            if stillDown:
-                # m.press(Mouse.LEFT_BUTTON)
-                zDown = True
-        elif not z and zDown:
-            stillDown = True
-            for n in range(CHECK_COUNT):
-                if not nc.button_Z:
-                    stillDown = False
-                    break
-            if stillDown:
-                # m.release(Mouse.LEFT_BUTTON)
-                zDown = False
-        if c and not cDown:
-            # m.press(Mouse.RIGHT_BUTTON)
-            cDown = True
-        elif not c and cDown:
-            # m.release(Mouse.RIGHT_BUTTON)
-            cDown = False
-        await asyncio.sleep(0)
+        polled = time.monotonic()
+        changed = await nc.poll()
+
+        if changed & nunchuk.ACCELERATION:
+            ax, ay, az = nc.acceleration
+            now = time.monotonic_ns()
+            # decaying ranges, so a bump doesn't squash the colours for good
+            nunchuk_calibration.observe(now, ax, ay, az)
+            nunchuk_calibration.apply(ax, ay, az, triplet)
+            if nvm is not None:
+                nunchuk_calibration.save_if_due(now, nvm, NVM_CALIBRATION_OFFSET)
+            # print("accceleration ax={}, ay={}, az={}".format(ax, ay, az))
+            if mouse_pipeline is not None:
+                # sets the pointer speed, reports go out from mouse_pipeline.run()
+                mouse_pipeline.feed(ax / 4, ay / 4, now)
+
+        # every poll, not just on changes, so the debounce and long-press timers run
+        buttons.update(time.monotonic_ns(), nc.c, nc.z)
+        # poll at NUNCHUK_POLL_HZ instead of as fast as the bus allows
+        await asyncio.sleep(max(0, period - (time.monotonic() - polled)))
 
 
 async def poll_lux(interval):
     while PIM_PLUGGED_IN:
         lux = ltr559.get_lux()
+        lux_meter.level = lux / LUX_FULL_SCALE
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(lux, "enviro.lux")
+        await submit_datapoint(lux, "enviro.lux")
         await asyncio.sleep(interval.value / 2)
 
 
+def sound_alert(name):
+    if audio_player is None:
+        return
+    sound = ALERT_SOUNDS[name]
+    if sound[0] == tones.CHIRP:
+        audio_player.alert(*sound)
+    else:
+        audio_player.alert(*sound[:-1], seconds=sound[-1])
+
+
 async def poll_prox(interval):
+    near = False
     while PIM_PLUGGED_IN:
         prox = ltr559.get_proximity()
+        if (prox > PROX_ALERT) != near:
+            near = not near
+            if near:
+                sound_alert("prox")
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(prox, "enviro.prox")
+        await submit_datapoint(prox, "enviro.prox")
         await asyncio.sleep(interval.value / 2)
 
 
@@ -367,13 +485,18 @@ async def poll_ox(interval):
         )
         gas_splotter.draw()
         await asyncio.sleep(interval.value / 3)
-        submit_datapoint(ox, "enviro.ox")
+        await submit_datapoint(ox, "enviro.ox")
         await asyncio.sleep(interval.value / 3)
 
 
 async def poll_red(interval):
+    high = False
     while PIM_PLUGGED_IN:
         reducing = gas_reading._RED.value * (gas_reading._RED.reference_voltage / 65535)
+        if (reducing > GAS_ALERT_VOLTS) != high:
+            high = not high
+            if high:
+                sound_alert("gas")
         await asyncio.sleep(interval.value / 3)
         gas_splotter.group[2].text = "RED:{}".format(reducing)
         gas_splotter.update(
@@ -382,7 +505,7 @@ async def poll_red(interval):
         )
         gas_splotter.draw()
         await asyncio.sleep(interval.value / 3)
-        submit_datapoint(reducing, "enviro.red")
+        await submit_datapoint(reducing, "enviro.red")
         await asyncio.sleep(interval.value / 3)
 
 
@@ -397,33 +520,27 @@ async def poll_nh3(interval):
         )
         gas_splotter.draw()
         await asyncio.sleep(interval.value / 3)
-        submit_datapoint(nh3, "enviro.nh3")
+        await submit_datapoint(nh3, "enviro.nh3")
         await asyncio.sleep(interval.value / 3)
 
 
 async def poll_mic(interval):
-    micmin = 65535
-    micmax = 0
     while PIM_PLUGGED_IN:
-        mic_current = mic.value
-        if mic_current > micmax:
-            micmax = mic.value
-        elif mic_current < micmin:
-            micmin = mic_current
-        micdec = simpleio.map_range(mic_current, micmin, micmax, 0, 1)
-        pix_brightness = micdec
-        #pixel.fill((1, 1, 50))
-        #pixel.brightness = pix_brightness
-        await asyncio.sleep(interval.value / 2)
-        submit_datapoint(mic_current, "enviro.mic-current")
-        await asyncio.sleep(interval.value / 2)
+        # a block of samples at a time through the interval, then one level for all of them
+        until = time.monotonic() + interval.value
+        while PIM_PLUGGED_IN and time.monotonic() < until:
+            mic_level.update()
+            await asyncio.sleep(MIC_BLOCK_INTERVAL)
+        rms, peak, level = mic_level.take()
+        mic_meter.level = mic_level.level
+        await submit_datapoint(level, "enviro.mic-level")
 
 
 async def poll_temp(interval):
     while PIM_PLUGGED_IN:
         temperature = bme280.temperature
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(temperature, "enviro.temp")
+        await submit_datapoint(temperature, "enviro.temp")
         await asyncio.sleep(interval.value / 2)
 
 
@@ -431,7 +548,7 @@ async def poll_pres(interval):
     while PIM_PLUGGED_IN:
         pres = bme280.pressure
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(pres, "enviro.pres")
+        await submit_datapoint(pres, "enviro.pres")
         await asyncio.sleep(interval.value / 2)
 
 
@@ -439,7 +556,7 @@ async def poll_hum(interval):
     while PIM_PLUGGED_IN:
         hum = bme280.humidity
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(hum, "enviro.hum")
+        await submit_datapoint(hum, "enviro.hum")
         await asyncio.sleep(interval.value / 2)
 
 
@@ -447,81 +564,144 @@ async def poll_alt(interval):
     while PIM_PLUGGED_IN:
         alt = bme280.altitude
         await asyncio.sleep(interval.value / 2)
-        submit_datapoint(alt, "enviro.alt")
+        await submit_datapoint(alt, "enviro.alt")
         await asyncio.sleep(interval.value / 2)
 
-enable = digitalio.DigitalInOut(board.D10)
-enable.direction = digitalio.Direction.OUTPUT
-enable.value = True
-
-
-async def update_neopixel_strip(num_pixels, interval, triplet):
+def make_strip_effect(name, triplet):
+    if name == "rainbow":
+        return animation.Rainbow(period_ms=4000)
+    if name == "chase":
+        return animation.Chase((255, 120, 0), tail=6, period_ms=1500)
+    if name == "pulse":
+        return animation.Pulse((0, 80, 255), period_ms=2500)
+    if name == "lux meter":
+        return lux_meter
+    if name == "mic meter":
+        return mic_meter
+    # follow the nunchuk's tilt colour
+    return animation.Solid(triplet)
+
+
+def cycle_strip_effect(now):
+    global strip_effect
+    if strip_animator is None:
+        return
+    strip_effect = (strip_effect + 1) % len(STRIP_EFFECTS)
+    print("Strip effect:", STRIP_EFFECTS[strip_effect])
+    strip_animator.play(make_strip_effect(STRIP_EFFECTS[strip_effect], triplet), now)
+
+
+async def update_neopixel_strip(num_pixels, fps, triplet):
+    global strip_renderer, strip_animator
     # num_pixels = 30  # NeoPixel strip length (in pixels)
 
-
-
-    strip = neopixel.NeoPixel(board.D5, num_pixels, brightness=.5)
-
-
-
-    while PROP_PLUGGED_IN:
-
-        #for i in range(255):
-        #print(triplet[2])
-        strip.fill(triplet)
-        # strip[k] = colorwheel(i)
-        await asyncio.sleep(interval)
+    # board.D5 is physical pin 19 on the m4, the same line as the Enviro+ screen's DC pin,
+    # so the claim fails (or the screen's does) rather than both driving it
+    try:
+        claims.claim("prop-maker strip", board.D5)
+    except claims.pin_error.PinClaimedError as e:
+        print("Strip disabled:", e)
+        return
+    strip = None
+    try:
+        strip = digitalio.DigitalInOut(board.D5)
+        strip.direction = digitalio.Direction.OUTPUT
+        # at most fps frames a second, and only when the colours actually changed.
+        # Brightness and gamma are a lookup table, the frame goes out with one neopixel_write call
+        strip_renderer = StripRenderer(strip, num_pixels, fps, brightness=.5, gamma=STRIP_GAMMA)
+        # effects are timed from the clock, not from how often this loop gets to run
+        strip_animator = animation.Animator(strip_renderer)
+        strip_animator.play(make_strip_effect(STRIP_EFFECTS[strip_effect], triplet), time.monotonic_ns())
+        frame = 1 / fps
+
+        while PROP_PLUGGED_IN:
+            strip_animator.render(time.monotonic_ns())
+            await asyncio.sleep(frame)
+    finally:
+        # free D5 so the strip can be set up again if the Prop-Maker is unplugged and plugged back in
+        strip_animator = None
+        if strip is not None:
+            strip.deinit()
+        claims.release("prop-maker strip", board.D5)
 
 
 async def play_sound():
+    global audio_player
+    if not PROP_PLUGGED_IN:
+        return
     WAV_FILE_NAME = "StreetChicken.wav"  # Change to the name of your wav file!
 
     # enable = digitalio.DigitalInOut(board.D10)
     # enable.direction = digitalio.Direction.OUTPUT
     # enable.value = True
 
-    with audioio.AudioOut(board.A0) as audio:  # Speaker connector
-
-
+    # board.A0 is physical pin 5 on the m4, one of the Enviro+ gas sensor's pins
+    try:
+        claims.claim("prop-maker speaker", board.A0)
+    except claims.pin_error.PinClaimedError as e:
+        print("Sound disabled:", e)
+        return
+    try:
+        with audioio.AudioOut(board.A0) as audio:  # Speaker connector
+            mixer = audiomixer.Mixer(voice_count=AUDIO_VOICES, sample_rate=tones.SAMPLE_RATE, channel_count=1,
+                                     bits_per_sample=16, samples_signed=True)
+            audio.play(mixer)
+            # plays its queue from its own loop, the file streams to the end instead of being cut at 30 s
+            audio_player = AudioPlayer(audio, audiocore, tone_library, tones.VoiceAllocator(mixer))
+            tone_volume = 0.1  # Increase this to increase the volume of the tone.
+            frequency = 440  # Set this to the Hz of the tone you want to generate.
+            audio_player.play_tone(frequency, tone_volume, .1)
+            audio_player.play_file(WAV_FILE_NAME)
+            await audio_player.run()
+    finally:
+        audio_player = None
+        claims.release("prop-maker speaker", board.A0)
+
+
+async def refresh_display(interval):
+    # the screen may only turn up later, when the Enviro+ is plugged in
+    while True:
+        if 'displayscreen' in globals():
+            async with spi_arbiter.using("display"):
+                displayscreen.refresh(minimum_frames_per_second=0)
+        await asyncio.sleep(interval)
 
-        tone_volume = 0.1  # Increase this to increase the volume of the tone.
-        frequency = 440  # Set this to the Hz of the tone you want to generate.
-        length = 8000 // frequency
-        sine_wave = array.array("H", [0] * length)
-        for i in range(length):
-            sine_wave[i] = int((1 + math.sin(math.pi * 2 * i / length)) * tone_volume * (2 ** 15 - 1))
 
-        sine_wave_sample = RawSample(sine_wave)
+async def report_stats(interval):
+    while True:
+        await asyncio.sleep(interval)
+        spi_arbiter.report()
+        if I2C_PLUGGED_IN:
+            i2cbus.report()
+            i2c_clock.report()
+            monitor.report()
+        if mouse_pipeline is not None:
+            mouse_pipeline.report()
+        if strip_renderer is not None:
+            strip_renderer.report()
+        if audio_player is not None:
+            audio_player.report()
+
+
+async def watch_i2c_clock(interval):
+    # drop to a slower clock if the devices start NACKing or timing out
+    while I2C_PLUGGED_IN:
+        i2c_clock.check()
+        await asyncio.sleep(interval)
 
-        audio.play(sine_wave_sample, loop=True)
-        await asyncio.sleep(.1)
-        audio.stop()
-        wave_file = open(WAV_FILE_NAME, "rb")
-        wave = audiocore.WaveFile(wave_file)
-        audio.play(wave)
 
-        while audio.playing:
-            await asyncio.sleep(30)
-            audio.stop()
-            pass
+async def watch_addons():
+    # starts the attached add-ons' tasks, then keeps looking for the missing ones
+    if I2C_PLUGGED_IN:
+        await monitor.run()
 
 
 async def main():
-    triplet = [255, 0, 255]
-    nunchuk_task = asyncio.create_task(poll_nunchuk(triplet))
-    pim_interval = Interval(30)
-    lux_task = asyncio.create_task(poll_lux(pim_interval))
-    prox_task = asyncio.create_task(poll_prox(pim_interval))
-    ox_task = asyncio.create_task(poll_ox(pim_interval))
-    red_task = asyncio.create_task(poll_red(pim_interval))
-    nh3_task = asyncio.create_task(poll_nh3(pim_interval))
-    mic_task = asyncio.create_task(poll_mic(pim_interval))
-    temp_task = asyncio.create_task(poll_temp(pim_interval))
-    pres_task = asyncio.create_task(poll_pres(pim_interval))
-    hum_task = asyncio.create_task(poll_hum(pim_interval))
-    alt_task = asyncio.create_task(poll_alt(pim_interval))
-    prop_task = asyncio.create_task(update_neopixel_strip(27, 0, triplet))
-    sound_task = asyncio.create_task(play_sound())
-    await asyncio.gather(nunchuk_task, lux_task, prox_task, ox_task, red_task, nh3_task, mic_task, temp_task, pres_task, hum_task, alt_task, prop_task, sound_task)
+    # the nunchuk, Enviro+ and Prop-Maker tasks are started and stopped by the presence monitor
+    addon_task = asyncio.create_task(watch_addons())
+    display_task = asyncio.create_task(refresh_display(1))
+    stats_task = asyncio.create_task(report_stats(600))
+    i2c_clock_task = asyncio.create_task(watch_i2c_clock(5))
+    await asyncio.gather(addon_task, display_task, stats_task, i2c_clock_task)
 
 asyncio.run(main())
@@ -5,7 +5,6 @@ import busio
 import analogio
 # Pimoroni EnviroPlusWing
 import pimoroni_physical_feather_pins
-import simpleio
 from lib.pimoroni_envirowing import screen, gas
 from lib.pimoroni_envirowing.screen import plotter
 from adafruit_bme280 import basic as adafruit_bme280
@@ -20,27 +19,34 @@ import terminalio
 from adafruit_display_text import label
 # code flow imports
 import time
+import asyncio
 # generic Midi Imports
 import adafruit_midi
 from adafruit_midi.note_on import NoteOn
 from adafruit_midi.control_change import ControlChange
 from adafruit_midi.note_off import NoteOff
 from adafruit_midi.pitch_bend import PitchBend
+# sequencer helpers
+from lib.m4feather import scales, scheduler, articulation, modulation, midi_loop
+from lib.m4feather.sequencer import Sequencer
+from lib.m4feather.midi_out import MidiOut
+from lib.m4feather.mic_level import MicLevel
 #  uncomment if using USB MIDI
 import usb_midi
-import array
-import math
 
 displayio.release_displays()
 
 MIDI_PLUGGED_IN: bool = True
 
 
-def setup_midi() -> adafruit_midi.MIDI:
+def setup_midi_uart() -> busio.UART:
     #  USB MIDI:
-    #  midi = adafruit_midi.MIDI(midi_out=usb_midi.ports[1], out_channel=0)
+    #  return usb_midi.ports[1]
     #  UART MIDI:
-    uart = busio.UART(board.TX, board.RX, baudrate=31250, timeout=0.001)  # init UART
+    return busio.UART(board.TX, board.RX, baudrate=31250, timeout=0.001)  # init UART
+
+
+def setup_midi(uart) -> adafruit_midi.MIDI:
     midi_in_channel = 1
     midi_out_channel = 1
     midi_io: adafruit_midi.MIDI = adafruit_midi.MIDI(
@@ -84,24 +90,9 @@ def setup_bme280(i2c_bus: busio.I2C) -> Adafruit_BME280_I2C:
     return bme280sensor
 
 
-def mean(values):
-    return sum(values) / len(values)
-
-
-def normalized_rms(values):
-    minbuf = int(mean(values))
-    samples_sum = sum(
-        float(sample - minbuf) * (sample - minbuf)
-        for sample in values
-    )
-
-    return math.sqrt(samples_sum / len(values))
-
-
 def send_midi_panic():
     print("All MIDI notes off")
-    for x in range(128):
-        midi.send(NoteOff(x, 0))
+    midi_out.panic()
 
 
 # from https://stackoverflow.com/a/49955617
@@ -132,6 +123,8 @@ def setup_gas_plotter():
 
 
 pim_interval = 540
+# the sensors routed to MIDI are read this often (seconds) on their own, the plot above is far too slow for them
+modulation_interval = 0.05
 # interval = 540  # full screen of reading spans 24hrs
 # interval = 1  # uncomment for 1 reading per second
 # interval = 60  # uncomment for 1 reading per minute
@@ -165,6 +158,7 @@ def process_pim_pulse(gas_splotter):
     gas_splotter.draw()
 
     print(str(oxidizing) + " " + str(reducing) + " " + str(nh3))
+    return oxidizing, reducing, nh3
 
 
 # Open-G tuning G4 D3 G3 B3 D4
@@ -180,112 +174,60 @@ banjo_string_current_3 = banjo_string_tuning_3
 banjo_string_current_4 = banjo_string_tuning_4
 banjo_string_current_5 = banjo_string_tuning_5
 
-note_queue = []
+banjo_strings = [banjo_string_current_1,
+                 banjo_string_current_2,
+                 banjo_string_current_3,
+                 banjo_string_current_4,
+                 banjo_string_current_5]
 
+# down-strum across all five strings, thumb (string 1) played softer
+banjo_strum = articulation.StrumProfile(spread=1 / 500, velocities=(45, 90, 90, 90, 90), gate=.7)
+# forward roll: 3, 4, 2, 5 with the thumb drone on the first beat
+banjo_roll = articulation.StrumProfile(order=(2, 3, 1, 4, 0), steps=(0, 1, 2, 3, 0), spread=1 / 10,
+                                       velocities=(90, 90, 90, 90, 45), gate=.7)
 
-def add_roll():
-    v = 90
-    # string1
-    # print(nanoseconds_per_tick)
-    # print(nanoseconds_per_tick/100)
-    # print(10000000)
-    # delay = 10000000  # nanoseconds_per_tick / 100
-    delay = nanoseconds_per_tick / 10
-    note_queue.append({'time_stamp': stamp, 'midi_note': banjo_string_current_3, 'velocity': int(v)})
-    # note_queue.append({'time_stamp': stamp + note_duration + delay, 'midi_note': banjo_string_current_3, 'velocity': 0})
+note_queue = scheduler.EventScheduler(capacity=64)
 
-    note_queue.append({'time_stamp': stamp + delay, 'midi_note': banjo_string_current_4, 'velocity': v})
-    # note_queue.append({'time_stamp': stamp + note_duration + delay, 'midi_note': banjo_string_current_4, 'velocity': 0})
 
-    note_queue.append({'time_stamp': stamp + delay * 2, 'midi_note': banjo_string_current_2, 'velocity': v})
-    # note_queue.append({'time_stamp': stamp + note_duration + (delay * 2), 'midi_note': banjo_string_current_2, 'velocity': 0})
+def add_roll(time_stamp):
+    articulation.strum(note_queue, time_stamp, nanoseconds_per_tick, banjo_strings, banjo_roll)
 
-    note_queue.append({'time_stamp': stamp + delay * 3, 'midi_note': banjo_string_current_5, 'velocity': v})
-    # note_queue.append({'time_stamp': stamp + note_duration + (delay * 3), 'midi_note': banjo_string_current_5, 'velocity': 0})
 
-    note_queue.append({'time_stamp': stamp, 'midi_note': banjo_string_current_1, 'velocity': int(v/2)})
-    # note_queue.append({'time_stamp': stamp + note_duration + (delay * 2), 'midi_note': banjo_string_current_1, 'velocity': 0})
-    pass
-
-
-def add_strum():
-    v = 90
-    # string1
-    # print(nanoseconds_per_tick)
-    # print(nanoseconds_per_tick/100)
-    # print(10000000)
-    # delay = 10000000  # nanoseconds_per_tick / 100
-    delay = nanoseconds_per_tick / 500
-    note_queue.append({'time_stamp': stamp, 'midi_note': banjo_string_current_1, 'velocity': int(v/2)})
-    note_queue.append({'time_stamp': stamp + note_duration + delay*2, 'midi_note': banjo_string_current_1, 'velocity': 0})
-
-    note_queue.append({'time_stamp': stamp + delay, 'midi_note': banjo_string_current_2, 'velocity': v})
-    note_queue.append({'time_stamp': stamp + note_duration + delay, 'midi_note': banjo_string_current_2, 'velocity': 0})
-
-    note_queue.append({'time_stamp': stamp + delay*2, 'midi_note': banjo_string_current_3, 'velocity': v})
-    note_queue.append({'time_stamp': stamp + note_duration + (delay*2), 'midi_note': banjo_string_current_3, 'velocity': 0})
-
-    note_queue.append({'time_stamp': stamp + delay*3, 'midi_note': banjo_string_current_4, 'velocity': v})
-    note_queue.append({'time_stamp': stamp + note_duration + (delay*3), 'midi_note': banjo_string_current_4, 'velocity': 0})
-
-    note_queue.append({'time_stamp': stamp + delay*4, 'midi_note': banjo_string_current_1, 'velocity': v})
-    note_queue.append({'time_stamp': stamp + note_duration + (delay*4), 'midi_note': banjo_string_current_4, 'velocity': 0})
-    pass
+def add_strum(time_stamp):
+    articulation.strum(note_queue, time_stamp, nanoseconds_per_tick, banjo_strings, banjo_strum)
 
 
 pixel: neopixel.NeoPixel = setup_neo_pixel()
 
 
 if MIDI_PLUGGED_IN:
-    midi: adafruit_midi.MIDI = setup_midi()
+    midi_uart = setup_midi_uart()
+    midi: adafruit_midi.MIDI = setup_midi(midi_uart)
+    midi_out = MidiOut(midi_uart, channel=0)
+
+    # sensor driven modulation, smoothed and rate limited so it can run continuously
+    modulation_router = modulation.ModulationRouter(midi_out)
+    modulation_router.add(modulation.Route(modulation.LUX, modulation.PITCH_BEND, 0, 80, max_rate=10))
+    modulation_router.add(modulation.Route(modulation.PROX, 1, 0, 2047, max_rate=10))  # mod wheel
+    modulation_router.add(modulation.Route(modulation.MIC, 11, 0, 32768, smoothing=.1, deadband=2))  # expression
+    modulation_router.add(modulation.Route(modulation.OX, 74, 0.5, 3.3, max_rate=2))
     midiMessage = ""
     msg = midi.receive()
 
     root_notes = (48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59)  # used during config
-    note_numbers = (48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59,
-                    60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71,
-                    72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83)
-    note_names = ("C2", "C#2", "D2", "D#2", "E2", "F2", "F#2", "G2", "G#2", "A2", "A#2", "B2",
-                  "C3", "C#3", "D3", "D#3", "E3", "F3", "F#3", "G3", "G#3", "A3", "A#3", "B3",
-                  "C4", "C#4", "D4", "D#4", "E4", "F4", "F#4", "G4", "G#4", "A4", "A#4", "B4",)
 
     root_picked = True  # state of root selection
     mode_picked = True  # state of mode selection
     mode_choice = 0
 
-    major = (0, 2, 4, 5, 7, 9, 11)
-    minor = (0, 2, 3, 5, 7, 8, 10)
-    dorian = (0, 2, 3, 5, 7, 9, 10)
-    phrygian = (0, 1, 3, 5, 7, 8, 10)
-    lydian = (0, 2, 4, 6, 7, 9, 11)
-    mixolydian = (0, 2, 4, 5, 7, 9, 10)
-    locrian = (0, 1, 3, 5, 6, 8, 10)
-
-    modes = [major, minor, dorian, phrygian, lydian, mixolydian, locrian]
-    mode_names = ("Major/Ionian",
-                  "Minor/Aeolian",
-                  "Dorian",
-                  "Phrygian",
-                  "Lydian",
-                  "Mixolydian",
-                  "Locrian")
-
-    intervals = list(major)
     scale_root = root_notes[7]  # default G2 if nothing is picked
 
-    scale = []  # create the base scale
-    for i in range(7):
-        scale.append(scale_root + intervals[i])
-
-    midi_notes = []  # build the list with three octaves
+    tick_pattern = (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1)
+    # tick_pattern = (0, 7, 0, 7, 0, 7, 0, 7, 0, 0, 0, 0, 0, 0, 0, 0)
 
-
-    for m in range(7):
-        midi_notes.append(scale[m])
-    for l in range(7):
-        midi_notes.append(scale[l] + 12)
-    for k in range(7):
-        midi_notes.append(scale[k] + 24)
+    # three octaves of the scale, resolved to MIDI notes once per settings change
+    sequence = scales.PatternCompiler(scale_root, mode_choice, tick_pattern, octaves=3)
+    midi_notes = sequence.scale
 
     send_midi_panic()
 
@@ -298,6 +240,7 @@ try:
     ltr559 = Pimoroni_LTR559(i2cP)
     gas_reading = gas.read_all()
     mic: analogio.AnalogIn = analogio.AnalogIn(pimoroni_physical_feather_pins.pin8())
+    mic_level = MicLevel(mic)
     displayscreen = screen.Screen()
     PIM_PLUGGED_IN = True
 except Exception:
@@ -322,157 +265,128 @@ if 'displayscreen' in locals():
     )
     splash.append(test_text_area)
 
-micmin = 65535
-micmax = 0
-samples = array.array('H', [0] * 160)
-
 # PIM_PLUGGED_IN = False
 
-current_step = 0
-
 pix_brightness = .5
-mic_current = 0
 
-pulse = True
 bpm = 60  # beat per minute
 tpb = 1  # ticks per beat
 
 ticks_per_minute = bpm * tpb
 ticks_per_second = ticks_per_minute / 60
 seconds_per_tick = 1/ticks_per_second
-nanoseconds_per_tick = seconds_per_tick * 1000000000
+nanoseconds_per_tick = int(seconds_per_tick * 1000000000)
 
 
 print(nanoseconds_per_tick)
 
-stamp = time.monotonic_ns()
-next_tick = stamp + nanoseconds_per_tick
-current_step = -1
-
-tick_pattern = (-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1)
-# tick_pattern = (0, 7, 0, 7, 0, 7, 0, 7, 0, 0, 0, 0, 0, 0, 0, 0)
-note_duration = nanoseconds_per_tick * .7
-note_off_queue = []
-
 gas_splotter = setup_gas_plotter()
-last_pim_reading = time.monotonic()
-while True:
-    # begin loop
-
-    pulse = False
-    stamp = time.monotonic_ns()
-    if stamp > next_tick:
-        next_tick = stamp + nanoseconds_per_tick
-        pulse = True
-
-    if pulse:
-        current_step = (current_step + 1) % tpb
-        # add_strum()
-        # add_roll()
-        # Note On
-        if tick_pattern[current_step] > -1:
-            temp_note = midi_notes[tick_pattern[current_step]]
-            note_off_queue.append({'TStamp': stamp+note_duration, 'Note': temp_note})
-            midi.send(NoteOn(temp_note, 120))
-        # print("MIDI NoteOn:", note_names[note_numbers.index(midi_notes[current_step])])
-        # print(temp_note)
-
-    # Process note_queue
-    # note_queue.append({'time_stamp': stamp, 'midi_note': banjo_string_current_1, 'velocity': v})
-
-    for q in note_queue:
-        if q["time_stamp"] < stamp:
-            midi.send(NoteOn(q["midi_note"], q["velocity"]))
-            if q["velocity"] > 0:
-                print("MIDI NoteOn:", note_names[note_numbers.index(q["midi_note"])], q["velocity"])
-            note_queue.remove(q)
-
-    for z in note_off_queue:
-        # print(z["TStamp"])
-        if z["TStamp"] < stamp:
-            midi.send(NoteOn(z["Note"], 0))
-            note_off_queue.remove(z)
-
-    # print(len(note_off_queue))
-
-    if PIM_PLUGGED_IN and last_pim_reading + pim_interval < time.monotonic():
-        last_pim_reading = time.monotonic()
-        lux = ltr559.get_lux()
-        prox = ltr559.get_proximity()
-
-        process_pim_pulse(gas_splotter)
-
-        # ox = gas_reading._OX.value * (gas_reading._OX.reference_voltage / 65535)
-        # red = gas_reading._RED.value * (gas_reading._RED.reference_voltage / 65535)
-        # nh3 = gas_reading._NH3.value * (gas_reading._NH3.reference_voltage / 65535)
-
-        temp = bme280.temperature
-        pres = bme280.pressure
-        hum = bme280.humidity
-        alt = bme280.altitude
-        sample = abs(mic.value - 32768)
-        mic_current = mic.value
-
-        if mic_current > micmax:
-            micmax = mic.value
-        elif mic_current < micmin:
-            micmin = mic_current
-        mic_range = micmax - micmin
-        micdec = simpleio.map_range(mic_current, micmin, micmax, 0, 1)
-
-        pix_brightness = micdec
-
-        # print(str(ox) + " " + str(red) + " " + str(nh3))
-        # test_text_area.text = str(midiMessage)
 
-    if MIDI_PLUGGED_IN:
-        msg = midi.receive()
-
-        if msg is not None:
-            #  if a NoteOn message...
-            if isinstance(msg, NoteOn):
-                string_msg = 'NoteOn'
-                #  get note number
-                string_val = str(msg.note)
-                msg_out = msg
-                msg_out.note = msg_out.note
-                print(lux*200)
-                pitch_weird = PitchBend(int(lux*200), channel=msg_out.channel)
-                midi.send(pitch_weird)
-            #  if a NoteOff message...
-            if isinstance(msg, NoteOff):
-                string_msg = 'NoteOff'
-                #  get note number
-                string_val = str(msg.note)
-                msg_out = msg
-            #  if a PitchBend message...
-            if isinstance(msg, PitchBend):
-                string_msg = 'PitchBend'
-                #  get value of pitchbend
-                string_val = str(msg.pitch_bend)
-                msg_out = msg
-            #  if a CC message...
-            if isinstance(msg, ControlChange):
-                string_msg = 'ControlChange'
-                #  get CC message number
-                string_val = str(msg.control)
-                msg_out = msg
-            #  update text area with message type and value of message as strings
-            test_text_area.text = (string_msg + " " + string_val)
-            print(string_msg + " " + string_val)
-            midi.send(msg_out)
-
-        # i = 0
-        # midi.send(NoteOn(midi_notes[i], 120))
-        # print("MIDI NoteOn:", note_names[note_numbers.index(midi_notes[i])])
-        # time.sleep(0.15)
-        # midi.send(NoteOn(midi_notes[i], 0))
 
+def forward_midi(msg):
+    #  if a NoteOn message...
+    if isinstance(msg, NoteOn):
+        string_msg = 'NoteOn'
+        #  get note number
+        string_val = str(msg.note)
+        msg_out = msg
+        msg_out.note = msg_out.note
+    #  if a NoteOff message...
+    if isinstance(msg, NoteOff):
+        string_msg = 'NoteOff'
+        #  get note number
+        string_val = str(msg.note)
+        msg_out = msg
+    #  if a PitchBend message...
+    if isinstance(msg, PitchBend):
+        string_msg = 'PitchBend'
+        #  get value of pitchbend
+        string_val = str(msg.pitch_bend)
+        msg_out = msg
+    #  if a CC message...
+    if isinstance(msg, ControlChange):
+        string_msg = 'ControlChange'
+        #  get CC message number
+        string_val = str(msg.control)
+        msg_out = msg
+    #  update text area with message type and value of message as strings
+    test_text_area.text = (string_msg + " " + string_val)
+    print(string_msg + " " + string_val)
+    midi.send(msg_out)
+
+
+def read_mic():
+    # one block of samples, measured in a single pass
+    mic_level.update()
+    return mic_level.take()
+
+
+def read_ox():
+    return gas_reading._OX.value * (gas_reading._OX.reference_voltage / 65535)
+
+
+def modulation_reads():
+    # just what the routes listen to, read every modulation_interval
+    return (ltr559.get_lux,
+            ltr559.get_proximity,
+            read_mic,
+            read_ox)
+
+
+def handle_modulation(results):
+    global pix_brightness
+    lux, prox, (rms, peak, level), oxidizing = results
+
+    pix_brightness = mic_level.level
 
     # m4neopixel
     pixel.fill((1, 1, 50))
     pixel.brightness = pix_brightness
 
-    time.sleep(0.01)  # a little delay here helps avoid debounce annoyances
-    # end loop
-    pass
+    modulation_router.update(modulation.LUX, lux)
+    modulation_router.update(modulation.PROX, prox)
+    modulation_router.update(modulation.MIC, peak)
+    modulation_router.update(modulation.OX, oxidizing)
+
+
+def sensor_reads():
+    # in the order they're read, each is its own chunk so the MIDI tasks can run in between
+    return (lambda: process_pim_pulse(gas_splotter),
+            lambda: bme280.temperature,
+            lambda: bme280.pressure,
+            lambda: bme280.humidity,
+            lambda: bme280.altitude)
+
+
+def handle_sensors(results):
+    (oxidizing, reducing, nh3), temp, pres, hum, alt = results
+
+    # ox = gas_reading._OX.value * (gas_reading._OX.reference_voltage / 65535)
+    # red = gas_reading._RED.value * (gas_reading._RED.reference_voltage / 65535)
+    # nh3 = gas_reading._NH3.value * (gas_reading._NH3.reference_voltage / 65535)
+
+    print(sequencer.stats)
+    # print(str(ox) + " " + str(red) + " " + str(nh3))
+    # test_text_area.text = str(midiMessage)
+
+
+async def main():
+    global sequencer
+    tasks = []
+    if MIDI_PLUGGED_IN:
+        sequencer = Sequencer(sequence, midi_out, note_queue, nanoseconds_per_tick,
+                              gate=.7, velocity=120, start_ns=time.monotonic_ns() + nanoseconds_per_tick)
+        # sequencer.on_tick = add_strum
+        # sequencer.on_tick = add_roll
+        # the task bodies live in midi_loop, bench/midi_timing.py runs the same ones on a virtual clock
+        tasks.append(asyncio.create_task(midi_loop.run_sequencer(sequencer)))
+        tasks.append(asyncio.create_task(midi_loop.drain_input(midi.receive, forward_midi,
+                                                               modulation_router.service)))
+        if PIM_PLUGGED_IN:
+            tasks.append(asyncio.create_task(midi_loop.sample_sensors(sequencer, modulation_reads(),
+                                                                      modulation_interval, handle_modulation)))
+            tasks.append(asyncio.create_task(midi_loop.sample_sensors(sequencer, sensor_reads(), pim_interval,
+                                                                      handle_sensors)))
+    await asyncio.gather(*tasks)
+
+asyncio.run(main())
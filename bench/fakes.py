@@ -0,0 +1,287 @@
+"""Host-side stand-ins for the board peripherals used by the benchmarks.
+
+Nothing in here touches real hardware or the wall clock, so every run of a
+benchmark produces the same numbers.
+"""
+
+
+class VirtualClock:
+    """A monotonic_ns replacement that only moves when told to."""
+
+    def __init__(self, start_ns=0):
+        self.now = start_ns
+
+    def monotonic_ns(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now / 1000000000
+
+    def advance(self, ns):
+        self.now += int(ns)
+
+    def advance_to(self, ns):
+        if ns > self.now:
+            self.now = int(ns)
+
+
+class FakeUart:
+    """Records every write with the virtual time it happened at.
+
+    With a baudrate, writes also queue up on the wire like a UART's
+    transmit buffer, and each is recorded with the time its last byte
+    finishes going out (start and stop bits included).
+
+    :param baudrate: bits per second on the wire, None to record the write time (default None)
+    """
+
+    def __init__(self, clock, baudrate=None):
+        self.clock = clock
+        self.byte_ns = None if baudrate is None else 10 * 1000000000 // baudrate
+        self._line_free = 0
+        self.writes = []
+
+    def write(self, buf):
+        stamp = self.clock.now
+        if self.byte_ns is not None:
+            stamp = max(stamp, self._line_free) + self.byte_ns * len(buf)
+            self._line_free = stamp
+        self.writes.append((stamp, bytes(buf)))
+        return len(buf)
+
+    def read(self, nbytes=None):
+        return None
+
+    @property
+    def in_waiting(self):
+        return 0
+
+
+class _Sleep:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __await__(self):
+        yield self
+
+
+class VirtualLoop:
+    """Runs coroutines on a VirtualClock the way CircuitPython's asyncio would.
+
+    Tasks await loop.sleep(seconds). Like asyncio.sleep on the board, the
+    time is cut to whole milliseconds and a task wakes at the millisecond
+    tick, not to the nanosecond. Each time a task is resumed step_ns is
+    charged to the clock for the interpreter, so sleep(0) loops cost
+    something and scheduling overhead shows up in the timings.
+
+    :param clock: the VirtualClock
+    :param step_ns: cost of resuming a task (default 50 us)
+    """
+
+    def __init__(self, clock, step_ns=50000):
+        self.clock = clock
+        self.step_ns = step_ns
+        self._tasks = []
+        self._order = 0
+        self.steps = 0
+
+    def sleep(self, seconds):
+        return _Sleep(int(seconds * 1000))
+
+    def _schedule(self, wake, coro):
+        self._order += 1
+        self._tasks.append((wake, self._order, coro))
+
+    def create_task(self, coro):
+        self._schedule(self.clock.now, coro)
+
+    def run_until(self, end_ns):
+        clock = self.clock
+        tasks = self._tasks
+        while tasks:
+            task = min(tasks)
+            if task[0] > end_ns:
+                break
+            tasks.remove(task)
+            wake, _, coro = task
+            clock.advance_to(wake)
+            clock.advance(self.step_ns)
+            self.steps += 1
+            try:
+                sleep = coro.send(None)
+            except StopIteration:
+                continue
+            ms = sleep.ms
+            self._schedule((clock.now // 1000000 + ms) * 1000000 if ms > 0 else clock.now, coro)
+        for _, _, coro in tasks:
+            coro.close()
+        self._tasks = []
+
+
+# busio.I2C's default end, it only takes ints so end=None is a TypeError like on the board
+_WHOLE = 2 ** 31 - 1
+
+
+def _end(buffer, end):
+    if not isinstance(end, int):
+        raise TypeError("end must be an int")
+    return min(end, len(buffer))
+
+
+class FakeI2C:
+    """A busio.I2C stand-in backed by per-address register maps.
+
+    :param devices: address -> {register: value}
+    :param hidden: addresses that answer transactions but not scan(), like the nunchuk
+    :param clock: a VirtualClock that the costs below are charged to
+    :param byte_ns: time on the wire for each byte, address byte included
+    :param transaction_ns: fixed cost of each transaction (start, stop, driver overhead)
+    :param lock_ns: cost of each successful try_lock()/unlock() pair
+    :param frequency: bus clock in Hz, sets byte_ns when byte_ns isn't given
+    :param limits: address -> fastest clock the device answers at, above it every transaction fails
+    """
+
+    def __init__(self, devices, hidden=(), clock=None, byte_ns=None, transaction_ns=0, lock_ns=0,
+                 frequency=100000, limits=None):
+        self.devices = devices
+        self.hidden = tuple(hidden)
+        self.clock = clock
+        # 8 data bits plus the ACK bit for every byte
+        self.byte_ns = 9 * 1000000000 // frequency if byte_ns is None else byte_ns
+        self.frequency = frequency
+        self.limits = {} if limits is None else limits
+        self.deinited = False
+        self.transaction_ns = transaction_ns
+        self.lock_ns = lock_ns
+        self.locked = False
+        self.transactions = 0
+        self._pointer = {}
+
+    def _spend(self, ns):
+        if self.clock is not None:
+            self.clock.advance(ns)
+
+    def try_lock(self):
+        if self.locked:
+            return False
+        self.locked = True
+        self._spend(self.lock_ns)
+        return True
+
+    def unlock(self):
+        self.locked = False
+
+    def scan(self):
+        return [address for address in sorted(self.devices) if address not in self.hidden]
+
+    def _device(self, address):
+        if self.deinited:
+            raise ValueError("Object has been deinitialized and can no longer be used.")
+        self.transactions += 1
+        try:
+            registers = self.devices[address]
+        except KeyError:
+            raise OSError(19)  # ENODEV, what busio raises on a NACK
+        if self.frequency > self.limits.get(address, self.frequency):
+            raise OSError(116)  # ETIMEDOUT, the device stretched the clock and gave up
+        return registers
+
+    def deinit(self):
+        self.deinited = True
+
+    def writeto(self, address, buffer, *, start=0, end=_WHOLE):
+        end = _end(buffer, end)
+        registers = self._device(address)
+        data = bytes(buffer[start:end])
+        self._spend(self.transaction_ns + self.byte_ns * (1 + len(data)))
+        if data:
+            self._pointer[address] = data[0]
+            for offset, value in enumerate(data[1:]):
+                registers[data[0] + offset] = value
+
+    def readfrom_into(self, address, buffer, *, start=0, end=_WHOLE):
+        end = _end(buffer, end)
+        registers = self._device(address)
+        register = self._pointer.get(address, 0)
+        self._spend(self.transaction_ns + self.byte_ns * (1 + end - start))
+        for i in range(start, end):
+            buffer[i] = registers.get(register + i - start, 0)
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *,
+                              out_start=0, out_end=_WHOLE, in_start=0, in_end=_WHOLE):
+        self.writeto(address, out_buffer, start=out_start, end=out_end)
+        self.readfrom_into(address, in_buffer, start=in_start, end=in_end)
+
+
+class FakeMouse:
+    """An adafruit_hid Mouse stand-in that records every report it would send."""
+
+    LEFT_BUTTON = 1
+    RIGHT_BUTTON = 2
+    MIDDLE_BUTTON = 4
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.reports = []
+        self.buttons = 0
+
+    def _send(self, x, y):
+        self.reports.append((self.clock.now, self.buttons, x, y))
+
+    def press(self, buttons):
+        self.buttons |= buttons
+        self._send(0, 0)
+
+    def release(self, buttons):
+        self.buttons &= ~buttons
+        self._send(0, 0)
+
+    def move(self, x=0, y=0, wheel=0):
+        # adafruit_hid splits moves bigger than a report can hold
+        while x or y:
+            step_x = max(-127, min(127, x))
+            step_y = max(-127, min(127, y))
+            self._send(step_x, step_y)
+            x -= step_x
+            y -= step_y
+
+
+class FakeAudiocore:
+    """Just enough of audiocore for RawSample."""
+
+    class RawSample:
+        def __init__(self, buffer, sample_rate=8000):
+            self.buffer = buffer
+            self.sample_rate = sample_rate
+
+
+class FakeVoice:
+    """A mixer voice whose samples finish when the clock passes their length."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sample = None
+        self.loop = False
+        self._ends = 0
+        self.cut = 0
+
+    def play(self, sample, loop=False):
+        if self.playing:
+            self.cut += 1
+        self.sample = sample
+        self.loop = loop
+        self._ends = self.clock.now + len(sample.buffer) * 1000000000 // sample.sample_rate
+
+    def stop(self):
+        self.sample = None
+
+    @property
+    def playing(self):
+        return self.sample is not None and (self.loop or self.clock.now < self._ends)
+
+
+class FakeMixer:
+    """An audiomixer.Mixer stand-in with FakeVoices."""
+
+    def __init__(self, clock, voice_count=3):
+        self.voice = tuple(FakeVoice(clock) for _ in range(voice_count))
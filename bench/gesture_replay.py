@@ -0,0 +1,84 @@
+"""Replays recorded nunchuk button traces through GestureRecognizer.
+
+Each trace is a list of (ms, c, z) changes as the nunchuk reported them,
+contact bounce included. The trace is sampled at the poll rate, the way
+poll_nunchuk feeds the recognizer, and the gestures that come out are
+compared with what the trace should produce.
+
+    python -m bench.gesture_replay
+    python -m bench.gesture_replay --poll-hz 50 --verbose
+"""
+import argparse
+import sys
+
+from lib.m4feather.gestures import GestureRecognizer, GESTURE_NAMES, C, Z, BOTH, \
+    PRESS, RELEASE, CLICK, DOUBLE_CLICK, LONG_PRESS, CHORD
+
+MS = 1000000
+
+# name, trace of (ms, c, z) changes, expected gestures in order
+TRACES = (
+    ("bouncy z click",
+     ((0, 0, 0), (100, 0, 1), (102, 0, 0), (104, 0, 1), (106, 0, 0), (108, 0, 1),
+      (220, 0, 0), (223, 0, 1), (226, 0, 0), (1000, 0, 0)),
+     ((Z, PRESS), (Z, RELEASE), (Z, CLICK))),
+    ("glitch shorter than the debounce",
+     ((0, 0, 0), (100, 1, 0), (105, 0, 0), (1000, 0, 0)),
+     ()),
+    ("c double click",
+     ((0, 0, 0), (100, 1, 0), (180, 0, 0), (300, 1, 0), (380, 0, 0), (1000, 0, 0)),
+     ((C, PRESS), (C, RELEASE), (C, PRESS), (C, RELEASE), (C, DOUBLE_CLICK))),
+    ("two slow clicks",
+     ((0, 0, 0), (100, 1, 0), (180, 0, 0), (700, 1, 0), (780, 0, 0), (1500, 0, 0)),
+     ((C, PRESS), (C, RELEASE), (C, CLICK), (C, PRESS), (C, RELEASE), (C, CLICK))),
+    ("z long press",
+     ((0, 0, 0), (100, 0, 1), (101, 0, 0), (103, 0, 1), (1000, 0, 0), (1500, 0, 0)),
+     ((Z, PRESS), (Z, LONG_PRESS), (Z, RELEASE))),
+    ("chord",
+     ((0, 0, 0), (100, 1, 0), (140, 1, 1), (400, 0, 0), (1200, 0, 0)),
+     ((C, PRESS), (Z, PRESS), (BOTH, CHORD), (C, RELEASE), (Z, RELEASE))),
+    ("presses too far apart for a chord",
+     ((0, 0, 0), (100, 1, 0), (300, 1, 1), (400, 0, 0), (1300, 0, 0)),
+     ((C, PRESS), (Z, PRESS), (C, RELEASE), (Z, RELEASE), (C, CLICK), (Z, CLICK))),
+)
+
+
+def replay(trace, poll_hz):
+    gestures = []
+    recognizer = GestureRecognizer(lambda button, gesture, now: gestures.append((button, gesture, now)))
+    step = 1000 * MS // poll_hz
+    changes = list(trace)
+    c = z = False
+    now = 0
+    end = changes[-1][0] * MS
+    while now <= end:
+        while changes and changes[0][0] * MS <= now:
+            _, c, z = changes.pop(0)
+        recognizer.update(now, bool(c), bool(z))
+        now += step
+    return gestures, recognizer.bounces
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poll-hz", type=int, default=1000, help="how often the trace is sampled")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for name, trace, expected in TRACES:
+        gestures, bounces = replay(trace, args.poll_hz)
+        got = tuple((button, gesture) for button, gesture, _ in gestures)
+        ok = got == expected
+        failures += not ok
+        print("{:<36} {:<4} bounces: {}".format(name, "ok" if ok else "FAIL", bounces))
+        if args.verbose or not ok:
+            for button, gesture, now in gestures:
+                print("    {:>6.0f} ms {:<2} {}".format(now / MS, button, GESTURE_NAMES[gesture]))
+            if not ok:
+                print("    expected:", ", ".join("{} {}".format(b, GESTURE_NAMES[g]) for b, g in expected))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
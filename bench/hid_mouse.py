@@ -0,0 +1,122 @@
+"""USB HID mouse benchmark for MousePipeline.
+
+Plays a nunchuk tilt and button trace into a recording mouse. Two ways
+of driving the mouse are compared:
+
+  per-poll   the old poll_nunchuk way: m.move() on every poll, buttons sent as soon as they're seen
+  pipeline   MousePipeline fed on changes, reports sent from its own task every interval
+
+Both move the pointer at the same speed (per-poll keeps fractions too, so
+the distances match). The table shows how many reports each sends and how
+long an input waits for the report carrying it, averaged over the inputs
+that were sent. The default poll rate is 2022oct10.py's NUNCHUK_POLL_HZ.
+
+    python -m bench.hid_mouse
+    python -m bench.hid_mouse --poll-hz 500 --motion-ms 10
+"""
+import argparse
+import sys
+
+from lib.m4feather.hid_mouse import MousePipeline, LEFT_BUTTON
+
+from .fakes import VirtualClock, FakeMouse
+
+MS = 1000000
+TICK_NS = 10 * MS
+
+# ms, tilt x, tilt y (accel / 4), z button
+TRACE = (
+    (0, 120, 110, False),
+    (200, 150, 110, False),
+    (500, 150, 80, False),
+    (800, 122, 112, False),
+    (1000, 122, 112, True),
+    (1100, 122, 112, False),
+    (1300, 90, 140, False),
+    (1600, 120, 110, False),
+    (2000, 120, 110, False),
+)
+
+
+def _state(now):
+    current = TRACE[0]
+    for entry in TRACE:
+        if entry[0] * MS <= now:
+            current = entry
+    return current
+
+
+def per_poll(clock, mouse, poll_ns, center_x=120, center_y=110, scale_x=0.4, scale_y=0.5):
+    down = False
+    carry_x = carry_y = 0.0
+    end = TRACE[-1][0] * MS
+    while clock.now <= end:
+        _, x, y, z = _state(clock.now)
+        carry_x += scale_x * (x - center_x) * poll_ns / TICK_NS
+        carry_y += scale_y * (y - center_y) * poll_ns / TICK_NS
+        move_x = int(carry_x)
+        move_y = int(carry_y)
+        carry_x -= move_x
+        carry_y -= move_y
+        if move_x or move_y:
+            mouse.move(move_x, move_y, 0)
+        if z != down:
+            (mouse.press if z else mouse.release)(LEFT_BUTTON)
+            down = z
+        clock.advance(poll_ns)
+
+
+def pipelined(clock, mouse, poll_ns, interval_ms, motion_ms):
+    pipeline = MousePipeline(mouse, deadzone=0, acceleration=0, interval_ms=interval_ms, motion_ms=motion_ms)
+    end = TRACE[-1][0] * MS
+    next_poll = 0
+    next_service = 0
+    last = None
+    while clock.now <= end:
+        if clock.now >= next_poll:
+            state = _state(clock.now)
+            if state != last:
+                _, x, y, z = state
+                if last is None or (x, y) != (last[1], last[2]):
+                    pipeline.feed(x, y, clock.now)
+                if last is not None and z != last[3]:
+                    (pipeline.press if z else pipeline.release)(LEFT_BUTTON, clock.now)
+                last = state
+            next_poll += poll_ns
+        if clock.now >= next_service:
+            pipeline.service(clock.now)
+            next_service += pipeline.interval_ns
+        clock.advance_to(min(next_poll, next_service))
+    return pipeline
+
+
+def _summary(name, mouse, latency_mean_ns=None, latency_max_ns=None):
+    moved_x = sum(report[2] for report in mouse.reports)
+    moved_y = sum(report[3] for report in mouse.reports)
+    latency = "-" if latency_mean_ns is None else "{:.1f} / {:.1f}".format(latency_mean_ns / MS, latency_max_ns / MS)
+    print("{:<10} {:>8} {:>8} {:>8} {:>18}".format(name, len(mouse.reports), moved_x, moved_y, latency))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poll-hz", type=int, default=100, help="how often the nunchuk is read")
+    parser.add_argument("--interval-ms", type=int, default=8, help="how often button changes are sent")
+    parser.add_argument("--motion-ms", type=int, default=20, help="time motion is summed over")
+    args = parser.parse_args(argv)
+    poll_ns = 1000000000 // args.poll_hz
+
+    print("{:<10} {:>8} {:>8} {:>8} {:>18}".format("mode", "reports", "moved x", "moved y", "latency mean/max ms"))
+    clock = VirtualClock()
+    mouse = FakeMouse(clock)
+    per_poll(clock, mouse, poll_ns)
+    _summary("per-poll", mouse)
+
+    clock = VirtualClock()
+    mouse = FakeMouse(clock)
+    pipeline = pipelined(clock, mouse, poll_ns, args.interval_ms, args.motion_ms)
+    _summary("pipeline", mouse, pipeline.latency_mean_ns, pipeline.latency_max_ns)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
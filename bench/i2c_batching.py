@@ -0,0 +1,93 @@
+"""I2C batching benchmark for MeteredI2C.
+
+Replays one 2022oct10 sensor pass (nunchuk report, LTR559 lux and
+proximity, BME280 temperature, pressure and humidity) against a simulated
+bus that charges virtual time per byte, per transaction and per lock. The
+register reads are made the way the drivers make them: lock, write the
+register, read, unlock. Two ways of running the pass are compared:
+
+  per-read   every register read takes and releases the bus lock
+  batched    each device's reads run inside one MeteredI2C.batch()
+
+Run from the repository root:
+
+    python -m bench.i2c_batching
+    python -m bench.i2c_batching --khz 400 --lock-us 40
+"""
+import argparse
+import sys
+
+from lib.m4feather.i2c_meter import MeteredI2C
+
+from .fakes import VirtualClock, FakeI2C
+
+NUNCHUK = 0x52
+LTR559 = 0x23
+BME280 = 0x76
+
+NAMES = {NUNCHUK: "nunchuk", LTR559: "ltr559", BME280: "bme280"}
+
+# device, register, bytes read, in the order one pass reads them
+READS = (
+    ("nunchuk", ((NUNCHUK, 0x00, 6),)),
+    ("ltr559", ((LTR559, 0x8C, 1), (LTR559, 0x88, 4), (LTR559, 0x8C, 1), (LTR559, 0x8D, 2))),
+    # pressure and humidity are compensated with a fresh temperature reading
+    ("bme280", ((BME280, 0xFA, 3), (BME280, 0xFA, 3), (BME280, 0xF7, 3), (BME280, 0xFA, 3), (BME280, 0xFD, 2))),
+)
+
+
+def _read_register(i2c, address, register, nbytes, out, result):
+    while not i2c.try_lock():
+        pass
+    try:
+        out[0] = register
+        i2c.writeto_then_readfrom(address, out, result, in_end=nbytes)
+    finally:
+        i2c.unlock()
+
+
+def run(batched, passes, clock, bus):
+    i2c = MeteredI2C(bus, names=NAMES, clock=clock.monotonic_ns)
+    out = bytearray(1)
+    result = bytearray(6)
+    start = clock.now
+    for _ in range(passes):
+        for name, reads in READS:
+            if batched:
+                with i2c.batch():
+                    for address, register, nbytes in reads:
+                        _read_register(i2c, address, register, nbytes, out, result)
+            else:
+                for address, register, nbytes in reads:
+                    _read_register(i2c, address, register, nbytes, out, result)
+    return i2c, (clock.now - start) // passes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--khz", type=int, default=100, help="bus clock, sets the per-byte cost")
+    parser.add_argument("--transaction-us", type=int, default=60, help="fixed cost per transaction")
+    parser.add_argument("--lock-us", type=int, default=120, help="cost of one try_lock()/unlock() pair")
+    parser.add_argument("--passes", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, batched in (("per-read", False), ("batched", True)):
+        clock = VirtualClock()
+        devices = {address: {} for address in NAMES}
+        bus = FakeI2C(devices, clock=clock, frequency=args.khz * 1000,
+                      transaction_ns=args.transaction_us * 1000, lock_ns=args.lock_us * 1000)
+        i2c, pass_ns = run(batched, args.passes, clock, bus)
+        results[mode] = pass_ns
+        print("== {} ({} passes at {} kHz)".format(mode, args.passes, args.khz))
+        i2c.report()
+        print("per pass: {:.2f} ms".format(pass_ns / 1000000))
+        print()
+    saved = results["per-read"] - results["batched"]
+    print("batching saves {:.2f} ms per pass ({:.0f}%)".format(
+        saved / 1000000, 100 * saved / results["per-read"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
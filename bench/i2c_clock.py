@@ -0,0 +1,110 @@
+"""I2C clock negotiation check for I2CClock.
+
+Builds simulated buses that time out above each device's limit and runs
+I2CClock against a few add-on combinations:
+
+  enviro+prop          no nunchuk, should settle on 400 kHz
+  enviro+prop+nunchuk  the nunchuk holds the bus at 100 kHz
+  slow ltr559          the table allows 400 kHz but the LTR559 times out, so negotiate() falls back
+  degraded             starts at 400 kHz, then the LTR559 starts timing out and check() falls back
+
+Each scenario then replays sensor reads and prints the throughput seen by
+the MeteredI2C counters at every frequency the bus ran at.
+
+    python -m bench.i2c_clock
+"""
+import argparse
+import sys
+
+from lib.m4feather import discovery
+from lib.m4feather.i2c_clock import I2CClock, FAST, STANDARD, ERROR_THRESHOLD
+from lib.m4feather.i2c_meter import MeteredI2C
+
+from .fakes import VirtualClock, FakeI2C
+
+LTR559 = 0x23
+BME280 = 0x76
+LIS3DH = 0x18
+NUNCHUK = 0x52
+
+REGISTERS = {
+    LTR559: {0x86: 0x92},
+    BME280: {0xD0: 0x60},
+    LIS3DH: {0x0F: 0x33},
+    NUNCHUK: {},
+}
+
+# address, register, bytes
+READS = ((LTR559, 0x88, 4), (BME280, 0xF7, 8), (LIS3DH, 0xA8, 6))
+
+
+class Scenario:
+    def __init__(self, name, addresses, limits=None, degrade=None, expected=None):
+        self.name = name
+        self.addresses = addresses
+        self.limits = limits or {}
+        self.degrade = degrade or {}
+        self.expected = expected
+
+
+SCENARIOS = (
+    Scenario("enviro+prop", (LTR559, BME280, LIS3DH), expected=FAST),
+    Scenario("enviro+prop+nunchuk", (LTR559, BME280, LIS3DH, NUNCHUK), expected=STANDARD),
+    Scenario("slow ltr559", (LTR559, BME280, LIS3DH), limits={LTR559: STANDARD}, expected=STANDARD),
+    Scenario("degraded", (LTR559, BME280, LIS3DH), degrade={LTR559: STANDARD}, expected=STANDARD),
+)
+
+
+def _reads(i2c, passes, reads):
+    out = bytearray(1)
+    result = bytearray(8)
+    for _ in range(passes):
+        for address, register, nbytes in reads:
+            with i2c.batch():
+                out[0] = register
+                try:
+                    i2c.writeto_then_readfrom(address, out, result, in_end=nbytes)
+                except OSError:
+                    pass
+
+
+def run(scenario, passes):
+    clock = VirtualClock()
+    devices = {address: dict(REGISTERS[address]) for address in scenario.addresses}
+    limits = dict(scenario.limits)
+
+    def make_bus(frequency):
+        return FakeI2C(devices, hidden=(NUNCHUK,), clock=clock, transaction_ns=60000,
+                       frequency=frequency, limits=limits)
+
+    i2c = MeteredI2C(make_bus(STANDARD), names={entry[1]: entry[0] for entry in discovery.PROBES},
+                     clock=clock.monotonic_ns)
+    inventory = discovery.discover(i2c)
+    bus_clock = I2CClock(i2c, make_bus)
+    bus_clock.negotiate(inventory)
+    reads = tuple(read for read in READS if read[0] in scenario.addresses)
+    _reads(i2c, passes, reads)
+    if scenario.degrade:
+        limits.update(scenario.degrade)
+        _reads(i2c, ERROR_THRESHOLD, reads)
+        bus_clock.check()
+        _reads(i2c, passes, reads)
+    print("== {}: {}".format(scenario.name, inventory))
+    bus_clock.report()
+    print()
+    return bus_clock.frequency == scenario.expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passes", type=int, default=50)
+    args = parser.parse_args(argv)
+    failed = [scenario.name for scenario in SCENARIOS if not run(scenario, args.passes)]
+    if failed:
+        print("wrong frequency:", ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""How well one interval's mic figure tracks the actual sound level.
+
+A fake AnalogIn plays a tone of known amplitude on the mic's bias point.
+Each interval is reported two ways:
+
+  instant  what poll_mic did: one mic.value per interval, distance from
+           the middle of the range
+  block    MicLevel: blocks of samples, RMS, peak and dBFS over the interval
+
+The spread of the reported figure across intervals shows how much of it is
+the level and how much is where in the waveform the read happened to land.
+It also times measure() against the old normalized_rms() on one block.
+
+    python -m bench.mic_level
+    python -m bench.mic_level --amplitude 2000 --intervals 50
+"""
+import argparse
+import math
+import sys
+import time
+
+from lib.m4feather.mic_level import MicLevel, dbfs, measure
+
+
+class FakeMic:
+    """An AnalogIn whose value is a tone plus a DC offset, one sample further on per read."""
+
+    def __init__(self, amplitude, period=37, bias=32768 + 900):
+        self.amplitude = amplitude
+        self.period = period
+        self.bias = bias
+        self.reads = 0
+
+    @property
+    def value(self):
+        self.reads += 1
+        return int(self.bias + self.amplitude * math.sin(2 * math.pi * self.reads / self.period))
+
+
+def normalized_rms(values):
+    # the helper 2022sep10B.py used to carry
+    minbuf = int(sum(values) / len(values))
+    samples_sum = sum(float(sample - minbuf) * (sample - minbuf) for sample in values)
+    return math.sqrt(samples_sum / len(values))
+
+
+def spread(values):
+    return min(values), max(values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--amplitude", type=int, default=8000)
+    parser.add_argument("--intervals", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=4, help="blocks per interval")
+    args = parser.parse_args(argv)
+
+    mic = FakeMic(args.amplitude)
+    instant = []
+    for _ in range(args.intervals):
+        # the old loop read once, then slept for an interval's worth of samples
+        instant.append(abs(mic.value - 32768))
+        mic.reads += 101
+    meter = MicLevel(FakeMic(args.amplitude))
+    rms = []
+    levels = []
+    for _ in range(args.intervals):
+        for _ in range(args.blocks):
+            meter.update()
+        rms.append(meter.take()[0])
+        levels.append(meter.dbfs)
+
+    print("tone amplitude {}, true RMS {:.0f} ({:.1f} dBFS)".format(
+        args.amplitude, args.amplitude / math.sqrt(2), dbfs(args.amplitude / math.sqrt(2))))
+    print("{:<8} {:>10} {:>10}".format("path", "low", "high"))
+    print("{:<8} {:>10.0f} {:>10.0f}".format("instant", *spread(instant)))
+    print("{:<8} {:>10.0f} {:>10.0f}".format("block", *spread(rms)))
+    print("block dBFS {:.2f} to {:.2f}, peak {:.0f}".format(min(levels), max(levels), meter.peak))
+
+    block = meter.samples
+    rounds = 200
+    for name, path in (("normalized_rms", normalized_rms), ("measure", measure)):
+        start = time.perf_counter_ns()
+        for _ in range(rounds):
+            path(block)
+        print("{:<15} {:>8.1f} us per block".format(name, (time.perf_counter_ns() - start) / rounds / 1000))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
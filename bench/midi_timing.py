@@ -0,0 +1,235 @@
+"""MIDI timing benchmark for the sep10B sequencer.
+
+Runs the real Sequencer, EventScheduler, MidiOut and ModulationRouter
+against a virtual clock and a recording UART at MIDI's 31250 baud, with
+the Enviro+ reads replaced by fixed simulated delays. Two loops are
+compared:
+
+  inline   the original while True loop: every sensor read back to back,
+           then time.sleep(0.01). The script no longer has it, it's kept
+           here as the baseline.
+  chunked  2022sep10B's asyncio tasks, run_sequencer, drain_input and
+           sample_sensors from lib/m4feather/midi_loop.py, the same code
+           the script runs, on a VirtualLoop that sleeps in whole
+           milliseconds and charges each task switch to the clock
+
+Note on and note off latency run from the time the event was due (the
+tick, or its time in the queue) to the time its last byte left the UART.
+
+Run from the repository root:
+
+    python -m bench.midi_timing
+    python -m bench.midi_timing --max-p99-us 2000   # exit 1 if chunked p99 jitter regresses
+"""
+import argparse
+import sys
+
+from lib.m4feather import scales, modulation, midi_loop
+from lib.m4feather.midi_out import MidiOut, NOTE_ON
+from lib.m4feather.scheduler import EventScheduler
+from lib.m4feather.sequencer import Sequencer
+
+from .fakes import VirtualClock, VirtualLoop, FakeUart
+
+MS = 1000000
+MIDI_BAUDRATE = 31250
+
+# simulated cost of each read in the sep10B sensor pass, in the order they happen
+SENSOR_READS = (
+    ("lux", 3 * MS),
+    ("prox", 2 * MS),
+    ("gas + plotter", 25 * MS),
+    ("temperature", 6 * MS),
+    ("pressure", 6 * MS),
+    ("humidity", 6 * MS),
+    ("altitude", 6 * MS),
+    ("mic", 3 * MS),
+)
+
+INLINE_LOOP_SLEEP_NS = 10 * MS
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class TracedScheduler(EventScheduler):
+    """Notes down when every queued event is due, for matching against the UART."""
+
+    def __init__(self, due, capacity=64):
+        super().__init__(capacity)
+        self.due = due
+
+    def add(self, time_stamp, note, velocity):
+        if super().add(time_stamp, note, velocity):
+            self.due.setdefault((note, velocity), []).append(int(time_stamp))
+            return True
+        return False
+
+
+class TracedSequencer(Sequencer):
+    """Notes down how late each tick fires and when its note on was due."""
+
+    def __init__(self, due, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.due = due
+        self.tick_lateness = []
+
+    def poll(self, now):
+        scheduled = self.next_tick
+        step = self.step
+        wait = super().poll(now)
+        if self.step != step:
+            self.tick_lateness.append(now - scheduled)
+            note = self.pattern.steps[self.step]
+            if note > scales.REST:
+                self.due.setdefault((note, self.velocity), []).append(scheduled)
+        return wait
+
+
+class Run:
+    def __init__(self, bpm, tpb, sensor_interval_ns, duration_ns):
+        self.clock = VirtualClock(start_ns=0)
+        self.uart = FakeUart(self.clock, baudrate=MIDI_BAUDRATE)
+        self.out = MidiOut(self.uart)
+        self.due = {}
+        tick_ns = int(60000000000 / (bpm * tpb))
+        pattern = scales.PatternCompiler(55, 0, (0, 7, 2, 4, 0, 7, 3, 5, 0, 7, 2, 4, 1, 6, 3, 5))
+        self.seq = TracedSequencer(self.due, pattern, self.out, TracedScheduler(self.due), tick_ns,
+                                   start_ns=tick_ns)
+        # the script's lux and mic routes, so modulation traffic shares the UART with the notes
+        self.router = modulation.ModulationRouter(self.out)
+        self.router.add(modulation.Route(modulation.LUX, modulation.PITCH_BEND, 0, 80, max_rate=10))
+        self.router.add(modulation.Route(modulation.MIC, 11, 0, 32768, smoothing=.1, deadband=2))
+        self.sensor_interval_ns = sensor_interval_ns
+        self.duration_ns = duration_ns
+        self.passes = 0
+        self.reads = tuple(self._read(delay) for _, delay in SENSOR_READS)
+
+    def _read(self, delay):
+        def read():
+            self.clock.advance(delay)
+            # something that moves, so the routes have changes to send
+            return (self.passes * 7919) % 80 if delay else 0
+        return read
+
+    def _handle(self, results):
+        self.passes += 1
+        self.router.update(modulation.LUX, results[0])
+        self.router.update(modulation.MIC, results[-1] * 400)
+
+    def run_inline(self):
+        clock = self.clock
+        seq = self.seq
+        results = [None] * len(self.reads)
+        next_sensing = self.sensor_interval_ns
+        while clock.now < self.duration_ns:
+            seq.poll(clock.now)
+            self.router.service(clock.now)
+            # a tick delayed by the sensor block is detected on the pass after it
+            seq.sensing = False
+            if clock.now >= next_sensing:
+                next_sensing = clock.now + self.sensor_interval_ns
+                seq.sensing = True
+                for i, read in enumerate(self.reads):
+                    results[i] = read()
+                self._handle(results)
+            clock.advance(INLINE_LOOP_SLEEP_NS)
+        return self
+
+    def run_chunked(self):
+        clock = self.clock
+        loop = VirtualLoop(clock)
+        now = clock.monotonic_ns
+        sleep = loop.sleep
+        loop.create_task(midi_loop.run_sequencer(self.seq, now, sleep))
+        loop.create_task(midi_loop.drain_input(lambda: None, None, self.router.service, now, sleep))
+        loop.create_task(midi_loop.sample_sensors(self.seq, self.reads, self.sensor_interval_ns / 1000000000,
+                                                  self._handle, now, sleep))
+        loop.run_until(self.duration_ns)
+        return self
+
+    def _latencies(self):
+        # each note on/off written is matched with the earliest one due for the same note and velocity
+        due = {key: list(times) for key, times in self.due.items()}
+        note_on = []
+        note_off = []
+        for stamp, message in self.uart.writes:
+            if message[0] & 0xF0 != NOTE_ON:
+                continue
+            times = due.get((message[1], message[2]))
+            if not times:
+                continue
+            (note_on if message[2] else note_off).append(stamp - times.pop(0))
+        note_on.sort()
+        note_off.sort()
+        return note_on, note_off
+
+    def report(self, name):
+        lateness = sorted(self.seq.tick_lateness)
+        note_on, note_off = self._latencies()
+        seconds = self.clock.now / 1000000000
+        return {
+            "name": name,
+            "ticks": len(lateness),
+            "p50": _percentile(lateness, 0.5),
+            "p95": _percentile(lateness, 0.95),
+            "p99": _percentile(lateness, 0.99),
+            "max": lateness[-1] if lateness else 0,
+            "note_on_mean": sum(note_on) // max(1, len(note_on)),
+            "note_on_max": note_on[-1] if note_on else 0,
+            "note_off_mean": sum(note_off) // max(1, len(note_off)),
+            "note_off_max": note_off[-1] if note_off else 0,
+            "messages_per_second": len(self.uart.writes) / seconds if seconds else 0,
+            "sensing_max": self.seq.stats.max_late_sensing_ns,
+        }
+
+
+def format_table(results):
+    header = "{:<8} {:>6} {:>9} {:>9} {:>9} {:>9} {:>11} {:>11} {:>11} {:>11} {:>12} {:>8}".format(
+        "loop", "ticks", "p50 us", "p95 us", "p99 us", "max us",
+        "on mean us", "on max us", "off mean us", "off max us", "sensing max", "msg/s")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append("{:<8} {:>6} {:>9} {:>9} {:>9} {:>9} {:>11} {:>11} {:>11} {:>11} {:>12} {:>8.1f}".format(
+            r["name"], r["ticks"],
+            r["p50"] // 1000, r["p95"] // 1000, r["p99"] // 1000, r["max"] // 1000,
+            r["note_on_mean"] // 1000, r["note_on_max"] // 1000,
+            r["note_off_mean"] // 1000, r["note_off_max"] // 1000,
+            r["sensing_max"] // 1000, r["messages_per_second"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bpm", type=int, default=120)
+    parser.add_argument("--tpb", type=int, default=4, help="ticks per beat")
+    parser.add_argument("--seconds", type=int, default=60, help="virtual seconds to simulate")
+    parser.add_argument("--sensor-interval", type=float, default=1.0, help="seconds between sensor passes")
+    parser.add_argument("--output", help="also write the table to this file")
+    parser.add_argument("--max-p99-us", type=int, help="fail if the chunked loop's p99 tick jitter exceeds this")
+    args = parser.parse_args(argv)
+
+    duration_ns = args.seconds * 1000000000
+    interval_ns = int(args.sensor_interval * 1000000000)
+    results = [
+        Run(args.bpm, args.tpb, interval_ns, duration_ns).run_inline().report("inline"),
+        Run(args.bpm, args.tpb, interval_ns, duration_ns).run_chunked().report("chunked"),
+    ]
+    table = format_table(results)
+    print(table)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(table + "\n")
+
+    if args.max_p99_us is not None and results[1]["p99"] // 1000 > args.max_p99_us:
+        print("chunked p99 tick jitter {}us exceeds {}us".format(results[1]["p99"] // 1000, args.max_p99_us))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
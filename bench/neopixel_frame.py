@@ -0,0 +1,106 @@
+"""Per-frame cost of the Prop-Maker strip output.
+
+Renders the same frames two ways into a sink that just records what would
+go down the data line:
+
+  scaled   what the strip did before: every pixel's channels scaled by
+           brightness in Python and packed into a fresh buffer each frame
+  lut      StripRenderer: changed pixels only, through the gamma/brightness
+           table into a preallocated bytearray, one write per frame
+
+Frames come in three kinds: a fill that changes every pixel, a chase that
+changes two pixels, and an unchanged frame. Times are host times, so only
+the ratio between the two paths is meaningful.
+
+    python -m bench.neopixel_frame
+    python -m bench.neopixel_frame --pixels 60 --frames 2000
+"""
+import argparse
+import sys
+import time
+
+from lib.m4feather.strip import StripRenderer
+
+
+class FakeSink:
+    """A neopixel_write stand-in that counts calls and bytes."""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def __call__(self, pin, buf):
+        self.writes += 1
+        self.bytes += len(buf)
+
+
+def _frames(pixels, frames):
+    # yields (kind, list of (index, color)) changes, None index for a fill
+    for frame in range(frames):
+        kind = frame % 3
+        if kind == 0:
+            yield "fill", ((None, ((frame * 7) % 256, 40, 255 - (frame * 7) % 256)),)
+        elif kind == 1:
+            head = frame % pixels
+            yield "chase", ((head, (255, 255, 255)), ((head - 1) % pixels, (0, 0, 64)))
+        else:
+            yield "same", ()
+
+
+def scaled(pixels, frames, brightness, sink):
+    colors = [(0, 0, 0)] * pixels
+    costs = {}
+    for kind, changes in _frames(pixels, frames):
+        start = time.perf_counter_ns()
+        for index, color in changes:
+            if index is None:
+                colors = [color] * pixels
+            else:
+                colors[index] = color
+        buf = bytearray(3 * pixels)
+        for index, (r, g, b) in enumerate(colors):
+            buf[3 * index] = int(g * brightness)
+            buf[3 * index + 1] = int(r * brightness)
+            buf[3 * index + 2] = int(b * brightness)
+        sink(None, buf)
+        costs[kind] = costs.get(kind, 0) + time.perf_counter_ns() - start
+    return costs
+
+
+def lut(pixels, frames, brightness, sink):
+    renderer = StripRenderer(None, pixels, fps=1000000, brightness=brightness, write=sink)
+    costs = {}
+    now = 0
+    for kind, changes in _frames(pixels, frames):
+        start = time.perf_counter_ns()
+        for index, color in changes:
+            if index is None:
+                renderer.fill(color)
+            else:
+                renderer.set_pixel(index, color)
+        renderer.render(now)
+        costs[kind] = costs.get(kind, 0) + time.perf_counter_ns() - start
+        now += renderer.frame_ns
+    return costs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pixels", type=int, default=27)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--brightness", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    per_kind = args.frames // 3
+    print("{:<8} {:>8} {:>10} {:>10} {:>10} {:>10}".format("path", "writes", "bytes", "fill us", "chase us", "same us"))
+    for name, path in (("scaled", scaled), ("lut", lut)):
+        sink = FakeSink()
+        costs = path(args.pixels, args.frames, args.brightness, sink)
+        print("{:<8} {:>8} {:>10} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+            name, sink.writes, sink.bytes,
+            costs["fill"] / per_kind / 1000, costs["chase"] / per_kind / 1000, costs["same"] / per_kind / 1000))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
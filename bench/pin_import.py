@@ -0,0 +1,101 @@
+"""Import-time benchmark for pimoroni_physical_feather_pins.
+
+Stubs the microcontroller module and os.uname() so the package can be
+imported on a host, then times a fresh import of the package for each way
+the board can be found:
+
+  exact     os.uname().machine is listed in _case
+  partial   os.uname().machine only matches a _partial fragment
+  config    a feather_board_config module names the board, no probe at all
+
+It also times the first and the cached lookup of a pin.
+
+    python -m bench.pin_import
+"""
+import argparse
+import os
+import sys
+import time
+import types
+
+LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib")
+PACKAGE = "pimoroni_physical_feather_pins"
+CONFIG = "feather_board_config"
+
+MACHINES = {
+    "exact": "Adafruit Feather M4 Express with samd51j19",
+    "partial": "Adafruit Feather M4 Express with samd51j19a",
+}
+
+
+class _Pins:
+    def __getattr__(self, name):
+        return name
+
+
+class _Uname:
+    def __init__(self, machine):
+        self.machine = machine
+
+
+def _forget_package():
+    for name in list(sys.modules):
+        if name == PACKAGE or name.startswith(PACKAGE + ".") or name == CONFIG:
+            del sys.modules[name]
+
+
+def _time_import(mode, repeats):
+    real_uname = os.uname
+    if mode == "config":
+        os.uname = None  # a probe would fail loudly
+    else:
+        os.uname = lambda: _Uname(MACHINES[mode])
+    try:
+        total = 0
+        for _ in range(repeats):
+            _forget_package()
+            if mode == "config":
+                config = types.ModuleType(CONFIG)
+                config.BOARD = "m4"
+                sys.modules[CONFIG] = config
+            start = time.perf_counter_ns()
+            module = __import__(PACKAGE)
+            total += time.perf_counter_ns() - start
+        return total // repeats, module
+    finally:
+        os.uname = real_uname
+
+
+def _time_lookup(module, repeats):
+    start = time.perf_counter_ns()
+    module.pin8()
+    first = time.perf_counter_ns() - start
+    start = time.perf_counter_ns()
+    for _ in range(repeats):
+        module.pin8()
+    cached = (time.perf_counter_ns() - start) // repeats
+    return first, cached
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if LIB not in sys.path:
+        sys.path.insert(0, LIB)
+    microcontroller = types.ModuleType("microcontroller")
+    microcontroller.pin = _Pins()
+    sys.modules["microcontroller"] = microcontroller
+
+    print("{:<8} {:>10} {:>14} {:>15}".format("mode", "import us", "first pin ns", "cached pin ns"))
+    for mode in ("exact", "partial", "config"):
+        import_ns, module = _time_import(mode, args.repeats)
+        first, cached = _time_lookup(module, args.repeats)
+        print("{:<8} {:>10.1f} {:>14} {:>15}".format(mode, import_ns / 1000, first, cached))
+    _forget_package()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Event order and timing check for articulation.strum() into EventScheduler.
+
+Expands the banjo chord with a few strum profiles into a real
+EventScheduler, dispatches everything, and checks what comes out:
+
+  down      strings struck 0 to 4, one spread apart, velocity curve applied
+  up        the same, last string first
+  spread    a wide spread, note offs landing among later strikes
+  roll      2022sep10B's forward roll, explicit order and steps
+  rest      a muted string is skipped, nothing queued for it
+  humanize  seeded jitter stays within bounds and repeats for the same seed
+
+Every note off has to follow its own string's note on by exactly the gate,
+the thing the old add_strum() got wrong for string 1. Exits 1 if any check
+fails.
+
+    python -m bench.strum_check
+"""
+import random
+import sys
+
+from lib.m4feather import articulation
+from lib.m4feather.scales import REST
+from lib.m4feather.scheduler import EventScheduler
+
+TICK_NS = 1000000000
+STAMP = 5000000000
+# 2022sep10B's banjo tuning, G4 D3 G3 B3 D4, every string a different note
+CHORD = (79, 62, 67, 71, 74)
+
+
+class Recorder:
+    """An out for EventScheduler.dispatch() that keeps (time, note, velocity)."""
+
+    def __init__(self):
+        self.now = 0
+        self.events = []
+
+    def note_on(self, note, velocity):
+        self.events.append((self.now, note, velocity))
+
+
+def play(chord, profile, rng=random):
+    queue = EventScheduler(capacity=64)
+    struck = articulation.strum(queue, STAMP, TICK_NS, chord, profile, rng)
+    out = Recorder()
+    while len(queue):
+        # dispatch at each event's own time, so the recorded time is the time it was due
+        out.now = queue.next_time()
+        queue.dispatch(out.now, out)
+    return struck, out.events, queue
+
+
+class Check:
+    def __init__(self, name):
+        self.name = name
+        self.failures = []
+
+    def expect(self, ok, what):
+        if not ok:
+            self.failures.append(what)
+
+
+def _pairs(check, events, gate_ns):
+    """note -> (on time, velocity), checking each note off follows its own note on by gate_ns"""
+    ons = {}
+    offs = {}
+    for time_stamp, note, velocity in events:
+        if velocity:
+            check.expect(note not in ons, "note {} struck twice".format(note))
+            ons[note] = (time_stamp, velocity)
+        else:
+            check.expect(note in ons, "note off for {} before its note on".format(note))
+            offs[note] = time_stamp
+    check.expect(sorted(ons) == sorted(offs), "note ons {} but note offs {}".format(sorted(ons), sorted(offs)))
+    for note, (time_stamp, velocity) in ons.items():
+        if note in offs:
+            check.expect(offs[note] - time_stamp == gate_ns, "note {} off {} ns after its on, not {}".format(
+                note, offs[note] - time_stamp, gate_ns))
+    return ons
+
+
+def _in_order(check, events):
+    times = [event[0] for event in events]
+    check.expect(times == sorted(times), "events out of time order")
+
+
+def check_strum(name, profile, strings):
+    """strings: the string indices expected in strike order, one spread apart"""
+    check = Check(name)
+    struck, events, queue = play(CHORD, profile)
+    spread_ns = int(profile.spread * TICK_NS)
+    gate_ns = int(profile.gate * TICK_NS)
+    check.expect(struck == len(strings), "{} struck, expected {}".format(struck, len(strings)))
+    check.expect(len(events) == 2 * len(strings), "{} events, expected {}".format(len(events), 2 * len(strings)))
+    check.expect(queue.dropped == 0, "{} events dropped".format(queue.dropped))
+    _in_order(check, events)
+    ons = _pairs(check, events, gate_ns)
+    for position, string in enumerate(strings):
+        note = CHORD[string]
+        if note not in ons:
+            continue
+        time_stamp, velocity = ons[note]
+        check.expect(time_stamp == STAMP + position * spread_ns, "string {} struck at +{} ns, expected +{}".format(
+            string, time_stamp - STAMP, position * spread_ns))
+        expected = profile.velocities[min(position, len(profile.velocities) - 1)]
+        check.expect(velocity == expected, "string {} velocity {}, expected {}".format(string, velocity, expected))
+    return check
+
+
+def check_roll():
+    check = Check("roll")
+    roll = articulation.StrumProfile(order=(2, 3, 1, 4, 0), steps=(0, 1, 2, 3, 0), spread=1 / 10,
+                                     velocities=(90, 90, 90, 90, 45), gate=.7)
+    struck, events, queue = play(CHORD, roll)
+    check.expect(struck == 5, "{} struck, expected 5".format(struck))
+    _in_order(check, events)
+    ons = _pairs(check, events, int(roll.gate * TICK_NS))
+    spread_ns = int(roll.spread * TICK_NS)
+    for position, string in enumerate(roll.order):
+        time_stamp, velocity = ons[CHORD[string]]
+        check.expect(time_stamp == STAMP + roll.steps[position] * spread_ns,
+                     "string {} struck at +{} ns".format(string, time_stamp - STAMP))
+        check.expect(velocity == roll.velocities[position], "string {} velocity {}".format(string, velocity))
+    return check
+
+
+def check_rest():
+    check = Check("rest")
+    chord = (CHORD[0], REST, CHORD[2], None, CHORD[4])
+    profile = articulation.StrumProfile(spread=0.01, velocities=(80,), gate=0.5)
+    struck, events, queue = play(chord, profile)
+    check.expect(struck == 3, "{} struck, expected 3".format(struck))
+    check.expect({event[1] for event in events} == {CHORD[0], CHORD[2], CHORD[4]}, "a muted string sounded")
+    _pairs(check, events, int(profile.gate * TICK_NS))
+    # positions still count for muted strings, so the spacing doesn't close up
+    times = sorted(event[0] for event in events if event[2])
+    spread_ns = int(profile.spread * TICK_NS)
+    check.expect(times == [STAMP, STAMP + 2 * spread_ns, STAMP + 4 * spread_ns], "strikes at {}".format(times))
+    return check
+
+
+def check_humanize():
+    check = Check("humanize")
+    profile = articulation.StrumProfile(spread=0.01, velocities=(120, 60), gate=0.2,
+                                        humanize_time=0.002, humanize_velocity=10)
+    jitter_ns = int(profile.humanize_time * TICK_NS)
+    spread_ns = int(profile.spread * TICK_NS)
+    first = play(CHORD, profile, random.Random(1234))[1]
+    second = play(CHORD, profile, random.Random(1234))[1]
+    check.expect(first == second, "the same seed gave different events")
+    _in_order(check, first)
+    ons = _pairs(check, first, int(profile.gate * TICK_NS))
+    moved = 0
+    for string in range(len(CHORD)):
+        time_stamp, velocity = ons[CHORD[string]]
+        nominal = STAMP + string * spread_ns
+        moved += time_stamp != nominal
+        check.expect(STAMP <= time_stamp and abs(time_stamp - nominal) <= jitter_ns,
+                     "string {} jittered to +{} ns".format(string, time_stamp - STAMP))
+        expected = profile.velocities[min(string, 1)]
+        check.expect(1 <= velocity <= 127 and abs(velocity - expected) <= profile.humanize_velocity,
+                     "string {} velocity {}".format(string, velocity))
+    check.expect(moved, "humanize didn't move any strike")
+    return check
+
+
+def main(argv=None):
+    strum = articulation.StrumProfile(spread=1 / 500, velocities=(45, 90, 90, 90, 90), gate=.7)
+    up = articulation.StrumProfile(direction=articulation.UP, spread=1 / 500, velocities=(100, 80, 60), gate=.5)
+    wide = articulation.StrumProfile(spread=1 / 4, velocities=(90,), gate=.3)
+    checks = (
+        check_strum("down", strum, (0, 1, 2, 3, 4)),
+        check_strum("up", up, (4, 3, 2, 1, 0)),
+        check_strum("spread", wide, (0, 1, 2, 3, 4)),
+        check_roll(),
+        check_rest(),
+        check_humanize(),
+    )
+    failed = 0
+    for check in checks:
+        print("{:<10} {}".format(check.name, "ok" if not check.failures else "FAILED"))
+        for failure in check.failures:
+            print("    " + failure)
+        failed += bool(check.failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Cost of alert tones and how often one alert cuts off another.
+
+Builds the alert tones two ways:
+
+  rebuild  what play_sound() did: the wavetable worked out with math.sin
+           into a new array every time the tone is played
+  library  ToneLibrary: built the first time, a cache hit after that
+
+then fires pairs of alerts (gas then prox, a short gap apart) through a
+VoiceAllocator on a fake mixer and on a single output, counting how many
+were cut short. Times are host times, so only the ratio between the two
+build paths is meaningful.
+
+    python -m bench.tone_alerts
+    python -m bench.tone_alerts --plays 500 --gap-ms 50 --voices 3
+"""
+import argparse
+import sys
+import time
+
+from bench.fakes import FakeAudiocore, FakeMixer, VirtualClock
+from lib.m4feather import tones
+
+SOUNDS = (
+    (tones.SQUARE, 880, 0.1, 0.5),
+    (tones.CHIRP, 600, 1800, 0.25, 0.2),
+    (tones.SINE, 440, 0.1),
+)
+
+
+def rebuild(plays):
+    start = time.perf_counter_ns()
+    for play in range(plays):
+        sound = SOUNDS[play % len(SOUNDS)]
+        FakeAudiocore.RawSample(tones._BUILDERS[sound[0]](*sound[1:]), sample_rate=tones.SAMPLE_RATE)
+    return time.perf_counter_ns() - start, None
+
+
+def library(plays):
+    cache = tones.ToneLibrary(FakeAudiocore)
+    start = time.perf_counter_ns()
+    for play in range(plays):
+        cache.get(*SOUNDS[play % len(SOUNDS)])
+    return time.perf_counter_ns() - start, cache
+
+
+def overlap(pairs, gap_ms, voice_count):
+    # returns (played, cut short)
+    clock = VirtualClock()
+    cache = tones.ToneLibrary(FakeAudiocore)
+    mixer = FakeMixer(clock, voice_count)
+    voices = tones.VoiceAllocator(mixer) if voice_count > 1 else None
+    for pair in range(pairs):
+        for sound, seconds in ((SOUNDS[0], 0.3), (SOUNDS[1], None)):
+            sample = cache.get(*sound)
+            if voices is not None:
+                voices.play(sample, clock.now, seconds)
+            else:
+                mixer.voice[0].play(sample, loop=seconds is not None)
+            clock.advance(gap_ms * 1000000)
+            if voices is not None:
+                voices.service(clock.now)
+        clock.advance(1000000000)
+        if voices is not None:
+            voices.service(clock.now)
+        else:
+            mixer.voice[0].stop()
+    # the allocator stops a busy voice before reusing it, so those don't show up in FakeVoice.cut
+    stolen = 0 if voices is None else voices.stolen
+    return 2 * pairs, stolen + sum(voice.cut for voice in mixer.voice)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=300)
+    parser.add_argument("--gap-ms", type=int, default=100)
+    parser.add_argument("--voices", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print("{:<8} {:>8} {:>12} {:>12}".format("path", "plays", "total ms", "per play us"))
+    for name, path in (("rebuild", rebuild), ("library", library)):
+        spent, cache = path(args.plays)
+        print("{:<8} {:>8} {:>12.1f} {:>12.1f}".format(name, args.plays, spent / 1000000, spent / args.plays / 1000))
+        if cache is not None:
+            cache.report()
+
+    print()
+    print("{:<8} {:>8} {:>8}".format("output", "alerts", "cut"))
+    for name, voice_count in (("single", 1), ("mixer", args.voices)):
+        played, cut = overlap(args.plays // 2, args.gap_ms, voice_count)
+        print("{:<8} {:>8} {:>8}".format(name, played, cut))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Strip effects that draw straight into a StripRenderer's staged frame.
+
+Everything that can be is worked out once into a small bytearray table
+(the colour wheel, a pulse curve, chase tails, keyframe colours, meter
+gradients), and the position in an effect comes from the time since it
+started, not from how often it was drawn. Drawing copies bytes from the
+tables into the frame, so no tuples are made per pixel.
+
+    animator = Animator(renderer)
+    animator.play(Rainbow(period_ms=4000), time.monotonic_ns())
+    animator.render(time.monotonic_ns())
+"""
+import math
+
+MS = 1000000
+
+
+def wheel_table():
+    """RGB for 256 hues round the colour wheel, like rainbowio.colorwheel"""
+    table = bytearray(3 * 256)
+    for hue in range(256):
+        if hue < 85:
+            r, g, b = 255 - hue * 3, hue * 3, 0
+        elif hue < 170:
+            position = hue - 85
+            r, g, b = 0, 255 - position * 3, position * 3
+        else:
+            position = hue - 170
+            r, g, b = position * 3, 0, 255 - position * 3
+        table[3 * hue] = r
+        table[3 * hue + 1] = g
+        table[3 * hue + 2] = b
+    return table
+
+
+def pulse_table(steps=64):
+    """One breath, 0 up to 255 and back, as a raised cosine"""
+    table = bytearray(steps)
+    for step in range(steps):
+        table[step] = int((1 - math.cos(2 * math.pi * step / steps)) / 2 * 255 + 0.5)
+    return table
+
+
+def gradient_table(start, end, steps):
+    """steps RGB colours from start to end"""
+    table = bytearray(3 * steps)
+    for step in range(steps):
+        fraction = step / (steps - 1) if steps > 1 else 0
+        for channel in range(3):
+            table[3 * step + channel] = int(start[channel] + (end[channel] - start[channel]) * fraction + 0.5)
+    return table
+
+
+def _fill(frame, r, g, b):
+    for i in range(0, len(frame), 3):
+        frame[i] = r
+        frame[i + 1] = g
+        frame[i + 2] = b
+
+
+_WHEEL = None
+
+
+def _wheel():
+    # shared by every Rainbow, built the first time one is made
+    global _WHEEL
+    if _WHEEL is None:
+        _WHEEL = wheel_table()
+    return _WHEEL
+
+
+class Solid:
+    """Fill with whatever color (a list, say, updated elsewhere) holds when drawn"""
+
+    def __init__(self, color):
+        self.color = color
+
+    def draw(self, frame, count, elapsed_ms):
+        color = self.color
+        _fill(frame, int(color[0]), int(color[1]), int(color[2]))
+
+
+class Rainbow:
+    """The colour wheel spread along the strip, turning once every period_ms"""
+
+    def __init__(self, period_ms=5000, spread=256):
+        self.period_ms = period_ms
+        self.spread = spread
+        self.wheel = _wheel()
+
+    def draw(self, frame, count, elapsed_ms):
+        wheel = self.wheel
+        phase = (elapsed_ms * 256 // self.period_ms) & 0xFF
+        for index in range(count):
+            source = 3 * ((phase + index * self.spread // count) & 0xFF)
+            i = 3 * index
+            frame[i] = wheel[source]
+            frame[i + 1] = wheel[source + 1]
+            frame[i + 2] = wheel[source + 2]
+
+
+class Chase:
+    """A head of color with a fading tail running along the strip, once every period_ms"""
+
+    def __init__(self, color, tail=5, period_ms=1500, background=(0, 0, 0)):
+        self.period_ms = period_ms
+        self.background = background
+        # the head and its tail, brightest first
+        self.tail = gradient_table(color, background, tail + 1)
+
+    def draw(self, frame, count, elapsed_ms):
+        background = self.background
+        _fill(frame, background[0], background[1], background[2])
+        head = (elapsed_ms * count // self.period_ms) % count
+        tail = self.tail
+        for step in range(len(tail) // 3):
+            i = 3 * ((head - step) % count)
+            source = 3 * step
+            frame[i] = tail[source]
+            frame[i + 1] = tail[source + 1]
+            frame[i + 2] = tail[source + 2]
+
+
+class Pulse:
+    """The whole strip breathing color, one breath every period_ms"""
+
+    def __init__(self, color, period_ms=2500, steps=64):
+        self.period_ms = period_ms
+        self.curve = pulse_table(steps)
+        # every brightness the pulse can reach, so drawing is a copy
+        self.levels = gradient_table((0, 0, 0), color, 256)
+
+    def draw(self, frame, count, elapsed_ms):
+        curve = self.curve
+        source = 3 * curve[(elapsed_ms * len(curve) // self.period_ms) % len(curve)]
+        levels = self.levels
+        _fill(frame, levels[source], levels[source + 1], levels[source + 2])
+
+
+class Keyframes:
+    """Colours at times within period_ms, blended between and looped, baked into steps frames
+
+    :param keys: (ms, (r, g, b)) pairs in time order, the first at 0
+    """
+
+    def __init__(self, keys, period_ms, steps=64):
+        self.period_ms = period_ms
+        self.steps = steps
+        self.table = bytearray(3 * steps)
+        for step in range(steps):
+            at = step * period_ms / steps
+            before = keys[0]
+            after = None
+            for key in keys:
+                if key[0] <= at:
+                    before = key
+                else:
+                    after = key
+                    break
+            if after is None:
+                # blend back round to the first key
+                after = (period_ms, keys[0][1])
+            span = after[0] - before[0]
+            fraction = (at - before[0]) / span if span else 0
+            for channel in range(3):
+                start = before[1][channel]
+                self.table[3 * step + channel] = int(start + (after[1][channel] - start) * fraction + 0.5)
+
+    def draw(self, frame, count, elapsed_ms):
+        source = 3 * ((elapsed_ms * self.steps // self.period_ms) % self.steps)
+        table = self.table
+        _fill(frame, table[source], table[source + 1], table[source + 2])
+
+
+class Meter:
+    """A bar graph of level (0 to 1, set by a sensor task) that goes from low to high colour along the strip"""
+
+    def __init__(self, count, low=(0, 255, 0), high=(255, 0, 0), background=(0, 0, 0)):
+        self.level = 0.0
+        self.background = background
+        self.gradient = gradient_table(low, high, count)
+
+    def draw(self, frame, count, elapsed_ms):
+        level = self.level
+        lit = int(level * count + 0.5) if level > 0 else 0
+        if lit > count:
+            lit = count
+        gradient = self.gradient
+        frame[0:3 * lit] = gradient[0:3 * lit]
+        background = self.background
+        for i in range(3 * lit, 3 * count, 3):
+            frame[i] = background[0]
+            frame[i + 1] = background[1]
+            frame[i + 2] = background[2]
+
+
+class Animator:
+    """Draws the current effect into a StripRenderer and crossfades when the effect changes.
+
+    :param renderer: the StripRenderer to draw into
+    :param fade_ms: crossfade time when play() switches effects, 0 to cut (default 400)
+    """
+
+    def __init__(self, renderer, fade_ms=400):
+        self.renderer = renderer
+        self.fade_ns = fade_ms * MS
+        self.effect = None
+        self._started = 0
+        self._previous = None
+        self._previous_started = 0
+        self._old = bytearray(len(renderer.staged))
+
+    def play(self, effect, now):
+        if self.effect is not None and self.fade_ns:
+            self._previous = self.effect
+            self._previous_started = self._started
+        self.effect = effect
+        self._started = now
+
+    def _blend(self, now):
+        # mix the outgoing effect's frame into the staged one, weight 0-256
+        since = now - self._started
+        if since >= self.fade_ns:
+            self._previous = None
+            return
+        weight = since * 256 // self.fade_ns
+        old = self._old
+        count = self.renderer.count
+        self._previous.draw(old, count, (now - self._previous_started) // MS)
+        frame = self.renderer.staged
+        for i in range(len(frame)):
+            frame[i] = (frame[i] * weight + old[i] * (256 - weight)) >> 8
+
+    def render(self, now):
+        """Draw the frame for now and hand it to the renderer. Returns True if it was pushed."""
+        renderer = self.renderer
+        if not renderer.due(now):
+            # not due, don't bother drawing
+            return False
+        if self.effect is not None:
+            self.effect.draw(renderer.staged, renderer.count, (now - self._started) // MS)
+            if self._previous is not None:
+                self._blend(now)
+        return renderer.render(now)
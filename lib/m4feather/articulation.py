@@ -0,0 +1,103 @@
+import random
+
+DOWN = 0
+UP = 1
+
+
+class StrumProfile:
+    """Describes how a chord shape is spread out in time when it is played.
+
+    Offsets and gate lengths are given as fractions of a sequencer tick, so a
+    profile keeps its feel when the tempo changes.
+    """
+
+    def __init__(self, direction=DOWN, spread=0.002, velocities=(90,), gate=0.7,
+                 order=None, steps=None, humanize_time=0.0, humanize_velocity=0):
+        """__init__
+
+        :param int direction: DOWN strikes string 0 first, UP strikes the last string first (ignored if order is given)
+
+        :param float spread: fraction of a tick between one struck string and the next
+
+        :param velocities: velocity curve, one entry per struck string (the last entry repeats if it is short)
+
+        :param float gate: fraction of a tick each note sounds for, None to let the strings ring
+
+        :param order: explicit string indices in the order they are struck, for rolls and picking patterns
+
+        :param steps: how many spreads after the first strike each string sounds (default 0, 1, 2, ...)
+
+        :param float humanize_time: random timing jitter, as a fraction of a tick either side
+
+        :param int humanize_velocity: random velocity jitter either side
+        """
+        self.direction = direction
+        self.spread = spread
+        self.velocities = tuple(velocities)
+        self.gate = gate
+        self.order = None if order is None else tuple(order)
+        self.steps = None if steps is None else tuple(steps)
+        self.humanize_time = humanize_time
+        self.humanize_velocity = humanize_velocity
+
+
+def strum(scheduler, stamp, tick_ns, chord, profile, rng=random):
+    """strum
+
+    :param scheduler: an EventScheduler (or anything with add(time_stamp, note, velocity))
+
+    :param int stamp: monotonic_ns time of the first strike
+
+    :param int tick_ns: length of a sequencer tick in nanoseconds
+
+    :param chord: MIDI note per string, a REST (-1) or None string is skipped
+
+    :param StrumProfile profile: how to spread the chord out
+
+    :param rng: source of randint() for humanizing, swap in a seeded random.Random for repeatable output
+
+    Queues a note on (and a note off, if the profile has a gate) for every
+    struck string. Returns the number of strings struck.
+    """
+    strings = len(chord)
+    order = profile.order
+    steps = profile.steps
+    velocities = profile.velocities
+    last_velocity = len(velocities) - 1
+    spread_ns = int(profile.spread * tick_ns)
+    gate_ns = None if profile.gate is None else int(profile.gate * tick_ns)
+    jitter_ns = int(profile.humanize_time * tick_ns)
+    jitter_velocity = profile.humanize_velocity
+    positions = strings if order is None else len(order)
+    struck = 0
+
+    for position in range(positions):
+        if order is not None:
+            string = order[position]
+        elif profile.direction == UP:
+            string = strings - 1 - position
+        else:
+            string = position
+        note = chord[string]
+        if note is None or note < 0:
+            continue
+
+        step = position if steps is None else steps[position]
+        time_stamp = stamp + step * spread_ns
+        velocity = velocities[min(position, last_velocity)]
+        if jitter_ns:
+            time_stamp += rng.randint(-jitter_ns, jitter_ns)
+            if time_stamp < stamp:
+                time_stamp = stamp
+        if jitter_velocity:
+            velocity += rng.randint(-jitter_velocity, jitter_velocity)
+        if velocity < 1:
+            velocity = 1
+        elif velocity > 127:
+            velocity = 127
+
+        scheduler.add(time_stamp, note, velocity)
+        if gate_ns is not None:
+            scheduler.add(time_stamp + gate_ns, note, 0)
+        struck += 1
+    return struck
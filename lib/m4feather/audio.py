@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+from .tones import SINE, SAMPLE_RATE
+
+_TONE = 0
+_FILE = 1
+
+
+class AudioPlayer:
+    """Plays a queue of tones and WAV files on an AudioOut from its own task, with alerts over the top.
+
+    Tones come from a ToneLibrary, built once and cached there.
+    WAV files are streamed from flash through one preallocated buffer,
+    which WaveFile splits in two and refills one half while the other
+    plays. Each file is closed as soon as it ends or is skipped.
+
+        player = AudioPlayer(audio, audiocore, ToneLibrary(audiocore), VoiceAllocator(mixer))
+        player.play_tone(440, 0.1, 0.1)
+        player.play_file("StreetChicken.wav")
+        player.alert(tones.CHIRP, 600, 1800, 0.25, 0.2)
+        await player.run()
+
+    With a VoiceAllocator the queue plays on the mixer's first voice and
+    alerts on the others, so they sound together. The mixer only takes
+    samples in its own format, so WAVs need to be tones.SAMPLE_RATE, mono,
+    16 bit signed; anything else is skipped with a message. Without one
+    the queue plays straight on audio and an alert cuts in ahead of it.
+
+    CircuitPython refills the buffer in the background, between bytecodes.
+    A long blocking call (a display refresh, say) can starve it, and there
+    is no direct way to see that. run() wakes every poll_ms, so a gap
+    between wake-ups longer than one buffer half counts as an underrun.
+
+    :param audio: an audioio.AudioOut (or stand-in)
+    :param audiocore: the audiocore module, for WaveFile
+    :param tones: the ToneLibrary tones and alerts come from
+    :param voices: a VoiceAllocator over a mixer playing on audio, or None
+    :param buffer_size: bytes in the streaming buffer, both halves (default 4096)
+    :param poll_ms: how often run() checks on playback (default 20)
+    """
+
+    def __init__(self, audio, audiocore, tones, voices=None, buffer_size=4096, poll_ms=20):
+        self.audio = audio
+        self.audiocore = audiocore
+        self.tones = tones
+        self.voices = voices
+        # where the queue plays
+        self.out = audio if voices is None else voices.music
+        self.buffer = bytearray(buffer_size)
+        self.poll_ms = poll_ms
+        self.queue = []
+        self.current = None
+        self._file = None
+        self._wave = None
+        self._stop_at = None
+        self._half_ns = None
+        self._last_wake = None
+        self.played = 0
+        self.alerts = 0
+        self.underruns = 0
+        self.max_gap_ns = 0
+
+    def play_tone(self, frequency, volume=0.1, seconds=0.1, kind=SINE):
+        self.queue.append((_TONE, (kind, frequency, volume), seconds))
+
+    def play_file(self, path):
+        self.queue.append((_FILE, path, None))
+
+    def _close(self):
+        if self._wave is not None:
+            self._wave.deinit()
+            self._wave = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._half_ns = None
+
+    def _finish(self):
+        self.out.stop()
+        self._close()
+        self.current = None
+        self._stop_at = None
+
+    def next(self):
+        """Skip what's playing, the queue carries on"""
+        if self.current is not None:
+            self._finish()
+
+    def stop(self):
+        """Stop playing, alerts too, and empty the queue"""
+        self.queue = []
+        self.next()
+        if self.voices is not None:
+            self.voices.stop()
+
+    def alert(self, kind, *params, seconds=None):
+        """Sound a tone now, looped for seconds if given (sine and square), once if not (chirp)"""
+        sample = self.tones.get(kind, *params)
+        self.alerts += 1
+        if self.voices is not None:
+            self.voices.play(sample, time.monotonic_ns(), seconds)
+            return
+        self.queue.insert(0, (_TONE, (kind,) + params, seconds))
+        self.next()
+
+    def _start(self, entry, now):
+        kind, what, seconds = entry
+        if kind == _TONE:
+            self.out.play(self.tones.get(*what), loop=seconds is not None)
+            if seconds is not None:
+                self._stop_at = now + int(seconds * 1000000000)
+        else:
+            try:
+                self._file = open(what, "rb")
+            except OSError as e:
+                print("Can't play {}: {}".format(what, e))
+                return
+            try:
+                self._wave = self.audiocore.WaveFile(self._file, self.buffer)
+            except (OSError, ValueError) as e:
+                # not a WAV, or one WaveFile can't read
+                print("Can't play {}: {}".format(what, e))
+                self._close()
+                return
+            bytes_per_second = self._wave.sample_rate * self._wave.channel_count * self._wave.bits_per_sample // 8
+            self._half_ns = len(self.buffer) // 2 * 1000000000 // bytes_per_second
+            try:
+                self.out.play(self._wave)
+            except ValueError as e:
+                # the mixer won't take a different format, say what it wants so the file can be converted
+                print("Can't play {}: {} ({} Hz, {} channel, {} bit; the mixer wants {} Hz, mono, 16 bit signed)".format(
+                    what, e, self._wave.sample_rate, self._wave.channel_count, self._wave.bits_per_sample,
+                    SAMPLE_RATE))
+                self._close()
+                return
+        self.current = entry
+        self.played += 1
+
+    def service(self, now):
+        """Move the queue along, run() calls this every poll_ms"""
+        if self._last_wake is not None and self._half_ns is not None:
+            gap = now - self._last_wake
+            if gap > self.max_gap_ns:
+                self.max_gap_ns = gap
+            if gap > self._half_ns:
+                self.underruns += 1
+        self._last_wake = now
+        if self.current is not None:
+            if self._stop_at is not None and now >= self._stop_at:
+                self._finish()
+            elif self._stop_at is None and not self.out.playing:
+                self._finish()
+        if self.voices is not None:
+            self.voices.service(now)
+        if self.current is None and self.queue:
+            self._start(self.queue.pop(0), now)
+
+    async def run(self):
+        delay = self.poll_ms / 1000
+        try:
+            while True:
+                self.service(time.monotonic_ns())
+                await asyncio.sleep(delay)
+        finally:
+            self.stop()
+
+    def report(self):
+        print("audio: {} played, {} queued, {} alerts, {} underruns, longest gap {:.1f} ms".format(
+            self.played, len(self.queue), self.alerts, self.underruns, self.max_gap_ns / 1000000))
+        if self.voices is not None:
+            print("voices: {} alerts played, {} cut short".format(self.voices.played, self.voices.stolen))
+        self.tones.report()
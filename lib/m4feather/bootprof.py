@@ -0,0 +1,89 @@
+import time
+
+from .loader import mem_free
+
+
+def format_table(rows, title="stage"):
+    """rows of (name, nanoseconds, bytes) -> list of printable lines, with a total"""
+    lines = ["{:<40} {:>8} {:>8}".format(title, "ms", "bytes")]
+    total_ns = 0
+    total_bytes = 0
+    for name, ns, used in rows:
+        lines.append("{:<40} {:>8.1f} {:>8}".format(name, ns / 1000000, used))
+        total_ns += ns
+        total_bytes += used
+    lines.append("{:<40} {:>8.1f} {:>8}".format("total", total_ns / 1000000, total_bytes))
+    return lines
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._free = mem_free()
+        self._start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.record(self._name, time.monotonic_ns() - self._start, self._free - mem_free())
+        return False
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """Times boot stages and the heap they use.
+
+        boot = Profiler()
+        with boot.stage("i2c scan"):
+            inventory = discovery.discover(i2cbus)
+        boot.report()
+
+    A disabled profiler hands back one shared do-nothing context manager, so
+    the stages can stay in the code for good. A stage that runs again (an
+    add-on re-attaching) replaces its row, so the table doesn't grow.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, ns, used):
+        stages = self.stages
+        for i in range(len(stages)):
+            if stages[i][0] == name:
+                stages[i] = (name, ns, used)
+                return
+        stages.append((name, ns, used))
+
+    def report(self, path=None):
+        """Print the stage table, and also write it to path if one is given"""
+        if not self.enabled:
+            return
+        lines = format_table(self.stages)
+        for line in lines:
+            print(line)
+        if path:
+            try:
+                with open(path, "w") as f:
+                    for line in lines:
+                        f.write(line + "\n")
+            except OSError as e:
+                # the filesystem is read only unless boot.py remounted it
+                print("Couldn't write boot profile to", path, e)
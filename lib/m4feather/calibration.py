@@ -0,0 +1,169 @@
+import struct
+
+MAGIC = b"NCal"
+# magic, then min and max for each axis
+_FORMAT = "<4s6H"
+NVM_SIZE = struct.calcsize(_FORMAT)
+
+MS = 1000000
+
+
+class AccelCalibration:
+    """Self-adjusting min/max for the nunchuk's three acceleration axes.
+
+    A reading outside the range widens it straight away. Every update_ms
+    both ends are pulled a little towards the most recent reading, so a
+    single bump only stretches the range for about decay_s seconds instead
+    of for good. Whenever the range moves, a scale and offset are worked
+    out for each axis, so mapping a sample is one multiply-add:
+
+        calibration = AccelCalibration()
+        calibration.load(microcontroller.nvm)
+        calibration.observe(now_ns, ax, ay, az)
+        calibration.apply(ax, ay, az, triplet)
+
+    The ranges can be saved to microcontroller.nvm so the next boot starts
+    warmed up. save_if_due() limits how often that happens, flash wears.
+
+    :param out_min: what the bottom of the range maps to (default 0)
+    :param out_max: what the top of the range maps to (default 255)
+    :param decay_s: roughly how long an out of the ordinary reading keeps the range stretched (default 60)
+    :param update_ms: how often the range decays (default 500)
+    :param min_span: the range never gets narrower than this, so noise isn't blown up (default 40)
+    """
+
+    def __init__(self, out_min=0, out_max=255, decay_s=60, update_ms=500, min_span=40):
+        self.out_min = out_min
+        self.out_max = out_max
+        self.update_ns = update_ms * MS
+        # fraction of the gap closed each update
+        self.decay = update_ms / 1000 / decay_s
+        self.min_span = min_span
+        self.minimum = [0.0, 0.0, 0.0]
+        self.maximum = [0.0, 0.0, 0.0]
+        self.scale = [0.0, 0.0, 0.0]
+        self.offset = [0.0, 0.0, 0.0]
+        self._last = [0, 0, 0]
+        self._next_update = None
+        self._saved = None
+        self._next_save = None
+        self.warm = False
+        self.updates = 0
+        self.saves = 0
+
+    def _recompute(self, axis):
+        low = self.minimum[axis]
+        span = self.maximum[axis] - low
+        if span < self.min_span:
+            # keep the narrow range centered
+            low -= (self.min_span - span) / 2
+            span = self.min_span
+        scale = (self.out_max - self.out_min) / span
+        self.scale[axis] = scale
+        self.offset[axis] = self.out_min - low * scale
+        self.updates += 1
+
+    def _start(self, x, y, z):
+        for axis, value in enumerate((x, y, z)):
+            self.minimum[axis] = value
+            self.maximum[axis] = value
+            self._recompute(axis)
+        self.warm = True
+
+    def _widen(self, axis, value):
+        if value < self.minimum[axis]:
+            self.minimum[axis] = value
+        elif value > self.maximum[axis]:
+            self.maximum[axis] = value
+        else:
+            return
+        self._recompute(axis)
+
+    def _decay(self):
+        for axis in range(3):
+            value = self._last[axis]
+            self.minimum[axis] += (value - self.minimum[axis]) * self.decay
+            self.maximum[axis] += (value - self.maximum[axis]) * self.decay
+            self._recompute(axis)
+
+    def observe(self, now, x, y, z):
+        """Take a reading into account, now in nanoseconds"""
+        if not self.warm:
+            self._start(x, y, z)
+        else:
+            self._widen(0, x)
+            self._widen(1, y)
+            self._widen(2, z)
+        last = self._last
+        last[0] = x
+        last[1] = y
+        last[2] = z
+        if self._next_update is None:
+            self._next_update = now + self.update_ns
+        elif now >= self._next_update:
+            self._next_update = now + self.update_ns
+            self._decay()
+
+    def map(self, axis, value):
+        mapped = int(value * self.scale[axis] + self.offset[axis])
+        if mapped < self.out_min:
+            return self.out_min
+        if mapped > self.out_max:
+            return self.out_max
+        return mapped
+
+    def apply(self, x, y, z, out):
+        """Map a reading into out[0:3] (a list, say) without allocating"""
+        out[0] = self.map(0, x)
+        out[1] = self.map(1, y)
+        out[2] = self.map(2, z)
+
+    def _packed(self):
+        values = []
+        for axis in range(3):
+            values.append(max(0, min(0xFFFF, int(self.minimum[axis]))))
+            values.append(max(0, min(0xFFFF, int(self.maximum[axis] + 0.5))))
+        return struct.pack(_FORMAT, MAGIC, *values)
+
+    def load(self, nvm, offset=0):
+        """Start from ranges saved by save(). Returns False if there weren't any."""
+        data = bytes(nvm[offset:offset + NVM_SIZE])
+        if len(data) != NVM_SIZE:
+            return False
+        fields = struct.unpack(_FORMAT, data)
+        if fields[0] != MAGIC:
+            return False
+        for axis in range(3):
+            low = fields[1 + 2 * axis]
+            high = fields[2 + 2 * axis]
+            if high < low:
+                return False
+            self.minimum[axis] = low
+            self.maximum[axis] = high
+            self._last[axis] = (low + high) / 2
+            self._recompute(axis)
+        self.warm = True
+        self._saved = data
+        return True
+
+    def save(self, nvm, offset=0):
+        """Write the ranges to nvm, only if they changed since the last save or load"""
+        if not self.warm:
+            return False
+        data = self._packed()
+        if data == self._saved:
+            return False
+        nvm[offset:offset + NVM_SIZE] = data
+        self._saved = data
+        self.saves += 1
+        return True
+
+    def save_if_due(self, now, nvm, offset=0, interval_s=600):
+        """save() at most every interval_s seconds"""
+        if self._next_save is None:
+            self._next_save = now + interval_s * 1000000000
+            return False
+        if now < self._next_save:
+            return False
+        self._next_save = now + interval_s * 1000000000
+        return self.save(nvm, offset)
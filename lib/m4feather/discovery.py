@@ -0,0 +1,100 @@
+from .i2c_meter import lock
+
+PROBE_SCAN = 0  # present if it answers the bus scan
+PROBE_ACK = 1  # present if it acknowledges its address, for devices the scan misses
+PROBE_ID = 2  # present if its ID register holds the expected value
+
+NUNCHUK = "nunchuk"
+LTR559 = "ltr559"
+BME280 = "bme280"
+LIS3DH = "lis3dh"
+
+# name, address, probe method, ID register, expected ID
+PROBES = (
+    # the nunchuk doesn't show up on scans for unknown reasons, so check it by address
+    (NUNCHUK, 0x52, PROBE_ACK, None, None),
+    # Enviro+ light/proximity sensor, PART_ID register
+    (LTR559, 0x23, PROBE_ID, 0x86, 0x92),
+    # Enviro+ temperature/pressure/humidity sensor, chip ID register
+    (BME280, 0x76, PROBE_ID, 0xD0, 0x60),
+    # Prop-Maker accelerometer, WHO_AM_I register
+    (LIS3DH, 0x18, PROBE_ID, 0x0F, 0x33),
+)
+
+
+class Inventory:
+    """What was found on the I2C bus, one attribute per probed device."""
+
+    def __init__(self, addresses, found):
+        self.addresses = addresses
+        self.found = found
+        self.nunchuk = NUNCHUK in found
+        self.ltr559 = LTR559 in found
+        self.bme280 = BME280 in found
+        self.lis3dh = LIS3DH in found
+
+    @property
+    def enviro(self):
+        return self.ltr559 and self.bme280
+
+    @property
+    def prop_maker(self):
+        return self.lis3dh
+
+    def __contains__(self, name):
+        return name in self.found
+
+    def __repr__(self):
+        return "I2C addresses found: {} devices: {}".format(
+            [hex(address) for address in self.addresses], sorted(self.found))
+
+    __str__ = __repr__
+
+
+def _ack(i2c, address):
+    try:
+        i2c.writeto(address, b"")
+        return True
+    except OSError:
+        pass
+    # some ports don't like writing an empty bytestring, retry by reading a byte
+    try:
+        i2c.readfrom_into(address, bytearray(1))
+        return True
+    except OSError:
+        return False
+
+
+def _read_id(i2c, address, register):
+    result = bytearray(1)
+    try:
+        i2c.writeto_then_readfrom(address, bytes((register,)), result)
+    except OSError:
+        return None
+    return result[0]
+
+
+def probe(i2c, addresses, entry):
+    """Run one probe table entry against an already locked bus"""
+    name, address, method, register, expected = entry
+    if method == PROBE_ACK:
+        return address in addresses or _ack(i2c, address)
+    if address not in addresses:
+        return False
+    if method == PROBE_ID:
+        return _read_id(i2c, address, register) == expected
+    return True
+
+
+def discover(i2c, probes=PROBES):
+    """Scan the bus once and run the probe table. Returns an Inventory."""
+    lock(i2c)
+    try:
+        addresses = i2c.scan()
+        found = {}
+        for entry in probes:
+            if probe(i2c, addresses, entry):
+                found[entry[0]] = entry[1]
+    finally:
+        i2c.unlock()
+    return Inventory(addresses, found)
@@ -0,0 +1,127 @@
+C = "C"
+Z = "Z"
+# the button name chords are reported with
+BOTH = "CZ"
+
+PRESS = 0
+RELEASE = 1
+CLICK = 2  # a short press with no second one inside the double-click window
+DOUBLE_CLICK = 3
+LONG_PRESS = 4  # fires while the button is still held
+CHORD = 5  # both buttons pressed within the chord window, reported once for BOTH
+
+GESTURE_NAMES = ("press", "release", "click", "double-click", "long-press", "chord")
+
+MS = 1000000
+
+
+class _Button:
+    def __init__(self, name):
+        self.name = name
+        self.stable = False
+        self.candidate = False
+        self.since = 0
+        self.pressed_at = 0
+        self.long_fired = False
+        self.chorded = False
+        self.clicked_at = None
+
+
+class GestureRecognizer:
+    """Debounces the nunchuk's C and Z buttons and turns them into gestures.
+
+    update() is fed the already decoded button state on every poll, so the
+    debounce costs no bus reads: a change only counts once it has held for
+    debounce_ms. Each gesture goes to handler(button, gesture, now_ns),
+    where button is C, Z or BOTH.
+
+        gestures = GestureRecognizer(on_gesture)
+        while True:
+            await nc.poll()
+            gestures.update(time.monotonic_ns(), nc.c, nc.z)
+
+    :param handler: called for every gesture
+    :param debounce_ms: how long a new state has to hold (default 20)
+    :param long_press_ms: hold time for LONG_PRESS (default 600)
+    :param double_click_ms: longest gap between two clicks of a DOUBLE_CLICK (default 300)
+    :param chord_ms: longest gap between the two presses of a CHORD (default 80)
+    """
+
+    def __init__(self, handler, debounce_ms=20, long_press_ms=600, double_click_ms=300, chord_ms=80):
+        self.handler = handler
+        self.debounce_ns = debounce_ms * MS
+        self.long_press_ns = long_press_ms * MS
+        self.double_click_ns = double_click_ms * MS
+        self.chord_ns = chord_ms * MS
+        self.c = _Button(C)
+        self.z = _Button(Z)
+        self.bounces = 0
+
+    def _emit(self, button, gesture, now):
+        self.handler(button, gesture, now)
+
+    def _debounce(self, button, raw, now):
+        # True if the debounced state just changed
+        if raw != button.candidate:
+            if button.candidate != button.stable:
+                # it flipped back before it settled
+                self.bounces += 1
+            button.candidate = raw
+            button.since = now
+        if button.candidate != button.stable and now - button.since >= self.debounce_ns:
+            button.stable = button.candidate
+            return True
+        return False
+
+    def _pressed(self, button, other, now):
+        button.pressed_at = now
+        button.long_fired = False
+        button.chorded = False
+        self._emit(button.name, PRESS, now)
+        if other.stable and not other.chorded and now - other.pressed_at <= self.chord_ns:
+            button.chorded = True
+            other.chorded = True
+            # a chord isn't a click for either button
+            button.clicked_at = None
+            other.clicked_at = None
+            self._emit(BOTH, CHORD, now)
+
+    def _released(self, button, now):
+        self._emit(button.name, RELEASE, now)
+        if button.long_fired or button.chorded:
+            return
+        if button.clicked_at is not None and now - button.clicked_at <= self.double_click_ns:
+            button.clicked_at = None
+            self._emit(button.name, DOUBLE_CLICK, now)
+        else:
+            button.clicked_at = now
+
+    def _timers(self, button, now):
+        if button.stable and not button.long_fired and not button.chorded and now - button.pressed_at >= self.long_press_ns:
+            button.long_fired = True
+            button.clicked_at = None
+            self._emit(button.name, LONG_PRESS, now)
+        elif not button.stable and button.clicked_at is not None and now - button.clicked_at > self.double_click_ns:
+            button.clicked_at = None
+            self._emit(button.name, CLICK, now)
+
+    def _update(self, button, other, raw, now):
+        if self._debounce(button, raw, now):
+            if button.stable:
+                self._pressed(button, other, now)
+            else:
+                self._released(button, now)
+        self._timers(button, now)
+
+    def update(self, now, c, z):
+        """Feed the buttons' raw state (True = pressed) at now (ns)"""
+        self._update(self.c, self.z, c, now)
+        self._update(self.z, self.c, z, now)
+
+    @property
+    def c_down(self):
+        return self.c.stable
+
+    @property
+    def z_down(self):
+        return self.z.stable
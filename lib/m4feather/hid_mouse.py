@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+# the same values as adafruit_hid.mouse.Mouse.LEFT_BUTTON etc.
+LEFT_BUTTON = 1
+RIGHT_BUTTON = 2
+MIDDLE_BUTTON = 4
+
+MS = 1000000
+
+
+def curve_table(scale, deadzone, acceleration, size=256):
+    """Counts per tick for each distance from center, deadzone and acceleration curve applied"""
+    table = []
+    for distance in range(size):
+        past = distance - deadzone
+        if past <= 0:
+            table.append(0.0)
+        else:
+            table.append(scale * past * (1 + acceleration * past / 128))
+    return table
+
+
+class MousePipeline:
+    """Turns nunchuk tilt and buttons into coalesced USB HID mouse reports.
+
+    feed() sets the pointer speed from a tilt reading whenever it changes,
+    press() and release() queue button changes. service() runs every
+    interval and sends a button change at the first one after it happens.
+    Motion is coalesced: it's summed over motion_ms, fractions carried
+    over, and sent as one move, so there are fewer reports than nunchuk
+    polls. A button change takes the motion so far with it, so clicks land
+    where the pointer was. Nothing is sent when nothing changed. Run it as
+    its own task with run(), so reports keep their own rhythm instead of
+    the nunchuk loop's.
+
+        pipeline = MousePipeline(Mouse(usb_hid.devices))
+        asyncio.create_task(pipeline.run())
+        pipeline.feed(accel_x / 4, accel_y / 4, time.monotonic_ns())
+
+    :param mouse: adafruit_hid Mouse, or anything with move(), press() and release()
+    :param center_x: tilt reading that means no movement on x (default 120)
+    :param center_y: tilt reading that means no movement on y (default 110)
+    :param scale_x: counts per tick for each step away from center_x (default 0.4)
+    :param scale_y: counts per tick for each step away from center_y (default 0.5)
+    :param deadzone: steps around the center that don't move the pointer (default 4)
+    :param acceleration: how much faster the pointer gets the further it's tilted, 0 for linear (default 0.5)
+    :param tick_ms: the time scale_x and scale_y are per, the old move-per-poll rate (default 10)
+    :param interval_ms: how often button changes are looked for, match the HID endpoint's polling interval (default 8)
+    :param motion_ms: time motion is summed over before it's sent, longer than the nunchuk poll period (default 20)
+    """
+
+    def __init__(self, mouse, center_x=120, center_y=110, scale_x=0.4, scale_y=0.5, deadzone=4,
+                 acceleration=0.5, tick_ms=10, interval_ms=8, motion_ms=20):
+        self.mouse = mouse
+        self.center_x = center_x
+        self.center_y = center_y
+        self.curve_x = curve_table(scale_x, deadzone, acceleration)
+        self.curve_y = curve_table(scale_y, deadzone, acceleration)
+        self.tick_ns = tick_ms * MS
+        self.interval_ns = interval_ms * MS
+        self.motion_ns = motion_ms * MS
+        self.speed_x = 0.0
+        self.speed_y = 0.0
+        self.buttons = 0
+        self._sent_buttons = 0
+        self._carry_x = 0.0
+        self._carry_y = 0.0
+        self._last_service = None
+        self._last_motion = None
+        self._integrated_at = None
+        # when the oldest input not yet sent arrived
+        self._motion_since = None
+        self._buttons_since = None
+        self.reports = 0
+        self.dropped = 0
+        self.inputs = 0
+        self.latency_samples = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+
+    def _speed(self, curve, distance):
+        if distance < 0:
+            distance = -distance
+            if distance >= len(curve):
+                distance = len(curve) - 1
+            return -curve[distance]
+        if distance >= len(curve):
+            distance = len(curve) - 1
+        return curve[distance]
+
+    def _integrate(self, now):
+        # motion at the current speed since the last time this ran
+        if self._integrated_at is not None:
+            ticks = (now - self._integrated_at) / self.tick_ns
+            self._carry_x += self.speed_x * ticks
+            self._carry_y += self.speed_y * ticks
+        self._integrated_at = now
+
+    def feed(self, x, y, now):
+        """New tilt reading, on the same scale as center_x/center_y"""
+        # the old speed up to now, so a change mid-way through motion_ms doesn't count for all of it
+        self._integrate(now)
+        self.speed_x = self._speed(self.curve_x, int(x - self.center_x))
+        self.speed_y = self._speed(self.curve_y, int(y - self.center_y))
+        self.inputs += 1
+        if self._motion_since is None:
+            self._motion_since = now
+
+    def press(self, button, now):
+        self.buttons |= button
+        self.inputs += 1
+        if self._buttons_since is None:
+            self._buttons_since = now
+
+    def release(self, button, now):
+        self.buttons &= ~button
+        self.inputs += 1
+        if self._buttons_since is None:
+            self._buttons_since = now
+
+    def _latency(self, now, since):
+        if since is None:
+            return
+        latency = now - since
+        self.latency_samples += 1
+        self.latency_total_ns += latency
+        if latency > self.latency_max_ns:
+            self.latency_max_ns = latency
+
+    def service(self, now):
+        """Send one report if there's a button change, or motion that's due. Returns True if it sent."""
+        if self._last_service is None:
+            self._last_service = now
+            self._last_motion = now
+            self._integrated_at = now
+            return False
+        if now - self._last_service < self.interval_ns:
+            return False
+        self._last_service = now
+        buttons_changed = self.buttons != self._sent_buttons
+        sent = False
+        if buttons_changed or now - self._last_motion >= self.motion_ns:
+            self._last_motion = now
+            self._integrate(now)
+            move_x = int(self._carry_x)
+            move_y = int(self._carry_y)
+            self._carry_x -= move_x
+            self._carry_y -= move_y
+            if move_x or move_y:
+                self.mouse.move(move_x, move_y, 0)
+                self._latency(now, self._motion_since)
+                sent = True
+            # readings that didn't add up to a whole count have still been taken into account
+            self._motion_since = None
+        if buttons_changed:
+            pressed = self.buttons & ~self._sent_buttons
+            released = self._sent_buttons & ~self.buttons
+            if pressed:
+                self.mouse.press(pressed)
+            if released:
+                self.mouse.release(released)
+            self._sent_buttons = self.buttons
+            self._latency(now, self._buttons_since)
+            self._buttons_since = None
+            sent = True
+        if sent:
+            self.reports += 1
+        return sent
+
+    def stop(self):
+        """Stop the pointer and release any buttons the computer thinks are held"""
+        self.speed_x = 0.0
+        self.speed_y = 0.0
+        self._carry_x = 0.0
+        self._carry_y = 0.0
+        self.buttons = 0
+        if self._sent_buttons:
+            try:
+                self.mouse.release(self._sent_buttons)
+            except OSError:
+                # no host to tell, it will see nothing held when it's back
+                self.dropped += 1
+            self._sent_buttons = 0
+        self._last_service = None
+        self._last_motion = None
+        self._integrated_at = None
+        self._motion_since = None
+        self._buttons_since = None
+
+    async def run(self):
+        interval = self.interval_ns / 1000000000
+        while True:
+            try:
+                self.service(time.monotonic_ns())
+            except OSError:
+                # the host didn't take the report (suspended, unplugged), drop it and carry on
+                self.dropped += 1
+            await asyncio.sleep(interval)
+
+    @property
+    def latency_mean_ns(self):
+        """Mean wait from an input to the report carrying it"""
+        return self.latency_total_ns / self.latency_samples if self.latency_samples else 0
+
+    def report(self):
+        mean = self.latency_mean_ns
+        print("mouse: {} inputs, {} reports, {} dropped, latency mean {:.1f} ms max {:.1f} ms".format(
+            self.inputs, self.reports, self.dropped, mean / MS, self.latency_max_ns / MS))
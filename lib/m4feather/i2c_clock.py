@@ -0,0 +1,165 @@
+from . import discovery
+
+STANDARD = 100000
+FAST = 400000
+# fastest first, negotiate() walks down this list
+FREQUENCIES = (FAST, STANDARD)
+
+# fastest clock each known add-on is happy with
+DEVICE_MAX_HZ = {
+    # the nunchuk is the slow one, it corrupts reports above standard mode
+    discovery.NUNCHUK: STANDARD,
+    discovery.LTR559: FAST,
+    discovery.BME280: FAST,
+    discovery.LIS3DH: FAST,
+}
+# anything that answers the scan but isn't in the probe table
+UNKNOWN_MAX_HZ = STANDARD
+
+# errors on present devices within one check() before the clock steps down
+ERROR_THRESHOLD = 3
+
+
+class _Rate:
+    def __init__(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.bus_ns = 0
+        self.errors = 0
+
+
+class I2CClock:
+    """Runs a MeteredI2C at the fastest clock the attached devices allow.
+
+    busio.I2C only takes a frequency when it's created, so changing speed
+    means a new bus object. The MeteredI2C the drivers hold is rebound to it,
+    so nothing else has to be set up again.
+
+        clock = I2CClock(i2cbus, lambda frequency: busio.I2C(board.SCL, board.SDA, frequency=frequency))
+        clock.negotiate(inventory)
+
+    :param bus: the MeteredI2C the drivers use
+    :param make_bus: frequency -> a new busio.I2C (or stand-in) at that frequency
+    :param frequency: what bus is running at now
+    """
+
+    def __init__(self, bus, make_bus, frequency=STANDARD):
+        self.bus = bus
+        self.make_bus = make_bus
+        self.frequency = frequency
+        self.fallbacks = 0
+        self.rates = {}
+        self.present = ()
+        self._mark = bus.totals()
+        self._errors = 0
+
+    def limit(self, inventory):
+        """The fastest clock every device in inventory supports"""
+        known = set(inventory.found.values())
+        limit = max(FREQUENCIES)
+        for name in inventory.found:
+            limit = min(limit, DEVICE_MAX_HZ.get(name, UNKNOWN_MAX_HZ))
+        for address in inventory.addresses:
+            if address not in known:
+                limit = min(limit, UNKNOWN_MAX_HZ)
+        return limit
+
+    def _account(self):
+        # add what happened since the last call to the current frequency's totals
+        now = self.bus.totals()
+        rate = self.rates.get(self.frequency)
+        if rate is None:
+            rate = self.rates[self.frequency] = _Rate()
+        rate.transactions += now[0] - self._mark[0]
+        rate.bytes += now[1] - self._mark[1]
+        rate.bus_ns += now[2] - self._mark[2]
+        rate.errors += now[3] - self._mark[3]
+        self._mark = now
+
+    def set_frequency(self, frequency):
+        """Recreate the bus at frequency. Returns False, still at the old frequency, if that failed."""
+        if frequency == self.frequency:
+            return True
+        # checked before the deinit, rebind() would refuse a locked bus and leave it deinited
+        if self.bus.locked:
+            print("I2C busy, staying at {} Hz".format(self.frequency))
+            return False
+        self._account()
+        self.bus.i2c.deinit()
+        try:
+            self.bus.rebind(self.make_bus(frequency))
+        except (RuntimeError, ValueError) as e:
+            # making the new bus failed, not the rebind, so the old frequency can be put back
+            print("I2C at {} Hz failed: {}".format(frequency, e))
+            self.bus.rebind(self.make_bus(self.frequency))
+            return False
+        self.frequency = frequency
+        return True
+
+    def _verify(self, inventory):
+        probes = [entry for entry in discovery.PROBES if entry[0] in inventory.found]
+        try:
+            found = discovery.discover(self.bus, probes).found
+        except (OSError, RuntimeError):
+            return False
+        for name in inventory.found:
+            if name not in found:
+                return False
+        return True
+
+    def negotiate(self, inventory):
+        """Pick the fastest frequency the inventory allows that every device still answers at"""
+        self.present = tuple(inventory.found.values())
+        limit = self.limit(inventory)
+        for frequency in FREQUENCIES:
+            if frequency > limit:
+                continue
+            if self.set_frequency(frequency) and self._verify(inventory):
+                self._errors = self._present_errors()
+                return frequency
+            self.fallbacks += 1
+        # nothing verified, stay on the slowest clock
+        self.set_frequency(min(FREQUENCIES))
+        self._errors = self._present_errors()
+        return self.frequency
+
+    def _present_errors(self):
+        errors = 0
+        for address in self.present:
+            stats = self.bus.devices.get(address)
+            if stats is not None:
+                errors += stats.errors
+        return errors
+
+    def check(self):
+        """Step down a speed if present devices have been NACKing or timing out. Call it now and then."""
+        errors = self._present_errors()
+        new_errors = errors - self._errors
+        self._errors = errors
+        if new_errors < ERROR_THRESHOLD or self.bus.locked:
+            return False
+        slower = [frequency for frequency in FREQUENCIES if frequency < self.frequency]
+        if not slower:
+            return False
+        print("{} I2C errors at {} Hz, falling back to {} Hz".format(new_errors, self.frequency, slower[0]))
+        self.fallbacks += 1
+        return self.set_frequency(slower[0])
+
+    def report(self):
+        """Throughput at each frequency the bus has run at, from the MeteredI2C counters"""
+        self._account()
+        print("{:>8} {:>8} {:>8} {:>10} {:>8} {:>6}".format("i2c Hz", "trans", "bytes", "bus ms", "kB/s", "errors"))
+        base = None
+        used = [frequency for frequency in sorted(self.rates) if self.rates[frequency].transactions]
+        for frequency in used:
+            rate = self.rates[frequency]
+            throughput = rate.bytes * 1000000 / rate.bus_ns if rate.bus_ns else 0
+            if base is None:
+                base = throughput
+            print("{:>8} {:>8} {:>8} {:>10.1f} {:>8.1f} {:>6}".format(
+                frequency, rate.transactions, rate.bytes, rate.bus_ns / 1000000, throughput, rate.errors))
+        if base and len(used) > 1:
+            rate = self.rates[used[-1]]
+            if rate.bus_ns:
+                print("gain over {} Hz: {:.2f}x".format(used[0], rate.bytes * 1000000 / rate.bus_ns / base))
+        print("frequency: {} Hz, fallbacks: {}".format(self.frequency, self.fallbacks))
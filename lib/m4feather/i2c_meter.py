@@ -0,0 +1,182 @@
+import time
+
+
+class I2CDeviceStats:
+    """Bus usage for one I2C address."""
+
+    def __init__(self, address, name):
+        self.address = address
+        self.name = name
+        self.transactions = 0
+        self.bytes = 0
+        self.bus_ns = 0
+        self.errors = 0
+
+
+def lock(i2c):
+    """Wait for the lock on i2c, a busio.I2C or a MeteredI2C. unlock() it when done."""
+    while not i2c.try_lock():
+        pass
+
+
+class _Batch:
+    def __init__(self, bus):
+        self._bus = bus
+
+    def __enter__(self):
+        lock(self._bus)
+        return self._bus
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._bus.unlock()
+        return False
+
+
+class MeteredI2C:
+    """Wraps a busio.I2C and keeps per-device transaction counts, bytes and bus time.
+
+    It has the same methods as busio.I2C, so it can be handed to any driver
+    in place of the bus. Locking is reentrant: inside batch() the bus is
+    locked once, and the try_lock()/unlock() pairs each driver makes for its
+    own register reads don't touch the real lock.
+
+        i2c = MeteredI2C(busio.I2C(board.SCL, board.SDA), names={0x76: "bme280"})
+        with i2c.batch():
+            temperature = bme280.temperature
+            humidity = bme280.humidity
+        i2c.report()
+
+    :param i2c: the bus to wrap
+    :param names: address -> name, used by report()
+    :param clock: a monotonic_ns function, time.monotonic_ns by default
+    """
+
+    def __init__(self, i2c, names=None, clock=None):
+        self.i2c = i2c
+        self.names = names or {}
+        self.devices = {}
+        self.locks = 0
+        self.lock_spins = 0
+        self.hold_ns = 0
+        self._clock = clock or time.monotonic_ns
+        self._depth = 0
+        self._locked_at = 0
+
+    def __getattr__(self, name):
+        # scan(), deinit(), frequency and anything else go straight to the bus
+        return getattr(self.i2c, name)
+
+    @property
+    def locked(self):
+        return self._depth > 0
+
+    def rebind(self, i2c):
+        """Swap in a new underlying bus, e.g. one at another frequency. The drivers keep working."""
+        if self._depth:
+            raise RuntimeError("can't swap the I2C bus while it is locked")
+        self.i2c = i2c
+
+    def totals(self):
+        """(transactions, bytes, bus ns, errors) over every device"""
+        transactions = total_bytes = bus_ns = errors = 0
+        for stats in self.devices.values():
+            transactions += stats.transactions
+            total_bytes += stats.bytes
+            bus_ns += stats.bus_ns
+            errors += stats.errors
+        return transactions, total_bytes, bus_ns, errors
+
+    def device(self, address):
+        stats = self.devices.get(address)
+        if stats is None:
+            stats = I2CDeviceStats(address, self.names.get(address, hex(address)))
+            self.devices[address] = stats
+        return stats
+
+    def try_lock(self):
+        if self._depth:
+            self._depth += 1
+            return True
+        if not self.i2c.try_lock():
+            self.lock_spins += 1
+            return False
+        self._depth = 1
+        self.locks += 1
+        self._locked_at = self._clock()
+        return True
+
+    def unlock(self):
+        if self._depth > 1:
+            self._depth -= 1
+            return
+        self._depth = 0
+        self.hold_ns += self._clock() - self._locked_at
+        self.i2c.unlock()
+
+    def batch(self):
+        """Hold the bus for a group of reads, 'with i2c.batch():'"""
+        return _Batch(self)
+
+    def _record(self, address, nbytes, start, failed=False):
+        stats = self.device(address)
+        stats.transactions += 1
+        stats.bytes += nbytes
+        stats.bus_ns += self._clock() - start
+        if failed:
+            stats.errors += 1
+
+    # busio.I2C only takes ints for end, so None becomes the whole buffer here, like adafruit_bus_device
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        began = self._clock()
+        try:
+            self.i2c.writeto(address, buffer, start=start, end=end)
+        except OSError:
+            self._record(address, 0, began, True)
+            raise
+        self._record(address, end - start, began)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        began = self._clock()
+        try:
+            self.i2c.readfrom_into(address, buffer, start=start, end=end)
+        except OSError:
+            self._record(address, 0, began, True)
+            raise
+        self._record(address, end - start, began)
+
+    def writeto_then_readfrom(self, address, out_buffer, in_buffer, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        began = self._clock()
+        try:
+            self.i2c.writeto_then_readfrom(address, out_buffer, in_buffer, out_start=out_start,
+                                           out_end=out_end, in_start=in_start, in_end=in_end)
+        except OSError:
+            self._record(address, 0, began, True)
+            raise
+        self._record(address, out_end - out_start + in_end - in_start, began)
+
+    def reset_stats(self):
+        self.devices = {}
+        self.locks = 0
+        self.lock_spins = 0
+        self.hold_ns = 0
+
+    def report(self):
+        """Print one line per device, the one using the most bus time first"""
+        bus_ns = sum(stats.bus_ns for stats in self.devices.values()) or 1
+        print("{:<10} {:>6} {:>8} {:>8} {:>10} {:>6} {:>6}".format(
+            "i2c device", "addr", "trans", "bytes", "bus ms", "share", "errors"))
+        for stats in sorted(self.devices.values(), key=lambda s: s.bus_ns, reverse=True):
+            print("{:<10} {:>6} {:>8} {:>8} {:>10.1f} {:>5.0f}% {:>6}".format(
+                stats.name, hex(stats.address), stats.transactions, stats.bytes,
+                stats.bus_ns / 1000000, 100 * stats.bus_ns / bus_ns, stats.errors))
+        print("locks: {} held: {:.1f} ms spins: {}".format(self.locks, self.hold_ns / 1000000, self.lock_spins))
@@ -0,0 +1,44 @@
+import gc
+import time
+
+# name, nanoseconds, bytes of heap used, for every module loaded through load()
+imports = []
+# names already in imports, an add-on that re-attaches loads its modules again
+_recorded = set()
+# False makes load() a plain import, no gc.collect() and no timing
+enabled = True
+
+
+def mem_free():
+    # gc.mem_free() only exists on CircuitPython/MicroPython
+    try:
+        return gc.mem_free()
+    except AttributeError:
+        return 0
+
+
+def _import(name):
+    module = __import__(name)
+    for part in name.split(".")[1:]:
+        module = getattr(module, part)
+    return module
+
+
+def load(name):
+    """Import a module (dotted names return the submodule) and record what it cost, the first time"""
+    if not enabled or name in _recorded:
+        # already imported, nothing to measure and imports stays the same size however often it's asked for
+        return _import(name)
+    gc.collect()
+    free = mem_free()
+    start = time.monotonic_ns()
+    module = _import(name)
+    imports.append((name, time.monotonic_ns() - start, free - mem_free()))
+    _recorded.add(name)
+    return module
+
+
+def print_imports():
+    from .bootprof import format_table
+    for line in format_table(imports, title="module"):
+        print(line)
@@ -0,0 +1,113 @@
+import array
+import math
+
+# what a block of silence (or a stuck input) reports
+FLOOR_DBFS = -96.0
+# amplitude of a full scale signal, 16 bit samples centred on the middle of the range
+FULL_SCALE = 32768
+
+
+def dbfs(amplitude):
+    """amplitude relative to full scale in dB, FLOOR_DBFS for nothing"""
+    if amplitude <= 0:
+        return FLOOR_DBFS
+    level = 20 * math.log10(amplitude / FULL_SCALE)
+    return level if level > FLOOR_DBFS else FLOOR_DBFS
+
+
+def measure(samples):
+    """One pass over 16 bit samples: returns (mean, sum of squared deviations, peak deviation)
+
+    The DC offset is the block's own mean, so the mic's bias point doesn't count as sound.
+    """
+    total = 0
+    squares = 0
+    low = 65535
+    high = 0
+    for sample in samples:
+        total += sample
+        # centred first so the squares stay small
+        centred = sample - 32768
+        squares += centred * centred
+        if sample < low:
+            low = sample
+        if sample > high:
+            high = sample
+    count = len(samples)
+    mean = total / count
+    deviations = squares - (total - 32768 * count) ** 2 / count
+    peak = high - mean if high - mean > mean - low else mean - low
+    return mean, deviations if deviations > 0 else 0, peak
+
+
+class MicLevel:
+    """Sound level from an analog mic, measured a block at a time and reported per interval.
+
+    update() fills a preallocated block and measures it in one pass.
+    take() gives the RMS, the peak and the RMS in dBFS over every block
+    since the last take(), and starts the next interval.
+
+        meter = MicLevel(analogio.AnalogIn(pin8()))
+        meter.update()  # as often as there's time for
+        rms, peak, level = meter.take()  # once an interval
+
+    Given an AnalogIn the block is read back to back in a tight loop, as
+    fast as the ADC goes. Given anything with readinto() (an
+    analogbufio.BufferedIn, where the port has it) the block is filled at
+    that object's sample rate.
+
+    :param source: an analogio.AnalogIn or an analogbufio.BufferedIn for the mic pin
+    :param samples: samples per block (default 160)
+    :param floor: dBFS shown as an empty meter by level (default -60)
+    """
+
+    def __init__(self, source, samples=160, floor=-60.0):
+        self.source = source
+        self.samples = array.array("H", [0] * samples)
+        self._buffered = hasattr(source, "readinto")
+        self.floor = floor
+        self.blocks = 0
+        self._count = 0
+        self._squares = 0
+        self._peak = 0
+        # the last interval's figures
+        self.rms = 0.0
+        self.peak = 0.0
+        self.dbfs = FLOOR_DBFS
+
+    def capture(self):
+        samples = self.samples
+        if self._buffered:
+            self.source.readinto(samples)
+            return
+        source = self.source
+        for i in range(len(samples)):
+            samples[i] = source.value
+
+    def update(self):
+        """Read a block and add it to the interval"""
+        self.capture()
+        mean, squares, peak = measure(self.samples)
+        self._count += len(self.samples)
+        self._squares += squares
+        if peak > self._peak:
+            self._peak = peak
+        self.blocks += 1
+
+    def take(self):
+        """(rms, peak, dBFS) over the blocks since the last take, the previous figures if there weren't any"""
+        if self._count:
+            self.rms = math.sqrt(self._squares / self._count)
+            self.peak = self._peak
+            self.dbfs = dbfs(self.rms)
+            self._count = 0
+            self._squares = 0
+            self._peak = 0
+        return self.rms, self.peak, self.dbfs
+
+    @property
+    def level(self):
+        """The last interval's dBFS as 0 (at floor) to 1 (full scale), for a meter"""
+        if self.dbfs <= self.floor:
+            return 0.0
+        return 1 - self.dbfs / self.floor
@@ -0,0 +1,65 @@
+"""The asyncio task bodies behind 2022sep10B.py's MIDI loop.
+
+They take the clock and the sleep to use, so the script runs them on
+time.monotonic_ns and asyncio.sleep, and bench/midi_timing.py runs the
+very same code on a virtual clock:
+
+    asyncio.create_task(midi_loop.run_sequencer(sequencer))
+    asyncio.create_task(midi_loop.drain_input(midi.receive, forward, router.service))
+    asyncio.create_task(midi_loop.sample_sensors(sequencer, reads, interval, handle))
+"""
+import asyncio
+import time
+
+# sensor reads are only started when the next MIDI event is at least this far away
+SENSOR_GUARD_NS = 20000000
+# the longest the sequencer task sleeps, so tempo changes and new queue entries are picked up
+MAX_SEQUENCER_SLEEP_NS = 5000000
+
+
+async def run_sequencer(seq, clock=time.monotonic_ns, sleep=asyncio.sleep):
+    while True:
+        wait_ns = seq.poll(clock())
+        await sleep(min(wait_ns, MAX_SEQUENCER_SLEEP_NS) / 1000000000)
+
+
+async def drain_input(receive, forward, service, clock=time.monotonic_ns, sleep=asyncio.sleep):
+    """Hand every waiting MIDI message to forward(msg), then let service(now) send modulation
+
+    :param receive: returns the next incoming message or None, like adafruit_midi.MIDI.receive
+    """
+    while True:
+        msg = receive()
+        while msg is not None:
+            forward(msg)
+            msg = receive()
+        service(clock())
+        await sleep(0)
+
+
+async def midi_gap(seq, clock=time.monotonic_ns, sleep=asyncio.sleep):
+    """Wait until there is room for one device read before the next MIDI event"""
+    while seq.ns_until_next_event(clock()) < SENSOR_GUARD_NS:
+        await sleep(0.001)
+
+
+async def read_sensors(seq, reads, results, clock=time.monotonic_ns, sleep=asyncio.sleep):
+    """Call each of reads as its own chunk, so the MIDI tasks can run in between. Fills results in place."""
+    # a count, the modulation pass and the slow plotting pass can be under way at once
+    seq.sensing += 1
+    try:
+        for i in range(len(reads)):
+            await midi_gap(seq, clock, sleep)
+            results[i] = reads[i]()
+    finally:
+        seq.sensing -= 1
+    return results
+
+
+async def sample_sensors(seq, reads, interval, handle, clock=time.monotonic_ns, sleep=asyncio.sleep):
+    """read_sensors() every interval seconds, handing the results to handle(results)"""
+    results = [None] * len(reads)
+    while True:
+        await read_sensors(seq, reads, results, clock, sleep)
+        handle(results)
+        await sleep(interval)
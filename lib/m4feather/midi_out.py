@@ -0,0 +1,61 @@
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+CONTROL_CHANGE = 0xB0
+PITCH_BEND = 0xE0
+
+PITCH_BEND_CENTER = 8192
+PITCH_BEND_MAX = 16383
+
+
+class MidiOut:
+    """Writes channel messages straight to a port (a busio.UART or a usb_midi port).
+
+    adafruit_midi builds a message object and a bytes copy for every send; on
+    the hot path we only need three bytes, so they are packed into one reused
+    bytearray and written as is.
+    """
+
+    def __init__(self, port, channel=0):
+        """__init__
+
+        :param port: anything with a write(buffer) method
+
+        :param int channel: MIDI channel, 0-15
+        """
+        self._port = port
+        self.channel = channel
+        self._buf = bytearray(3)
+        self.messages_sent = 0
+
+    def _send(self, status, data1, data2):
+        buf = self._buf
+        buf[0] = status | self.channel
+        buf[1] = data1 & 0x7F
+        buf[2] = data2 & 0x7F
+        self._port.write(buf)
+        self.messages_sent += 1
+
+    def note_on(self, note, velocity):
+        self._send(NOTE_ON, note, velocity)
+
+    def note_off(self, note, velocity=0):
+        # a zero-velocity note on matches what the sequencer has always sent, and keeps running status friendly
+        if velocity == 0:
+            self._send(NOTE_ON, note, 0)
+        else:
+            self._send(NOTE_OFF, note, velocity)
+
+    def control_change(self, control, value):
+        self._send(CONTROL_CHANGE, control, value)
+
+    def pitch_bend(self, value):
+        """:param int value: 0-16383, 8192 is centre"""
+        if value < 0:
+            value = 0
+        elif value > PITCH_BEND_MAX:
+            value = PITCH_BEND_MAX
+        self._send(PITCH_BEND, value, value >> 7)
+
+    def panic(self):
+        for note in range(128):
+            self.note_off(note)
@@ -0,0 +1,136 @@
+from .midi_out import PITCH_BEND_CENTER, PITCH_BEND_MAX
+
+PITCH_BEND = -1
+
+# Enviro+ quantities that can be routed, passed to ModulationRouter.update()
+LUX = "lux"
+PROX = "prox"
+MIC = "mic"
+OX = "ox"
+RED = "red"
+NH3 = "nh3"
+
+
+class Route:
+    """Maps one sensor quantity onto a control change or the pitch bend."""
+
+    def __init__(self, source, target, in_min, in_max, out_min=None, out_max=None,
+                 smoothing=0.3, deadband=1, max_rate=20):
+        """__init__
+
+        :param str source: name of the sensor quantity, eg LUX
+
+        :param int target: CC number (0-127) or PITCH_BEND
+
+        :param in_min: sensor reading that maps to out_min (readings are clamped to the input range)
+
+        :param in_max: sensor reading that maps to out_max
+
+        :param int out_min: lowest value sent (default 0, or 8192 for pitch bend: centred, so in_min leaves the
+            pitch alone and the reading only bends it up)
+
+        :param int out_max: highest value sent (default 127, or 16383 for pitch bend)
+
+        :param float smoothing: exponential smoothing factor, 1 follows the sensor exactly, smaller is smoother
+
+        :param int deadband: the output has to move by more than this before a new message is sent
+
+        :param float max_rate: most messages per second this route may send
+        """
+        self.source = source
+        self.target = target
+        self.in_min = in_min
+        self.in_max = in_max
+        if out_min is None:
+            out_min = PITCH_BEND_CENTER if target == PITCH_BEND else 0
+        self.out_min = out_min
+        if out_max is None:
+            out_max = PITCH_BEND_MAX if target == PITCH_BEND else 127
+        self.out_max = out_max
+        self.smoothing = smoothing
+        self.deadband = deadband
+        self.min_interval_ns = int(1000000000 / max_rate)
+        # precomputed so that scaling is one multiply-add
+        self._scale = (self.out_max - self.out_min) / (in_max - in_min)
+        self._offset = self.out_min - in_min * self._scale
+        self.smoothed = None
+        self.last_sent = None
+        self.last_sent_ns = None
+        self.sent = 0
+        # values the rate limit held back that never went out, replaced by a newer one or dropped
+        self.suppressed = 0
+        self.held = None
+
+    def feed(self, value):
+        if value < self.in_min:
+            value = self.in_min
+        elif value > self.in_max:
+            value = self.in_max
+        if self.smoothed is None:
+            self.smoothed = value
+        else:
+            self.smoothed += self.smoothing * (value - self.smoothed)
+
+    def output(self):
+        return int(self.smoothed * self._scale + self._offset + 0.5)
+
+
+class ModulationRouter:
+    """Turns a stream of sensor readings into rate-limited CC and pitch bend messages.
+
+    Readings can arrive at any rate through update(); service() is called from
+    the main loop and only writes to the MIDI port when a route's output has
+    left its deadband and the route's rate limit allows it.
+    """
+
+    def __init__(self, out):
+        """__init__
+
+        :param out: a MidiOut (anything with control_change() and pitch_bend())
+        """
+        self._out = out
+        self.routes = []
+
+    def add(self, route):
+        self.routes.append(route)
+        return route
+
+    def update(self, source, value):
+        """Feed a new sensor reading to every route that listens to it"""
+        for route in self.routes:
+            if route.source == source:
+                route.feed(value)
+
+    def service(self, now_ns):
+        """Send any route whose output has moved. Returns the number of messages sent."""
+        sent = 0
+        for route in self.routes:
+            if route.smoothed is None:
+                continue
+            value = route.output()
+            last = route.last_sent
+            if last is not None:
+                if -route.deadband <= value - last <= route.deadband:
+                    # a held value that moved back before it could go out is dropped
+                    if route.held is not None:
+                        route.suppressed += 1
+                        route.held = None
+                    continue
+                if now_ns - route.last_sent_ns < route.min_interval_ns:
+                    # counted once per value, not once per service() call it waits through
+                    if route.held is not None and route.held != value:
+                        route.suppressed += 1
+                    route.held = value
+                    continue
+            if route.held is not None and route.held != value:
+                route.suppressed += 1
+            route.held = None
+            if route.target == PITCH_BEND:
+                self._out.pitch_bend(value)
+            else:
+                self._out.control_change(route.target, value)
+            route.last_sent = value
+            route.last_sent_ns = now_ns
+            route.sent += 1
+            sent += 1
+        return sent
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+from .i2c_meter import lock
+
+ADDRESS = 0x52
+
+# what changed between two reports, returned by fetch() and poll()
+JOYSTICK = 1
+ACCELERATION = 2
+BUTTONS = 4
+
+
+class NunchukReader:
+    """Reads the whole 6-byte nunchuk report in one transaction and decodes it all at once.
+
+    adafruit_nunchuk reads the report again for every property, so
+    acceleration, buttons and joystick together cost three reads. Here one
+    poll() fills joystick, acceleration, c and z, and says which of them
+    changed since the last report, so callers can skip work when the
+    nunchuk is sitting still.
+
+        nc = NunchukReader(i2cbus)
+        nc.setup()
+        if await nc.poll() & nunchuk.BUTTONS:
+            print(nc.c, nc.z)
+
+    :param i2c: the bus, locked for each transfer
+    :param address: I2C address (default 0x52)
+    :param read_delay: seconds the nunchuk needs between the read request and the read (default 0.002)
+    """
+
+    def __init__(self, i2c, address=ADDRESS, read_delay=0.002):
+        self.i2c = i2c
+        self.address = address
+        self.read_delay = read_delay
+        self.report = bytearray(6)
+        self._last = bytearray(6)
+        self._command = bytearray(1)
+        self._primed = False
+        self.joystick_x = 0
+        self.joystick_y = 0
+        self.accel_x = 0
+        self.accel_y = 0
+        self.accel_z = 0
+        self.c = False
+        self.z = False
+        self.reads = 0
+        self.changes = 0
+        self.spurious = 0
+
+    def _write(self, data):
+        lock(self.i2c)
+        try:
+            self.i2c.writeto(self.address, data)
+        finally:
+            self.i2c.unlock()
+
+    def setup(self):
+        """Unencrypted handshake, the same one adafruit_nunchuk sends"""
+        self._write(b"\xF0\x55")
+        time.sleep(0.01)
+        self._write(b"\xFB\x00")
+        time.sleep(0.01)
+
+    def request(self):
+        """Ask for a report, fetch() it read_delay seconds later"""
+        self._command[0] = 0x00
+        self._write(self._command)
+
+    def fetch(self):
+        """Read and decode the report. Returns JOYSTICK | ACCELERATION | BUTTONS for what changed, 0 if nothing did."""
+        lock(self.i2c)
+        try:
+            self.i2c.readfrom_into(self.address, self.report)
+        finally:
+            self.i2c.unlock()
+        self.reads += 1
+        report = self.report
+        last = self._last
+        if report == last and self._primed:
+            return 0
+        # a report of all 0xFF means the nunchuk wasn't ready, keep the last good one
+        if report[0] == 0xFF and report[1] == 0xFF and report[2] == 0xFF and report[5] == 0xFF:
+            self.spurious += 1
+            return 0
+        # the first good report decodes everything
+        changed = 0 if self._primed else JOYSTICK | ACCELERATION | BUTTONS
+        self._primed = True
+        if report[0] != last[0] or report[1] != last[1]:
+            changed |= JOYSTICK
+        if changed & JOYSTICK:
+            self.joystick_x = report[0]
+            self.joystick_y = report[1]
+        extra = report[5]
+        if report[2] != last[2] or report[3] != last[3] or report[4] != last[4] or (extra & 0xFC) != (last[5] & 0xFC):
+            changed |= ACCELERATION
+        if changed & ACCELERATION:
+            # 10 bit readings, the low two bits of each are packed into the last byte
+            self.accel_x = (report[2] << 2) | ((extra >> 2) & 0x03)
+            self.accel_y = (report[3] << 2) | ((extra >> 4) & 0x03)
+            self.accel_z = (report[4] << 2) | ((extra >> 6) & 0x03)
+        if (extra & 0x03) != (last[5] & 0x03):
+            changed |= BUTTONS
+        if changed & BUTTONS:
+            # the buttons read 0 when pressed
+            self.z = not extra & 0x01
+            self.c = not extra & 0x02
+        last[:] = report
+        self.changes += 1
+        return changed
+
+    async def poll(self):
+        """request(), wait for the nunchuk without blocking other tasks, fetch()"""
+        self.request()
+        await asyncio.sleep(self.read_delay)
+        return self.fetch()
+
+    @property
+    def joystick(self):
+        return self.joystick_x, self.joystick_y
+
+    @property
+    def acceleration(self):
+        return self.accel_x, self.accel_y, self.accel_z
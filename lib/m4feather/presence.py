@@ -0,0 +1,178 @@
+import asyncio
+
+from . import discovery
+
+
+class Addon:
+    """One add-on the PresenceMonitor looks after.
+
+    :param name: used in messages
+    :param requires: discovery probe names that must all answer before it's attached
+    :param attach: called with the Inventory when it appears, loads and sets up the drivers. Return False to try again later.
+    :param tasks: called after attach, returns the coroutines to run while it's attached
+    :param detach: called once its tasks have been stopped
+    :param abandon: called when attach (or a task) fails on a pin clash or driver error, to undo a half done attach:
+        deinit what it made and release its pin claims
+    :param watch: re-probe it while it's present too, for add-ons whose tasks never touch the bus (default False)
+    """
+
+    def __init__(self, name, requires, attach, tasks=None, detach=None, abandon=None, watch=False):
+        self.name = name
+        self.requires = tuple(requires)
+        self.attach = attach
+        self.tasks = tasks
+        self.detach = detach
+        self.abandon = abandon
+        self.watch = watch
+        self.present = False
+        self.running = []
+        self.attaches = 0
+        self.losses = 0
+
+    def satisfied(self, inventory):
+        for name in self.requires:
+            if name not in inventory:
+                return False
+        return True
+
+
+class PresenceMonitor:
+    """Attaches add-ons when they show up on the I2C bus and stops them when they go away.
+
+    Absent add-ons are re-probed every interval seconds, with one bus scan
+    and only their own probe table entries. Present ones mostly cost
+    nothing: their tasks run wrapped, and an OSError (a NACK or timeout) in
+    any of them stops the add-on's other tasks, detaches it and puts it
+    back on the re-probe list. Add-ons with watch set are re-probed while
+    present as well, since nothing else would notice them go.
+
+    Given the claim registry, a PinClaimedError from attach or a task (two
+    add-ons wanting the same pin) is an add-on that couldn't attach, not a
+    crash: it's reported, abandon() undoes what was done, and it's retried
+    with the absent ones.
+
+        monitor = PresenceMonitor(i2cbus, interval=10)
+        monitor.add(Addon("nunchuk", ("nunchuk",), attach_nunchuk, nunchuk_tasks, detach_nunchuk))
+        monitor.begin(discovery.discover(i2cbus))
+        await monitor.run()
+
+    :param i2c: the bus the add-ons are on
+    :param interval: seconds between re-probes of absent add-ons
+    :param on_change: called with no arguments before an add-on is attached and after one is detached,
+        e.g. to renegotiate the bus clock
+    :param claims: the pimoroni_physical_feather_pins claims module, so pin clashes are caught
+    """
+
+    def __init__(self, i2c, interval=10, on_change=None, claims=None):
+        self.i2c = i2c
+        self.interval = interval
+        self.on_change = on_change
+        self._claim_errors = () if claims is None else (claims.pin_error.PinClaimedError,)
+        self._attach_errors = (OSError, RuntimeError, ValueError) + self._claim_errors
+        self.addons = []
+        self.probes = 0
+
+    def add(self, addon):
+        self.addons.append(addon)
+        return addon
+
+    def _abandon(self, addon, e):
+        print("Couldn't attach {}: {}".format(addon.name, e))
+        if addon.abandon is not None:
+            addon.abandon()
+
+    def _attach(self, addon, inventory):
+        try:
+            attached = addon.attach(inventory)
+        except self._attach_errors as e:
+            self._abandon(addon, e)
+            attached = False
+        if attached is False:
+            return False
+        addon.present = True
+        addon.attaches += 1
+        print("{} attached".format(addon.name))
+        return True
+
+    def begin(self, inventory):
+        """Attach whatever the boot-time inventory found. Tasks are started by run()."""
+        for addon in self.addons:
+            if addon.satisfied(inventory):
+                self._attach(addon, inventory)
+
+    def _start(self, addon):
+        if addon.tasks is None:
+            return
+        for coro in addon.tasks():
+            slot = len(addon.running)
+            addon.running.append(asyncio.create_task(self._guard(addon, coro, slot)))
+
+    async def _guard(self, addon, coro, slot):
+        try:
+            await coro
+        except OSError as e:
+            if addon.present:
+                print("{} stopped responding: {}".format(addon.name, e))
+                self.stop(addon, slot)
+        except self._claim_errors as e:
+            if addon.present:
+                self.stop(addon, slot)
+                self._abandon(addon, e)
+
+    def stop(self, addon, keep=None):
+        """Cancel an add-on's tasks (but not the one at index keep, the caller) and detach it"""
+        addon.present = False
+        addon.losses += 1
+        running = addon.running
+        addon.running = []
+        for slot, task in enumerate(running):
+            if slot != keep:
+                task.cancel()
+        if addon.detach is not None:
+            addon.detach()
+        if self.on_change is not None:
+            self.on_change()
+
+    def poll(self):
+        """Re-probe absent (and watched) add-ons once, stop watched ones that went and start the ones that appeared.
+        Returns the ones attached."""
+        absent = [addon for addon in self.addons if not addon.present]
+        watched = [addon for addon in self.addons if addon.present and addon.watch]
+        if not absent and not watched:
+            return []
+        wanted = set()
+        for addon in absent + watched:
+            wanted.update(addon.requires)
+        self.probes += 1
+        inventory = discovery.discover(self.i2c, [entry for entry in discovery.PROBES if entry[0] in wanted])
+        for addon in watched:
+            if not addon.satisfied(inventory):
+                print("{} stopped responding".format(addon.name))
+                self.stop(addon)
+        appeared = [addon for addon in absent if addon.satisfied(inventory)]
+        if appeared and self.on_change is not None:
+            self.on_change()
+        attached = []
+        for addon in appeared:
+            if self._attach(addon, inventory):
+                self._start(addon)
+                attached.append(addon)
+        return attached
+
+    async def run(self):
+        """Start the attached add-ons' tasks, then re-probe the absent ones forever"""
+        for addon in self.addons:
+            if addon.present:
+                self._start(addon)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.poll()
+            except (OSError, RuntimeError) as e:
+                print("Add-on probe failed:", e)
+
+    def report(self):
+        for addon in self.addons:
+            print("{:<10} {:<8} attaches: {} losses: {}".format(
+                addon.name, "present" if addon.present else "absent", addon.attaches, addon.losses))
+        print("re-probes:", self.probes)
@@ -0,0 +1,108 @@
+import array
+
+# note names use the same octave numbering as the sequencer scripts (MIDI 48 is "C2")
+_PITCH_CLASSES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+NOTE_NAMES = tuple(_PITCH_CLASSES[n % 12] + str(n // 12 - 2) for n in range(128))
+
+REST = -1
+
+MAJOR = (0, 2, 4, 5, 7, 9, 11)
+MINOR = (0, 2, 3, 5, 7, 8, 10)
+DORIAN = (0, 2, 3, 5, 7, 9, 10)
+PHRYGIAN = (0, 1, 3, 5, 7, 8, 10)
+LYDIAN = (0, 2, 4, 6, 7, 9, 11)
+MIXOLYDIAN = (0, 2, 4, 5, 7, 9, 10)
+LOCRIAN = (0, 1, 3, 5, 6, 8, 10)
+
+MODES = (MAJOR, MINOR, DORIAN, PHRYGIAN, LYDIAN, MIXOLYDIAN, LOCRIAN)
+MODE_NAMES = ("Major/Ionian",
+              "Minor/Aeolian",
+              "Dorian",
+              "Phrygian",
+              "Lydian",
+              "Mixolydian",
+              "Locrian")
+
+
+def note_name(note):
+    """Return the printable name of a MIDI note number"""
+    return NOTE_NAMES[note]
+
+
+def compile_scale(root, mode, octaves=3):
+    """compile_scale
+
+    :param int root: MIDI note number of the scale root
+
+    :param int mode: index into MODES
+
+    :param int octaves: how many octaves to stack above the root
+
+    Returns an array('b') of every MIDI note in the scale, lowest first
+    """
+    intervals = MODES[mode]
+    notes = array.array('b', [0] * (len(intervals) * octaves))
+    i = 0
+    for octave in range(octaves):
+        for interval in intervals:
+            notes[i] = min(root + interval + 12 * octave, 127)
+            i += 1
+    return notes
+
+
+def compile_pattern(root, mode, pattern, octaves=3):
+    """compile_pattern
+
+    :param int root: MIDI note number of the scale root
+
+    :param int mode: index into MODES
+
+    :param pattern: scale degrees to play on each step, REST (-1) for silence
+
+    :param int octaves: how many octaves of the scale the pattern can reach
+
+    Returns an array('b') holding the MIDI note (or REST) for each step
+    """
+    scale = compile_scale(root, mode, octaves)
+    steps = array.array('b', [REST] * len(pattern))
+    for i, degree in enumerate(pattern):
+        if degree > REST:
+            steps[i] = scale[degree % len(scale)]
+    return steps
+
+
+class PatternCompiler:
+    """Holds the sequencer settings and the notes compiled from them.
+
+    The pattern is only rebuilt when a setting actually changes, so the
+    per-tick path is just ``compiler.steps[step]``.
+    """
+
+    def __init__(self, root, mode, pattern, octaves=3):
+        self.root = root
+        self.mode = mode
+        self.pattern = tuple(pattern)
+        self.octaves = octaves
+        self.scale = compile_scale(root, mode, octaves)
+        self.steps = compile_pattern(root, mode, self.pattern, octaves)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def configure(self, root=None, mode=None, pattern=None, octaves=None):
+        """Change any of the settings, recompiling only if something differs.
+        Returns True if the tables were rebuilt."""
+        root = self.root if root is None else root
+        mode = self.mode if mode is None else mode
+        pattern = self.pattern if pattern is None else tuple(pattern)
+        octaves = self.octaves if octaves is None else octaves
+        if (root, mode, pattern, octaves) == (self.root, self.mode, self.pattern, self.octaves):
+            return False
+        self.root = root
+        self.mode = mode
+        self.pattern = pattern
+        self.octaves = octaves
+        self.scale = compile_scale(root, mode, octaves)
+        self.steps = compile_pattern(root, mode, pattern, octaves)
+        return True
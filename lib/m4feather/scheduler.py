@@ -0,0 +1,76 @@
+import array
+
+
+class EventScheduler:
+    """A fixed-size queue of timestamped note events, kept in time order.
+
+    Storage is preallocated at construction, so adding and dispatching
+    events does not build a dict or tuple per note the way the old
+    note_queue/note_off_queue lists did. A velocity of 0 is a note off.
+    """
+
+    def __init__(self, capacity=64):
+        """__init__
+
+        :param int capacity: the most events that can be pending at once
+        """
+        self.capacity = capacity
+        self._times = array.array('q', [0] * capacity)
+        self._notes = bytearray(capacity)
+        self._velocities = bytearray(capacity)
+        self._count = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, time_stamp, note, velocity):
+        """Queue an event, returns False (and counts a drop) if the queue is full"""
+        count = self._count
+        if count >= self.capacity:
+            self.dropped += 1
+            return False
+        times = self._times
+        notes = self._notes
+        velocities = self._velocities
+        time_stamp = int(time_stamp)
+        # insertion sort from the back: events are nearly always added in time order
+        i = count
+        while i > 0 and times[i - 1] > time_stamp:
+            times[i] = times[i - 1]
+            notes[i] = notes[i - 1]
+            velocities[i] = velocities[i - 1]
+            i -= 1
+        times[i] = time_stamp
+        notes[i] = note
+        velocities[i] = velocity
+        self._count = count + 1
+        return True
+
+    def next_time(self):
+        """Timestamp of the earliest pending event, or None"""
+        if self._count:
+            return self._times[0]
+        return None
+
+    def dispatch(self, now, out):
+        """Send every event due at or before ``now`` to ``out.note_on(note, velocity)``.
+        Returns the number of events sent."""
+        count = self._count
+        times = self._times
+        notes = self._notes
+        velocities = self._velocities
+        due = 0
+        while due < count and times[due] <= now:
+            out.note_on(notes[due], velocities[due])
+            due += 1
+        if due:
+            for i in range(due, count):
+                times[i - due] = times[i]
+                notes[i - due] = notes[i]
+                velocities[i - due] = velocities[i]
+            self._count = count - due
+        return due
+
+    def clear(self):
+        self._count = 0
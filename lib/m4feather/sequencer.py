@@ -0,0 +1,73 @@
+from .scales import REST
+from .timing import TickStats
+
+
+class Sequencer:
+    """Steps through a compiled pattern on a fixed tick and plays it out of a MidiOut.
+
+    poll() is given the current monotonic_ns time so the same object can be
+    driven by the asyncio tasks on the board or by a virtual clock on a host.
+    """
+
+    def __init__(self, pattern, out, queue, tick_ns, gate=0.7, velocity=120, start_ns=0):
+        """__init__
+
+        :param pattern: a scales.PatternCompiler
+
+        :param out: a MidiOut
+
+        :param queue: an EventScheduler for note offs and articulated notes
+
+        :param int tick_ns: length of one tick in nanoseconds
+
+        :param float gate: fraction of a tick each sequenced note sounds for
+
+        :param int velocity: velocity of sequenced notes
+
+        :param int start_ns: time of the first tick
+        """
+        self.pattern = pattern
+        self.out = out
+        self.queue = queue
+        self.velocity = velocity
+        self.step = -1
+        self.next_tick = start_ns
+        # how many sensor passes are under way, they can overlap
+        self.sensing = 0
+        self.stats = TickStats()
+        self.on_tick = None
+        self.set_tick(tick_ns, gate)
+
+    def set_tick(self, tick_ns, gate=None):
+        self.tick_ns = int(tick_ns)
+        if gate is not None:
+            self.gate = gate
+        self.note_duration = int(self.tick_ns * self.gate)
+
+    def poll(self, now):
+        """Fire the tick if it is due and send any queued events.
+        Returns how many nanoseconds until something else needs doing."""
+        if now >= self.next_tick:
+            self.stats.record(now - self.next_tick, self.sensing)
+            self.next_tick += self.tick_ns
+            if self.next_tick <= now:
+                # too far behind to catch up, drop the missed ticks rather than bursting them
+                self.next_tick = now + self.tick_ns
+            steps = self.pattern.steps
+            self.step = (self.step + 1) % len(steps)
+            note = steps[self.step]
+            if note > REST:
+                self.queue.add(now + self.note_duration, note, 0)
+                self.out.note_on(note, self.velocity)
+            if self.on_tick is not None:
+                self.on_tick(now)
+
+        self.queue.dispatch(now, self.out)
+        return self.ns_until_next_event(now)
+
+    def ns_until_next_event(self, now):
+        next_event = self.next_tick
+        queued = self.queue.next_time()
+        if queued is not None and queued < next_event:
+            next_event = queued
+        return next_event - now if next_event > now else 0
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+
+class SpiProfile:
+    """The bus settings one device on a shared SPI bus wants, plus how it has used the bus."""
+
+    def __init__(self, name, baudrate, phase=0, polarity=0):
+        self.name = name
+        self.baudrate = baudrate
+        self.phase = phase
+        self.polarity = polarity
+        self.sessions = 0
+        self.waits = 0
+        self.total_hold_ns = 0
+        self.max_hold_ns = 0
+
+
+class _Session:
+    def __init__(self, arbiter, name):
+        self._arbiter = arbiter
+        self._name = name
+
+    def __enter__(self):
+        if not self._arbiter.try_acquire(self._name):
+            raise RuntimeError("SPI bus is in use by '{}'".format(self._arbiter.owner))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._arbiter.release(self._name)
+        return False
+
+    async def __aenter__(self):
+        await self._arbiter.acquire(self._name)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._arbiter.release(self._name)
+        return False
+
+
+class SpiArbiter:
+    """Owns a shared busio.SPI and hands it to one device at a time.
+
+    The AirLift and the EnviroWing display drivers lock the bus for each of
+    their own transfers, so the arbiter doesn't hold the hardware lock for a
+    session. It keeps a logical owner instead: a display refresh and an ESP32
+    request are whole sessions that never interleave, the bus is only
+    reconfigured when the device using it changes, and each device's hold
+    times are recorded.
+
+        arbiter = SpiArbiter(spibus)
+        arbiter.add_device("display", 24000000)
+        async with arbiter.using("display"):
+            display.refresh()
+    """
+
+    def __init__(self, spi):
+        self.spi = spi
+        self.devices = {}
+        self.owner = None
+        self.active = None
+        self.reconfigures = 0
+        self._start = 0
+        self._waiting = []
+
+    def add_device(self, name, baudrate, phase=0, polarity=0):
+        profile = SpiProfile(name, baudrate, phase, polarity)
+        self.devices[name] = profile
+        return profile
+
+    def _configure(self, profile):
+        if self.active is profile:
+            return
+        while not self.spi.try_lock():
+            pass
+        try:
+            self.spi.configure(baudrate=profile.baudrate, phase=profile.phase, polarity=profile.polarity)
+        finally:
+            self.spi.unlock()
+        self.active = profile
+        self.reconfigures += 1
+
+    def try_acquire(self, name):
+        if self.owner is not None or (self._waiting and self._waiting[0] != name):
+            return False
+        self._take(name)
+        return True
+
+    def _take(self, name):
+        profile = self.devices[name]
+        self.owner = name
+        self._configure(profile)
+        profile.sessions += 1
+        self._start = time.monotonic_ns()
+
+    async def acquire(self, name):
+        """Wait (cooperatively) until the bus is free, then take it for name. Waiters are served in order."""
+        if self.try_acquire(name):
+            return
+        self.devices[name].waits += 1
+        self._waiting.append(name)
+        try:
+            while self.owner is not None or self._waiting[0] != name:
+                await asyncio.sleep(0)
+        finally:
+            self._waiting.remove(name)
+        self._take(name)
+
+    def release(self, name):
+        if self.owner != name:
+            raise RuntimeError("'{}' released the SPI bus but '{}' holds it".format(name, self.owner))
+        held = time.monotonic_ns() - self._start
+        profile = self.devices[name]
+        profile.total_hold_ns += held
+        if held > profile.max_hold_ns:
+            profile.max_hold_ns = held
+        self.owner = None
+
+    def using(self, name):
+        """A session for name, use with 'async with' to wait for the bus or 'with' to fail if it's busy"""
+        return _Session(self, name)
+
+    def report(self):
+        print("{:<12} {:>10} {:>8} {:>6} {:>12} {:>12}".format("spi device", "baudrate", "sessions", "waits", "hold ms", "max hold ms"))
+        for profile in self.devices.values():
+            print("{:<12} {:>10} {:>8} {:>6} {:>12.1f} {:>12.1f}".format(
+                profile.name, profile.baudrate, profile.sessions, profile.waits,
+                profile.total_hold_ns / 1000000, profile.max_hold_ns / 1000000))
+        print("reconfigures:", self.reconfigures)
@@ -0,0 +1,128 @@
+import time
+
+
+def gamma_table(gamma=2.6, brightness=1.0):
+    """256 output levels: each 0-255 input gamma corrected, then scaled by brightness"""
+    table = bytearray(256)
+    for level in range(256):
+        table[level] = int((level / 255) ** gamma * brightness * 255 + 0.5)
+    return table
+
+
+class StripRenderer:
+    """Frame-rate capped, change-driven output for a NeoPixel strip.
+
+    Colours are staged with fill() and set_pixel() into an RGB bytearray.
+    render() runs at most fps times a second and does nothing when the
+    staged frame is the same as the last one pushed. Otherwise each changed
+    pixel goes through the gamma/brightness table once into a preallocated
+    buffer in the strip's byte order, and the whole buffer is handed to
+    neopixel_write in one call. No tuples, no per-channel float maths.
+
+        pin = digitalio.DigitalInOut(board.D5)
+        pin.direction = digitalio.Direction.OUTPUT
+        renderer = StripRenderer(pin, 27, fps=30, brightness=0.5)
+        renderer.fill(triplet)
+        renderer.render(time.monotonic_ns())
+
+    :param pin: a DigitalInOut output for the strip's data line
+    :param count: number of pixels
+    :param fps: the most frames pushed per second (default 30)
+    :param brightness: 0 to 1, baked into the table (default 1.0)
+    :param gamma: gamma correction, 1 for none (default 2.6)
+    :param order: the strip's byte order (default "GRB", like neopixel.GRB)
+    :param write: write(pin, buffer), neopixel_write.neopixel_write unless given
+    """
+
+    def __init__(self, pin, count, fps=30, brightness=1.0, gamma=2.6, order="GRB", write=None):
+        if write is None:
+            from neopixel_write import neopixel_write as write
+        self.pin = pin
+        self.count = count
+        self.write = write
+        self.frame_ns = 1000000000 // fps
+        self.gamma = gamma
+        self.brightness = brightness
+        self.table = gamma_table(gamma, brightness)
+        self._red = order.index("R")
+        self._green = order.index("G")
+        self._blue = order.index("B")
+        self.staged = bytearray(3 * count)
+        self.shown = bytearray(3 * count)
+        self.wire = bytearray(3 * count)
+        self._next_frame = 0
+        self._pushed_once = False
+        self.pushed = 0
+        self.skipped = 0
+        self.show_ns = 0
+        self.max_show_ns = 0
+
+    def fill(self, color):
+        r = int(color[0])
+        g = int(color[1])
+        b = int(color[2])
+        staged = self.staged
+        for i in range(0, len(staged), 3):
+            staged[i] = r
+            staged[i + 1] = g
+            staged[i + 2] = b
+
+    def set_pixel(self, index, color):
+        i = 3 * index
+        self.staged[i] = int(color[0])
+        self.staged[i + 1] = int(color[1])
+        self.staged[i + 2] = int(color[2])
+
+    def set_brightness(self, brightness):
+        """Rebuild the table, every pixel is re-encoded on the next frame"""
+        self.brightness = brightness
+        self.table = gamma_table(self.gamma, brightness)
+        self._pushed_once = False
+
+    @property
+    def changed(self):
+        return not self._pushed_once or self.staged != self.shown
+
+    def _push(self):
+        staged = self.staged
+        shown = self.shown
+        wire = self.wire
+        table = self.table
+        everything = not self._pushed_once
+        red = self._red
+        green = self._green
+        blue = self._blue
+        for i in range(0, len(staged), 3):
+            if everything or staged[i] != shown[i] or staged[i + 1] != shown[i + 1] or staged[i + 2] != shown[i + 2]:
+                wire[i + red] = table[staged[i]]
+                wire[i + green] = table[staged[i + 1]]
+                wire[i + blue] = table[staged[i + 2]]
+        self.write(self.pin, wire)
+        shown[:] = staged
+        self._pushed_once = True
+
+    def due(self, now):
+        """True if render() would draw a frame at now"""
+        return now >= self._next_frame
+
+    def render(self, now):
+        """Push the staged frame if a frame is due and it changed. Returns True if it pushed."""
+        if now < self._next_frame:
+            return False
+        self._next_frame = now + self.frame_ns
+        if not self.changed:
+            self.skipped += 1
+            return False
+        start = time.monotonic_ns()
+        self._push()
+        spent = time.monotonic_ns() - start
+        self.show_ns += spent
+        if spent > self.max_show_ns:
+            self.max_show_ns = spent
+        self.pushed += 1
+        return True
+
+    def report(self):
+        mean = self.show_ns / self.pushed if self.pushed else 0
+        print("strip: {} frames pushed, {} skipped, show mean {:.2f} ms max {:.2f} ms, {:.1f} ms total".format(
+            self.pushed, self.skipped, mean / 1000000, self.max_show_ns / 1000000, self.show_ns / 1000000))
@@ -0,0 +1,38 @@
+class TickStats:
+    """Tracks how late sequencer ticks fire, split by whether the sensors were busy."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.total_late_ns = 0
+        self.max_late_ns = 0
+        self.sensing_ticks = 0
+        self.max_late_sensing_ns = 0
+
+    def record(self, late_ns, sensing=False):
+        self.ticks += 1
+        self.total_late_ns += late_ns
+        if late_ns > self.max_late_ns:
+            self.max_late_ns = late_ns
+        if sensing:
+            self.sensing_ticks += 1
+            if late_ns > self.max_late_sensing_ns:
+                self.max_late_sensing_ns = late_ns
+
+    @property
+    def mean_late_ns(self):
+        if not self.ticks:
+            return 0
+        return self.total_late_ns // self.ticks
+
+    def __repr__(self):
+        return "ticks: {} mean late: {}us max late: {}us max late while sensing: {}us ({} ticks)".format(
+            self.ticks,
+            self.mean_late_ns // 1000,
+            self.max_late_ns // 1000,
+            self.max_late_sensing_ns // 1000,
+            self.sensing_ticks)
+
+    __str__ = __repr__
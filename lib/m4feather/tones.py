@@ -0,0 +1,162 @@
+import array
+import math
+
+# every tone is built at this rate, and it's what the mixer runs at, so WAVs should match it too
+SAMPLE_RATE = 22050
+
+SINE = "sine"
+SQUARE = "square"
+CHIRP = "chirp"
+
+_FULL_SCALE = 2 ** 15 - 1
+
+
+def sine(frequency, volume, sample_rate=SAMPLE_RATE):
+    """One cycle, signed 16 bit, to be looped"""
+    length = sample_rate // frequency
+    table = array.array("h", [0] * length)
+    for i in range(length):
+        table[i] = int(math.sin(math.pi * 2 * i / length) * volume * _FULL_SCALE)
+    return table
+
+
+def square(frequency, volume, duty=0.5, sample_rate=SAMPLE_RATE):
+    """One cycle, signed 16 bit, to be looped"""
+    length = sample_rate // frequency
+    high = int(volume * _FULL_SCALE)
+    edge = int(length * duty)
+    table = array.array("h", [-high] * length)
+    for i in range(edge):
+        table[i] = high
+    return table
+
+
+def chirp(start, end, seconds, volume, sample_rate=SAMPLE_RATE):
+    """A sweep from start to end Hz over seconds, played once"""
+    length = int(seconds * sample_rate)
+    table = array.array("h", [0] * length)
+    phase = 0.0
+    step = (end - start) / length if length else 0
+    for i in range(length):
+        phase += 2 * math.pi * (start + step * i) / sample_rate
+        table[i] = int(math.sin(phase) * volume * _FULL_SCALE)
+    return table
+
+
+_BUILDERS = {SINE: sine, SQUARE: square, CHIRP: chirp}
+
+
+class ToneLibrary:
+    """Wavetables built once and kept as RawSamples, least recently used dropped past max_bytes.
+
+        tones = ToneLibrary(audiocore)
+        sample = tones.get(tones.SINE, 440, 0.1)
+        sample = tones.get(tones.CHIRP, 600, 1800, 0.25, 0.2)
+
+    A RawSample that's still playing when it's dropped keeps playing, the
+    voice holds its own reference.
+
+    :param audiocore: the audiocore module, for RawSample
+    :param max_bytes: wavetable memory to keep (default 32768)
+    """
+
+    def __init__(self, audiocore, max_bytes=32768):
+        self.audiocore = audiocore
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._samples = {}
+        # least recently used first
+        self._order = []
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+
+    def get(self, kind, *params):
+        """The RawSample for a sine, square or chirp with these builder arguments"""
+        key = (kind, params)
+        entry = self._samples.get(key)
+        if entry is not None:
+            self.hits += 1
+            if self._order[-1] != key:
+                self._order.remove(key)
+                self._order.append(key)
+            return entry[0]
+        table = _BUILDERS[kind](*params)
+        nbytes = 2 * len(table)
+        while self._order and self.size + nbytes > self.max_bytes:
+            old = self._order.pop(0)
+            self.size -= self._samples.pop(old)[1]
+            self.evictions += 1
+        sample = self.audiocore.RawSample(table, sample_rate=SAMPLE_RATE)
+        self._samples[key] = (sample, nbytes)
+        self._order.append(key)
+        self.size += nbytes
+        self.builds += 1
+        return sample
+
+    def __len__(self):
+        return len(self._samples)
+
+    def report(self):
+        print("tones: {} cached, {} bytes of {}, {} hits, {} built, {} dropped".format(
+            len(self._samples), self.size, self.max_bytes, self.hits, self.builds, self.evictions))
+
+
+class VoiceAllocator:
+    """Hands out audiomixer voices so sounds overlap instead of cutting each other off.
+
+    Voice 0 is kept for the playlist (music), the rest take alerts: a free
+    one if there is one, otherwise the alert that started longest ago.
+
+        mixer = audiomixer.Mixer(voice_count=3, sample_rate=tones.SAMPLE_RATE, channel_count=1,
+                                 bits_per_sample=16, samples_signed=True)
+        audio.play(mixer)
+        voices = VoiceAllocator(mixer)
+        voices.play(tones.get(tones.SQUARE, 880, 0.2), now, seconds=0.3)
+
+    :param mixer: an audiomixer.Mixer with at least two voices
+    """
+
+    def __init__(self, mixer):
+        self.mixer = mixer
+        self.music = mixer.voice[0]
+        self._alerts = list(range(1, len(mixer.voice)))
+        count = len(mixer.voice)
+        self._started = [0] * count
+        self._stop_at = [None] * count
+        self.played = 0
+        self.stolen = 0
+
+    def play(self, sample, now, seconds=None):
+        """Play sample on an alert voice, looped for seconds if given, once if not. Returns the voice index."""
+        voices = self.mixer.voice
+        chosen = None
+        for index in self._alerts:
+            if not voices[index].playing:
+                chosen = index
+                break
+        if chosen is None:
+            chosen = self._alerts[0]
+            for index in self._alerts:
+                if self._started[index] < self._started[chosen]:
+                    chosen = index
+            voices[chosen].stop()
+            self.stolen += 1
+        voices[chosen].play(sample, loop=seconds is not None)
+        self._started[chosen] = now
+        self._stop_at[chosen] = None if seconds is None else now + int(seconds * 1000000000)
+        self.played += 1
+        return chosen
+
+    def service(self, now):
+        """Stop looped alerts whose time is up"""
+        for index in self._alerts:
+            stop_at = self._stop_at[index]
+            if stop_at is not None and now >= stop_at:
+                self.mixer.voice[index].stop()
+                self._stop_at[index] = None
+
+    def stop(self):
+        for index in self._alerts:
+            self.mixer.voice[index].stop()
+            self._stop_at[index] = None
@@ -2,9 +2,11 @@
 import digitalio
 import analogio
 import pimoroni_physical_feather_pins
+from pimoroni_physical_feather_pins import claims
 
 _is_setup = False
 enable_pin = None
+OX = RED = NH3 = None
 
 
 
@@ -35,7 +37,8 @@ def setup():
     global _is_setup, enable_pin, OX, RED, NH3
     if _is_setup:
         return
-    _is_setup = True
+
+    claims.claim("enviro+ gas", 5, 6, 7, 9)
 
     #enable = digitalio.DigitalInOut(board.A4)
     enable_pin = digitalio.DigitalInOut(pimoroni_physical_feather_pins.pin9())
@@ -48,6 +51,19 @@ def setup():
     RED = analogio.AnalogIn(pimoroni_physical_feather_pins.pin6())
     # NH3 = analogio.AnalogIn(board.A0)
     NH3 = analogio.AnalogIn(pimoroni_physical_feather_pins.pin5())
+    # only once everything is made, so a failed setup is tried again in full
+    _is_setup = True
+
+
+def deinit():
+    """Free the pins (and their claims), setup() can be run again afterwards"""
+    global _is_setup, enable_pin, OX, RED, NH3
+    for io in (enable_pin, OX, RED, NH3):
+        if io is not None:
+            io.deinit()
+    enable_pin = OX = RED = NH3 = None
+    claims.release("enviro+ gas")
+    _is_setup = False
 
 
 def cleanup():
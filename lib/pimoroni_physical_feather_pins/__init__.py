@@ -3,6 +3,14 @@ from . import pin_error
 #from . import _template
 
 def __getattr__(name):
+    # pinN() for the board specific pins is made on first use and then cached as a real module attribute
+    if name.startswith('pin') and name[3:].isdigit():
+        number = int(name[3:])
+        if number in _board_table().PINS:
+            def lookup():
+                return pin(number)
+            globals()[name] = lookup
+            return lookup
     raise pin_error.PinDoesNotExistError("Pin '%s' does not exist" % (name))
 
 #region Consistent Pins
@@ -27,8 +35,34 @@ def pin28():
 
 #endregion Consistent Pins
 
-import os as _os
-_machine = _os.uname().machine
+_resolved = {}
+_source = None
+
+def pin(number):
+    """Return the pin object for a physical pin number, resolving it from the board table once"""
+    global _source
+    try:
+        return _resolved[number]
+    except KeyError:
+        pass
+    try:
+        name = _board_table().PINS[number]
+    except KeyError:
+        consistent = globals().get('pin%d' % number)
+        if consistent is None:
+            raise pin_error.PinDoesNotExistError("Pin '%d' does not exist" % (number))
+        return consistent()
+    if name is None:
+        raise pin_error.PinNotAddressableError("Pin %d is not addressable." % (number))
+    if _source is None:
+        if _board.SOURCE == "board":
+            import board as _source
+        else:
+            import microcontroller
+            _source = microcontroller.pin
+    resolved = getattr(_source, name)
+    _resolved[number] = resolved
+    return resolved
 
 _case = {
     'Adafruit Feather M4 Express with samd51j19' : "m4",
@@ -39,21 +73,67 @@ _case = {
     'Adafruit Feather M0 Basic with samd21g18' : "m0",
     'Adafruit Feather M0 RFM69 with samd21g18' : "m0",
     'Adafruit Feather M0 RFM9x with samd21g18' : "m0",
-    
+
     'Adafruit Feather RP2040 with rp2040' : "rp2040",
 
     'Feather STM32F405 Express with STM32F405RG' : "stm32",
 
-    'FeatherS2 with ESP32S2' : "feathers2",    
+    'FeatherS2 with ESP32S2' : "feathers2",
 }
 
-#m4.init(globals())
-
-# Case statement replacement
-#[value for key, value in _case.items() if _machine in key][0].init(globals())
+# Fallback for machine strings that aren't listed exactly (new revisions, other CircuitPython versions).
+# Each fragment only matches the board its table is for: "Feather RP2040" alone would also match the RP2040
+# CAN, RFM, DVI, Adalogger and Prop-Maker, "FeatherS2" the FeatherS2 Neo, "Feather M4" the M4 CAN
+_partial = (
+    ('Feather M4 Express', "m4"),
+    ('Feather M0', "m0"),
+    ('Feather nRF52840', "nRF52840"),
+    ('Feather RP2040 with', "rp2040"),
+    ('Feather STM32F405', "stm32"),
+    ('FeatherS2 with', "feathers2"),
+)
+
+_CONFIG_MODULE = "feather_board_config"
+
+def detect(machine):
+    """Return the board module name for an os.uname().machine string, or None"""
+    try:
+        return _case[machine]
+    except KeyError:
+        pass
+    for fragment, name in _partial:
+        if fragment in machine:
+            return name
+    return None
+
+def write_board_config(path="/" + _CONFIG_MODULE + ".py", name=None):
+    """Save the detected (or given) board so later boots skip detection.
+    The filesystem has to be writable from code, eg storage.remount("/", False) in boot.py"""
+    if name is None:
+        name = _board_name
+    with open(path, "w") as config:
+        config.write("BOARD = %r\n" % (name))
+
+# An explicit or generated config wins, so the os.uname() probe only runs when there isn't one
+# (or it doesn't set BOARD)
+try:
+    _board_name = getattr(__import__(_CONFIG_MODULE), "BOARD", None)
+except ImportError:
+    _board_name = None
+_machine = None
+if _board_name is None:
+    import os as _os
+    _machine = _os.uname().machine
+    _board_name = detect(_machine)
+
+def _board_table():
+    if _board is None:
+        raise NotImplementedError("Sorry, '{}' is not supported currently".format(_machine or _board_name))
+    return _board
+
+# The board module is only a table, the pins in it are looked up the first time they're asked for.
+# An unsupported board only fails once a pin is used, so the tables (see index) stay usable anywhere.
 try:
-    mod = __import__(_case[_machine], globals(), locals(), [None], 1)
-    mod.init(globals())
-    #_case[_machine].init(globals())
-except KeyError:
-    raise NotImplementedError("Sorry, '{}' is not supported currently".format(_machine))
+    _board = __import__(_board_name, globals(), locals(), [None], 1)
+except (ImportError, TypeError):
+    _board = None
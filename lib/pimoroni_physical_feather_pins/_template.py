@@ -1,74 +1,29 @@
-from . import pin_error
-import microcontroller
-
-def pin3():
-    raise NotImplementedError
-
-def pin5():
-    raise NotImplementedError
-
-def pin6():
-    raise NotImplementedError
-
-def pin7():
-    raise NotImplementedError
-
-def pin8():
-    raise NotImplementedError
-
-def pin9():
-    raise NotImplementedError
-
-def pin10():
-    raise NotImplementedError
-
-def pin11():
-    raise NotImplementedError
-
-def pin12():
-    raise NotImplementedError
-
-def pin13():
-    raise NotImplementedError
-
-def pin14():
-    raise NotImplementedError
-
-def pin15():
-    raise NotImplementedError
-
-def pin16():
-    raise NotImplementedError
-
-def pin17():
-    raise NotImplementedError
-
-def pin18():
-    raise NotImplementedError
-
-def pin19():
-    raise NotImplementedError
-
-def pin20():
-    raise NotImplementedError
-
-def pin21():
-    raise NotImplementedError
-
-def pin22():
-    raise NotImplementedError
-
-def pin23():
-    raise NotImplementedError
-
-def pin24():
-    raise NotImplementedError
-
-def pin25():
-    raise NotImplementedError
-
-def init(scope):
-    """Pull the pin definitions into the main module namespace"""
-    for key in globals().keys():
-        if key.startswith('pin'):
-            scope[key] = globals()[key]
\ No newline at end of file
+# Physical pin number -> attribute of microcontroller.pin (or of board, if SOURCE is "board").
+# None marks a pin that exists on the header but can't be used as IO.
+# Copy this file, fill in the pin names and add the board to _case in __init__.py
+SOURCE = "microcontroller"
+
+PINS = {
+    3: None,
+    5: None,
+    6: None,
+    7: None,
+    8: None,
+    9: None,
+    10: None,
+    11: None,
+    12: None,
+    13: None,
+    14: None,
+    15: None,
+    16: None,
+    17: None,
+    18: None,
+    19: None,
+    20: None,
+    21: None,
+    22: None,
+    23: None,
+    24: None,
+    25: None,
+}
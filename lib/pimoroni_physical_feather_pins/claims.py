@@ -0,0 +1,46 @@
+"""A registry of which subsystem is using which header pin.
+
+Setup code claims its pins before creating the IO objects for them, so two
+add-ons wired to the same pin fail straight away with PinClaimedError
+instead of misbehaving later:
+
+    claims.claim("enviro+ gas", 5, 6, 7, 9)
+    claims.claim("airlift", board.D11, board.D12, board.D13)
+"""
+from . import pin_error
+from .index import physical_pin
+
+_owners = {}
+
+def claim(owner, *pins, board=None):
+    """Claim pins (numbers, names or pin objects) for owner. Claiming a pin you already own is fine.
+    Nothing is claimed if any of the pins belongs to someone else."""
+    numbers = [physical_pin(pin, board) for pin in pins]
+    for number in numbers:
+        current = _owners.get(number)
+        if current is not None and current != owner:
+            raise pin_error.PinClaimedError("Pin {} is already claimed by '{}', '{}' can't use it".format(number, current, owner))
+    for number in numbers:
+        _owners[number] = owner
+    return numbers
+
+def release(owner, *pins, board=None):
+    """Release some of owner's pins, or all of them if none are given"""
+    if pins:
+        numbers = [physical_pin(pin, board) for pin in pins]
+    else:
+        numbers = [number for number, current in _owners.items() if current == owner]
+    for number in numbers:
+        if _owners.get(number) == owner:
+            del _owners[number]
+
+def owner(pin, board=None):
+    """Return who has claimed a pin, or None"""
+    return _owners.get(physical_pin(pin, board))
+
+def claimed():
+    """A copy of the registry, physical pin number -> owner"""
+    return dict(_owners)
+
+def reset():
+    _owners.clear()
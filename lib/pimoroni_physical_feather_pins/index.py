@@ -0,0 +1,54 @@
+"""Forward and reverse maps over every board table.
+
+Only the tables are needed, so this works the same on a host as on a board:
+
+    >>> from pimoroni_physical_feather_pins import index
+    >>> index.reverse("m4")["PA16"]
+    19
+"""
+from . import pin_error, _board_table, _board_name
+from . import pin as _resolve
+
+BOARDS = ("m4", "m0", "nRF52840", "rp2040", "stm32", "feathers2")
+
+_reverse = {}
+
+def _table(board):
+    if board is None:
+        return _board_table()
+    return __import__(board, globals(), locals(), [None], 1)
+
+def forward(board=None):
+    """Physical pin number -> pin name for a board (default: the one we're running on)"""
+    return _table(board).PINS
+
+def reverse(board=None):
+    """Pin name -> physical pin number for a board (default: the one we're running on)"""
+    key = board or _board_name
+    try:
+        return _reverse[key]
+    except KeyError:
+        pass
+    table = {}
+    for number, name in forward(board).items():
+        if name is not None:
+            table[name] = number
+    _reverse[key] = table
+    return table
+
+def physical_pin(pin, board=None):
+    """Return the physical pin number for a pin number, a pin name or a pin object"""
+    if isinstance(pin, int):
+        if pin in forward(board) or pin in (1, 2, 4, 26, 27, 28):
+            return pin
+    elif isinstance(pin, str):
+        try:
+            return reverse(board)[pin]
+        except KeyError:
+            pass
+    elif board is None:
+        # a microcontroller.pin/board object, only comparable on the board itself
+        for number, name in forward().items():
+            if name is not None and _resolve(number) == pin:
+                return number
+    raise pin_error.PinDoesNotExistError("'{}' is not a header pin on {}".format(pin, board or _board_name))
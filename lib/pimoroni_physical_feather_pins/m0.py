@@ -1,74 +1,28 @@
-from . import pin_error
-import microcontroller
-
-def pin3():
-    return microcontroller.pin.PA03
-
-def pin5():
-    return microcontroller.pin.PA02
-
-def pin6():
-    return microcontroller.pin.PB08
-
-def pin7():
-    return microcontroller.pin.PB09
-
-def pin8():
-    return microcontroller.pin.PA04
-
-def pin9():
-    return microcontroller.pin.PA05
-
-def pin10():
-    return microcontroller.pin.PB02
-
-def pin11():
-    return microcontroller.pin.PB11
-
-def pin12():
-    return microcontroller.pin.PB10
-
-def pin13():
-    return microcontroller.pin.PA12
-
-def pin14():
-    return microcontroller.pin.PA11
-
-def pin15():
-    return microcontroller.pin.PA10
-
-def pin16():
-    raise pin_error.PinNotAddressableError("Pin 16 is not addressable.")
-
-def pin17():
-    return microcontroller.pin.PA22
-
-def pin18():
-    return microcontroller.pin.PA23
-
-def pin19():
-    return microcontroller.pin.PA15
-
-def pin20():
-    return microcontroller.pin.PA20
-
-def pin21():
-    return microcontroller.pin.PA07
-
-def pin22():
-    return microcontroller.pin.PA18
-
-def pin23():
-    return microcontroller.pin.PA16
-
-def pin24():
-    return microcontroller.pin.PA19
-
-def pin25():
-    return microcontroller.pin.PA17
-
-def init(scope):
-    """Pull the pin definitions into the main module namespace"""
-    for key in globals().keys():
-        if key.startswith('pin'):
-            scope[key] = globals()[key]
\ No newline at end of file
+# Physical pin number -> attribute of microcontroller.pin.
+# None marks a pin that exists on the header but can't be used as IO.
+SOURCE = "microcontroller"
+
+PINS = {
+    3: "PA03",
+    5: "PA02",
+    6: "PB08",
+    7: "PB09",
+    8: "PA04",
+    9: "PA05",
+    10: "PB02",
+    11: "PB11",
+    12: "PB10",
+    13: "PA12",
+    14: "PA11",
+    15: "PA10",
+    16: None,  # not addressable
+    17: "PA22",
+    18: "PA23",
+    19: "PA15",
+    20: "PA20",
+    21: "PA07",
+    22: "PA18",
+    23: "PA16",
+    24: "PA19",
+    25: "PA17",
+}
@@ -7,10 +7,19 @@ class PinNotAddressableError(Exception):
         
         super().__init__(*args, **kwargs)
 
-class PinDoesNotExistError(Exception):
+class PinDoesNotExistError(AttributeError):
     def __init__(self, *args, **kwargs):
         default_message = "Pin does not exist"
 
+        if not (args or kwargs):
+            args = (default_message, )
+        
+        super().__init__(*args, **kwargs)
+
+class PinClaimedError(Exception):
+    def __init__(self, *args, **kwargs):
+        default_message = "Pin is already claimed"
+
         if not (args or kwargs):
             args = (default_message, )
         